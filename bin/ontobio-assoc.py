@@ -155,6 +155,7 @@ def main():
     parser_n.add_argument('-X', '--xsubjects',nargs='*', help='x subjects')
     parser_n.add_argument('-Y', '--ysubjects',nargs='*', help='y subjects')
     parser_n.add_argument('--useids',type=bool, default=False, help='if true, use IDs not labels on axes')
+    parser_n.add_argument('-k', '--top',type=int, help='if set, print the top K most similar Y subjects for each X subject instead of plotting; defaults to all subjects')
     parser_n.add_argument('subjects',nargs='*', help='all terms (x and y)')
     parser_n.set_defaults(function=plot_simmatrix)
 
@@ -257,15 +258,20 @@ def run_phenolog(ont, aset, args):
     if num_common < 2:
         logging.error("TOO FEW")
         return None
+    bases = []
+    samples = []
     for n in aset.ontology.nodes():
         nl = ont.label(n, id_if_null=True)
         genes = aset.query([n])
         num_genes = len(genes)
         if num_genes > 2:
             logging.info("BASE: {} {} num={}".format(n,nl, num_genes))
-            enr = aset2.enrichment_test(subjects=genes, background=aset2.subjects, labels=True)
-            for r in enr:
-                print("{:8.3g} {} {:20s} <-> {} {:20s}".format(r['p'],n,nl,r['c'],str(r['n'])))
+            bases.append((n, nl))
+            samples.append(genes)
+    enrs = aset2.batch_enrichment_test(samples, background=aset2.subjects, labels=True)
+    for ((n, nl), enr) in zip(bases, enrs):
+        for r in enr:
+            print("{:8.3g} {} {:20s} <-> {} {:20s}".format(r['p'],n,nl,r['c'],str(r['n'])))
 
 
 def run_query(ont, aset, args):
@@ -352,7 +358,7 @@ def create_intersection_matrix(ont, aset, args):
     if yterms is None or len(yterms) == 0:
         yterms = xterms
     logging.info("X={} Y={}".format(xterms,yterms))
-    ilist = aset.query_intersections(x_terms=xterms, y_terms=yterms)
+    ilist = aset.query_intersections(x_terms=xterms, y_terms=yterms, include_shared=False)
     z, xaxis, yaxis = aset.intersectionlist_to_matrix(ilist, xterms, yterms)
     xaxis = mk_axis(xaxis, aset, args)
     yaxis = mk_axis(yaxis, aset, args)
@@ -376,6 +382,10 @@ def plot_simmatrix(ont, aset, args):
         xsubjects = args.subjects
     if ysubjects is None or len(ysubjects) == 0:
         ysubjects = xsubjects
+    if args.top is not None:
+        for r in aset.similarity_top_k(xsubjects or None, ysubjects or None, k=args.top):
+            print("{}\t{}\t{}\t{}\t{}\t{:.4f}".format(r['x'], label_or_id(r['x'], aset), r['y'], label_or_id(r['y'], aset), r['c'], r['j']))
+        return
     (z, xaxis, yaxis) = aset.similarity_matrix(xsubjects, ysubjects)
     xaxis = mk_axis(xaxis, aset, args)
     yaxis = mk_axis(yaxis, aset, args)
@@ -63,6 +63,10 @@ def main():
                         help='File to export unmapped nodes to')
     parser.add_argument('-A', '--all-by-all', dest='all_by_all', action='store_true',
                         help='compare all ontologies against all.')
+    parser.add_argument('-w', '--workers', type=int, required=False,
+                        help='number of processes used to compare synonyms. Overrides the config file')
+    parser.add_argument('--max-bucket-size', dest='max_bucket_size', type=int, required=False,
+                        help='ignore lexical values shared by more than this many synonyms. Overrides the config file')
     parser.add_argument('-v', '--verbosity', default=0, action='count',
                         help='Increase output verbosity')
 
@@ -110,6 +114,11 @@ def main():
                         'right':row['right'],
                         'weights':WA})
         
+    if args.workers is not None:
+        config['workers'] = args.workers
+    if args.max_bucket_size is not None:
+        config['max_bucket_size'] = args.max_bucket_size
+
     logging.info("ALL: {}".format(args.all_by_all))
     
     lexmap = LexicalMapEngine(config=config)
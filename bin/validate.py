@@ -28,6 +28,7 @@ from ontobio.io import assocparser
 from ontobio.io import gafgpibridge
 from ontobio.io import entitywriter
 from ontobio.io import gaference
+from ontobio.io import gzipsink
 from ontobio.rdfgen import assoc_rdfgen
 from ontobio.rdfgen.gocamgen.gocam_builder import GoCamBuilder, AssocExtractor
 from ontobio.validation import metadata
@@ -119,7 +120,7 @@ def download_a_dataset_source(group, dataset_metadata, target_dir, source_url, b
     return path
 
 
-def download_source_gafs(group_metadata, target_dir, exclusions=[], base_download_url=None, replace_existing_files=True, only_dataset=None):
+def download_source_gafs(group_metadata, target_dir, exclusions=[], base_download_url=None, replace_existing_files=True, only_dataset=None, compresslevel=gzipsink.DEFAULT_COMPRESSLEVEL, compress_threads=1):
     """
     This looks at a group metadata dictionary and downloads each GAF source that is not in the exclusions list.
     For each downloaded file, keep track of the path of the file. If the file is zipped, it will unzip it here.
@@ -146,7 +147,7 @@ def download_source_gafs(group_metadata, target_dir, exclusions=[], base_downloa
         else:
             # otherwise file is coming in uncompressed. But we want to make sure
             # to zip up the original source also
-            tools.zipup(path)
+            tools.zipup(path, compresslevel=compresslevel, threads=compress_threads)
 
         downloaded_paths.append((dataset_metadata, path))
 
@@ -209,9 +210,15 @@ def create_parser(config, group, dataset, format="gaf"):
 Produce validated gaf using the gaf parser/
 """
 
-@tools.gzips
-def produce_gaf(dataset, source_gaf, ontology_graph, gpipaths=None, paint=False, group="unknown", rule_metadata=None, goref_metadata=None, db_entities=None, group_idspace=None, format="gaf", suppress_rule_reporting_tags=[], annotation_inferences=None, group_metadata=None, extensions_constraints=None, rule_contexts=[], gaf_output_version="2.2", rule_set=assocparser.RuleSet.ALL):
-    filtered_associations = open(os.path.join(os.path.split(source_gaf)[0], "{}_noiea.gaf".format(dataset)), "w")
+def produce_gaf(dataset, source_gaf, ontology_graph, gpipaths=None, paint=False, group="unknown", rule_metadata=None, goref_metadata=None, db_entities=None, group_idspace=None, format="gaf", suppress_rule_reporting_tags=[], annotation_inferences=None, group_metadata=None, extensions_constraints=None, rule_contexts=[], gaf_output_version="2.2", rule_set=assocparser.RuleSet.ALL, workers=1, report_examples=None, sinks=None, compresslevel=gzipsink.DEFAULT_COMPRESSLEVEL, compress_threads=1):
+    """
+    Validates source_gaf into {dataset}_valid.gaf and {dataset}_noiea.gaf, each written along with a gzipped copy.
+
+    `sinks` is an optional list of functions that are each called with every
+    association written to the valid gaf, so other products can be made in the same parse.
+    When given, the source is not counted up front for the progress bar.
+    """
+    filtered_associations = tools.gzip_tee(open(os.path.join(os.path.split(source_gaf)[0], "{}_noiea.gaf".format(dataset)), "w"), compresslevel=compresslevel, threads=compress_threads)
     config = assocparser.AssocParserConfig(
         ontology=ontology_graph,
         filter_out_evidence=["IEA"],
@@ -228,23 +235,31 @@ def produce_gaf(dataset, source_gaf, ontology_graph, gpipaths=None, paint=False,
         extensions_constraints=extensions_constraints,
         rule_contexts=rule_contexts,
         rule_set=rule_set,
+        workers=workers,
+        report_examples=report_examples,
     )
     logger.info("Producing {}".format(source_gaf))
     # logger.info("AssocParserConfig used: {}".format(config))
     split_source = os.path.split(source_gaf)[0]
     validated_gaf_path = os.path.join(split_source, "{}_valid.gaf".format(dataset))
-    outfile = open(validated_gaf_path, "w")
+    outfile = tools.gzip_tee(open(validated_gaf_path, "w"), compresslevel=compresslevel, threads=compress_threads)
     gafwriter = GafWriter(file=outfile, source=dataset, version=gaf_output_version)
 
     click.echo("Validating source {}: {}".format(format, source_gaf))
     parser = create_parser(config, group, dataset, format)
-    with open(source_gaf) as sg:
-        lines = sum(1 for line in sg)
+    if sinks is None:
+        sinks = []
+        with open(source_gaf) as sg:
+            lines = sum(1 for line in sg)
+    else:
+        lines = None
 
     with open(source_gaf) as gaf:
         with click.progressbar(iterable=parser.association_generator(file=gaf), length=lines) as associations:
             for assoc in associations:
                 gafwriter.write_assoc(assoc)
+                for sink in sinks:
+                    sink(assoc)
 
     outfile.close()
     filtered_associations.close()
@@ -275,62 +290,94 @@ def produce_gaf(dataset, source_gaf, ontology_graph, gpipaths=None, paint=False,
     return [validated_gaf_path, filtered_associations.name]
 
 
-@tools.gzips
-def make_products(dataset, target_dir, gaf_path, products, ontology_graph):
+class ProductWriters(object):
+    """
+    Writes the GPAD and TTL products of a dataset, one association at a time, each along with a gzipped copy
+    """
 
-    with open(gaf_path) as sg:
-        lines = sum(1 for line in sg)
+    def __init__(self, dataset, products_dir, products, compresslevel=gzipsink.DEFAULT_COMPRESSLEVEL, compress_threads=1):
+        self.products = products
+        self.product_files = {}
 
-    product_files = {
-        "gpad": open(os.path.join(os.path.split(gaf_path)[0], "{}.gpad".format(dataset)), "w"),
-        "ttl": open(os.path.join(os.path.split(gaf_path)[0], "{}_cam.ttl".format(dataset)), "wb")
-    }
+        if products["ttl"]:
+            self.product_files["ttl"] = tools.gzip_tee(open(os.path.join(products_dir, "{}_cam.ttl".format(dataset)), "wb"), compresslevel=compresslevel, threads=compress_threads)
+            click.echo("Setting up {}".format(self.product_files["ttl"].name))
+            self.rdf_writer = assoc_rdfgen.TurtleRdfWriter(label=os.path.split(self.product_files["ttl"].name)[1])
+            self.transformer = assoc_rdfgen.CamRdfTransform(writer=self.rdf_writer)
+
+        if products["gpad"]:
+            self.product_files["gpad"] = tools.gzip_tee(open(os.path.join(products_dir, "{}.gpad".format(dataset)), "w"), compresslevel=compresslevel, threads=compress_threads)
+            click.echo("Setting up {}".format(self.product_files["gpad"].name))
+            self.gpadwriter = GpadWriter(file=self.product_files["gpad"])
+
+    def write(self, association):
+        if self.products["ttl"]:
+            self.transformer.provenance()
+            self.transformer.translate(association)
+
+        if self.products["gpad"]:
+            self.gpadwriter.write_assoc(association)
+
+    def close(self):
+        """
+        Finishes writing the products, returning their paths
+        """
+        # post ttl steps
+        if self.products["ttl"]:
+            click.echo("Writing ttl to disk")
+            self.rdf_writer.serialize(destination=self.product_files["ttl"])
+
+        for f in self.product_files.values():
+            f.close()
+
+        return [self.product_files[prod].name for prod in sorted(self.product_files.keys())]
+
+
+def make_products(dataset, target_dir, gaf_path, products, ontology_graph, compresslevel=gzipsink.DEFAULT_COMPRESSLEVEL, compress_threads=1):
 
     if not products["gpad"] and not products["ttl"]:
         # Bail if we have no products
         return []
 
-    # def write_gpi_entity(association, bridge, gpiwriter):
+    with open(gaf_path) as sg:
+        lines = sum(1 for line in sg)
+
     with open(gaf_path) as gf:
         gafparser = GafParser(config=assocparser.AssocParserConfig(
             ontology=ontology_graph,
             paint=True,
         ))
 
-        # gpi info:
         click.echo("Using {} as the gaf to build data products with".format(gaf_path))
-        if products["ttl"]:
-            click.echo("Setting up {}".format(product_files["ttl"].name))
-            rdf_writer = assoc_rdfgen.TurtleRdfWriter(label=os.path.split(product_files["ttl"].name)[1] )
-            transformer = assoc_rdfgen.CamRdfTransform(writer=rdf_writer)
-
-        if products["gpad"]:
-            click.echo("Setting up {}".format(product_files["gpad"].name))
-            gpadwriter = GpadWriter(file=product_files["gpad"])
+        writers = ProductWriters(dataset, os.path.split(gaf_path)[0], products, compresslevel=compresslevel, compress_threads=compress_threads)
 
         click.echo("Making products...")
         with click.progressbar(iterable=gafparser.association_generator(file=gf), length=lines) as associations:
             for association in associations:
-                if products["ttl"]:
-                    transformer.provenance()
-                    transformer.translate(association)
+                writers.write(association)
 
-                if products["gpad"]:
-                    gpadwriter.write_assoc(association)
+    return writers.close()
 
-        # post ttl steps
-        if products["ttl"]:
-            click.echo("Writing ttl to disk")
-            rdf_writer.serialize(destination=product_files["ttl"])
 
-        # After we run through associations
-        for f in product_files.values():
-            f.close()
+def gpi_writer(gpi_file):
+    """
+    Returns a function that writes the GPI entity of each association it is called with to gpi_file, once per entity
+    """
+    bridge = gafgpibridge.GafGpiBridge()
+    gpiwriter = entitywriter.GpiWriter(file=gpi_file)
+    gpi_cache = set()
 
-    return [product_files[prod].name for prod in sorted(product_files.keys()) if products[prod]]
+    def write_entity(association):
+        entity = bridge.convert_association(association)
+        if entity not in gpi_cache and entity is not None:
+            # If the entity is not in the cache, add it and write it out
+            gpi_cache.add(entity)
+            gpiwriter.write_entity(entity)
 
-@tools.gzips
-def produce_gpi(dataset, target_dir, gaf_path, ontology_graph):
+    return write_entity
+
+
+def produce_gpi(dataset, target_dir, gaf_path, ontology_graph, compresslevel=gzipsink.DEFAULT_COMPRESSLEVEL, compress_threads=1):
     gafparser = GafParser()
     gafparser.config = assocparser.AssocParserConfig(
         ontology=ontology_graph
@@ -339,25 +386,18 @@ def produce_gpi(dataset, target_dir, gaf_path, ontology_graph):
         lines = sum(1 for line in sg)
 
     gpi_path = os.path.join(os.path.split(gaf_path)[0], "{}.gpi".format(dataset))
-    with open(gaf_path) as gf, open(gpi_path, "w") as gpi:
+    with open(gaf_path) as gf, tools.gzip_tee(open(gpi_path, "w"), compresslevel=compresslevel, threads=compress_threads) as gpi:
         click.echo("Using {} as the gaf to build gpi with".format(gaf_path))
-        bridge = gafgpibridge.GafGpiBridge()
-        gpiwriter = entitywriter.GpiWriter(file=gpi)
-        gpi_cache = set()
+        write_entity = gpi_writer(gpi)
 
         with click.progressbar(iterable=gafparser.association_generator(file=gf), length=lines) as associations:
             for association in associations:
-                entity = bridge.convert_association(association)
-                if entity not in gpi_cache and entity is not None:
-                    # If the entity is not in the cache, add it and write it out
-                    gpi_cache.add(entity)
-                    gpiwriter.write_entity(entity)
+                write_entity(association)
 
     return gpi_path
 
 
-@tools.gzips
-def produce_ttl(dataset, target_dir, gaf_path, ontology_graph):
+def produce_ttl(dataset, target_dir, gaf_path, ontology_graph, compresslevel=gzipsink.DEFAULT_COMPRESSLEVEL, compress_threads=1):
     gafparser = GafParser()
     gafparser.config = assocparser.AssocParserConfig(
         ontology=ontology_graph
@@ -379,27 +419,31 @@ def produce_ttl(dataset, target_dir, gaf_path, ontology_graph):
                     transformer.provenance()
                     transformer.translate(association)
 
-    with open(ttl_path, "wb") as ttl:
+    with tools.gzip_tee(open(ttl_path, "wb"), compresslevel=compresslevel, threads=compress_threads) as ttl:
         click.echo("Writing ttl to disk")
         rdf_writer.serialize(destination=ttl)
 
     return ttl_path
 
 
-@tools.gzips
-def merge_all_mixin_gaf_into_mod_gaf(valid_gaf_path, mixin_gaf_paths):
-    def header_and_annotations(gaf_file):
-        headers = []
-        annotations = []
-
-        for line in gaf_file.readlines():
-            line = line.rstrip("\n")
-            if line.startswith("!"):
-                headers.append(line)
-            else:
-                annotations.append(line)
+def merge_all_mixin_gaf_into_mod_gaf(valid_gaf_path, mixin_gaf_paths, chunk_size=64 * 1024, compresslevel=gzipsink.DEFAULT_COMPRESSLEVEL, compress_threads=1):
+    """
+    Writes {group}.gaf from the valid gaf followed by each mixin gaf, streaming
+    annotation lines across in chunks of about chunk_size bytes.
+    """
+    def header(gaf_path):
+        # Any "!" line in the file belongs to the header, not just those at the top
+        with open(gaf_path) as gaf_file:
+            return [line.rstrip("\n") for line in gaf_file if line.startswith("!")]
 
-        return (headers, annotations)
+    def copy_annotations(gaf_path, merged_file):
+        with open(gaf_path) as gaf_file:
+            while True:
+                lines = gaf_file.readlines(chunk_size)
+                if not lines:
+                    break
+                merged_file.writelines(line if line.endswith("\n") else line + "\n"
+                                       for line in lines if not line.startswith("!"))
 
     def make_mixin_header(header_lines, path):
         the_header = [
@@ -412,20 +456,12 @@ def merge_all_mixin_gaf_into_mod_gaf(valid_gaf_path, mixin_gaf_paths):
     # Set up merged final gaf product path
     dirs, name = os.path.split(valid_gaf_path)
     merged_path = os.path.join(dirs, "{}.gaf".format(name.rsplit("_", maxsplit=1)[0]))
-    valid_header = []
-    annotations = []
-    with open(valid_gaf_path) as valid_file:
-        valid_header, annotations = header_and_annotations(valid_file)
 
     mixin_headers = []
     for mixin_gaf_path in mixin_gaf_paths:
-        with open(mixin_gaf_path) as mixin_file:
-            mixin_header, mixin_annotations = header_and_annotations(mixin_file)
-
-            mixin_headers += make_mixin_header(mixin_header, mixin_gaf_path)
-            annotations += mixin_annotations
+        mixin_headers += make_mixin_header(header(mixin_gaf_path), mixin_gaf_path)
 
-    full_header = valid_header + \
+    full_header = header(valid_gaf_path) + \
     [
         "!=================================",
         "!"
@@ -436,15 +472,16 @@ def merge_all_mixin_gaf_into_mod_gaf(valid_gaf_path, mixin_gaf_paths):
         "!Documentation about this header can be found here: https://github.com/geneontology/go-site/blob/master/docs/gaf_validation.md",
         "!"
     ]
-    all_lines = full_header + annotations
 
-    with open(merged_path, "w") as merged_file:
-        merged_file.write("\n".join(all_lines))
+    with tools.gzip_tee(open(merged_path, "w"), compresslevel=compresslevel, threads=compress_threads) as merged_file:
+        merged_file.write("\n".join(full_header) + "\n")
+        for gaf_path in [valid_gaf_path] + mixin_gaf_paths:
+            copy_annotations(gaf_path, merged_file)
 
     return merged_path
 
 
-def mixin_a_dataset(valid_gaf, mixin_metadata_list, group_id, dataset, target, ontology, gpipaths=None, base_download_url=None, rule_metadata={}, replace_existing_files=True, rule_contexts=[], gaf_output_version="2.2"):
+def mixin_a_dataset(valid_gaf, mixin_metadata_list, group_id, dataset, target, ontology, gpipaths=None, base_download_url=None, rule_metadata={}, replace_existing_files=True, rule_contexts=[], gaf_output_version="2.2", sinks=None, compresslevel=gzipsink.DEFAULT_COMPRESSLEVEL, compress_threads=1):
 
     end_gaf = valid_gaf
     mixin_gaf_paths = []
@@ -456,12 +493,12 @@ def mixin_a_dataset(valid_gaf, mixin_metadata_list, group_id, dataset, target, o
             mixin_dataset_id = mixin_dataset_metadata["dataset"]
             format = mixin_dataset_metadata["type"]
             context = ["import"] if mixin_metadata.get("import", False) else []
-            mixin_gaf = produce_gaf(mixin_dataset_id, mixin_src, ontology, gpipaths=gpipaths, paint=True, group=mixin_metadata["id"], rule_metadata=rule_metadata, format=format, rule_contexts=context, gaf_output_version=gaf_output_version)[0]
+            mixin_gaf = produce_gaf(mixin_dataset_id, mixin_src, ontology, gpipaths=gpipaths, paint=True, group=mixin_metadata["id"], rule_metadata=rule_metadata, format=format, rule_contexts=context, gaf_output_version=gaf_output_version, sinks=sinks, compresslevel=compresslevel, compress_threads=compress_threads)[0]
             mixin_gaf_paths.append(mixin_gaf)
 
     if mixin_gaf_paths:
         # If we found and processed any mixin gafs, then lets merge them.
-        end_gaf = merge_all_mixin_gaf_into_mod_gaf(valid_gaf, mixin_gaf_paths)
+        end_gaf = merge_all_mixin_gaf_into_mod_gaf(valid_gaf, mixin_gaf_paths, compresslevel=compresslevel, compress_threads=compress_threads)
     else:
         gafgz = "{}.gz".format(valid_gaf)
         shutil.copyfile(gafgz, os.path.join(os.path.split(gafgz)[0], "{}.gaf.gz".format(dataset)))
@@ -492,7 +529,12 @@ def cli(ctx, verbose):
 @click.option("--only-dataset", default=None)
 @click.option("--gaf-output-version", default="2.2", type=click.Choice(["2.1", "2.2"]))
 @click.option("--rule-set", "-l", "rule_set", default=[assocparser.RuleSet.ALL], multiple=True)
-def produce(ctx, group, metadata_dir, gpad, ttl, target, ontology, exclude, base_download_url, suppress_rule_reporting_tag, skip_existing_files, gaferencer_file, only_dataset, gaf_output_version, rule_set):
+@click.option("--workers", "-w", default=1, type=int, help="Number of processes used to parse and validate each source file")
+@click.option("--report-examples", default=None, type=int, help="Keep only this many example messages of each type for each rule in the reports, while still counting all of them")
+@click.option("--single-pass", is_flag=True, default=False, help="Make the GPI, GPAD and TTL products from the associations as they are validated, rather than by parsing the validated gaf again. The products then also keep annotations that parsing the written gaf again would reject, such as GAF 2.2 lines with no qualifier")
+@click.option("--compress-level", default=gzipsink.DEFAULT_COMPRESSLEVEL, type=click.IntRange(1, 9), help="gzip compression level of the products")
+@click.option("--compress-threads", default=1, type=int, help="Threads used to gzip each product, if pigz is installed")
+def produce(ctx, group, metadata_dir, gpad, ttl, target, ontology, exclude, base_download_url, suppress_rule_reporting_tag, skip_existing_files, gaferencer_file, only_dataset, gaf_output_version, rule_set, workers, report_examples, single_pass, compress_level, compress_threads):
 
     logger.info("Logging is verbose")
     products = {
@@ -511,7 +553,8 @@ def produce(ctx, group, metadata_dir, gpad, ttl, target, ontology, exclude, base
     click.echo("Loading ontology: {}...".format(ontology))
     ontology_graph = OntologyFactory().create(ontology, ignore_cache=True)
 
-    downloaded_gaf_sources = download_source_gafs(group_metadata, absolute_target, exclusions=exclude, base_download_url=base_download_url, replace_existing_files=not skip_existing_files, only_dataset=only_dataset)
+    downloaded_gaf_sources = download_source_gafs(group_metadata, absolute_target, exclusions=exclude, base_download_url=base_download_url, replace_existing_files=not skip_existing_files, only_dataset=only_dataset,
+                                                  compresslevel=compress_level, compress_threads=compress_threads)
 
     # extract the titles for the go rules, this is a dictionary comprehension
     rule_metadata = metadata.yamldown_lookup(os.path.join(absolute_metadata, "rules"))
@@ -538,43 +581,76 @@ def produce(ctx, group, metadata_dir, gpad, ttl, target, ontology, exclude, base
 
     for dataset_metadata, source_gaf in downloaded_gaf_sources:
         dataset = dataset_metadata["dataset"]
-        # Set paint to True when the group is "paint".
-        # This will prevent filtering of IBA (GO_RULE:26) when paint is being treated as a top level group,
-        # like for paint_other.
-        valid_gaf = produce_gaf(dataset, source_gaf, ontology_graph,
-            paint=(group=="paint"),
-            group=group,
-            rule_metadata=rule_metadata,
-            goref_metadata=goref_metadata,
-            db_entities=db_entities,
-            group_idspace=group_ids,
-            suppress_rule_reporting_tags=suppress_rule_reporting_tag,
-            annotation_inferences=gaferences,
-            group_metadata=group_metadata,
-            extensions_constraints=extensions_constraints,
-            rule_contexts=["import"] if dataset_metadata.get("import", False) else [],
-            gaf_output_version=gaf_output_version,
-            rule_set=rule_set
-            )[0]
-
-        gpi = produce_gpi(dataset, absolute_target, valid_gaf, ontology_graph)
-
-        gpi_list = [gpi]
-        # Try to find other GPIs in metadata and merge
-        for ds in group_metadata["datasets"]:
-            # Where type=GPI for the same dataset (e.g. "zfin", "goa_cow")
-            if ds["type"] == "gpi" and ds["dataset"] == dataset and ds.get("source"):
-                matching_gpi_path = download_a_dataset_source(group, ds, absolute_target, ds["source"],
-                                                              replace_existing_files=not skip_existing_files)
-                if ds.get("compression", None) == "gzip":
-                    matching_gpi_path = unzip_simple(matching_gpi_path)
-                gpi_list.append(matching_gpi_path)
-
-        end_gaf = mixin_a_dataset(valid_gaf, mixin_metadata_list, group_metadata["id"], dataset, absolute_target,
-                                  ontology_graph, gpipaths=gpi_list, base_download_url=base_download_url,
-                                  rule_metadata=rule_metadata, replace_existing_files=not skip_existing_files,
-                                  gaf_output_version=gaf_output_version)
-        make_products(dataset, absolute_target, end_gaf, products, ontology_graph)
+        sinks = None
+        gpi_file = None
+        product_writers = None
+        try:
+            if single_pass:
+                products_dir = os.path.split(source_gaf)[0]
+                gpi = os.path.join(products_dir, "{}.gpi".format(dataset))
+                gpi_file = tools.gzip_tee(open(gpi, "w"), compresslevel=compress_level, threads=compress_threads)
+                product_writers = ProductWriters(dataset, products_dir, products,
+                                                 compresslevel=compress_level, compress_threads=compress_threads)
+                sinks = [gpi_writer(gpi_file), product_writers.write]
+
+            # Set paint to True when the group is "paint".
+            # This will prevent filtering of IBA (GO_RULE:26) when paint is being treated as a top level group,
+            # like for paint_other.
+            valid_gaf = produce_gaf(dataset, source_gaf, ontology_graph,
+                paint=(group=="paint"),
+                group=group,
+                rule_metadata=rule_metadata,
+                goref_metadata=goref_metadata,
+                db_entities=db_entities,
+                group_idspace=group_ids,
+                suppress_rule_reporting_tags=suppress_rule_reporting_tag,
+                annotation_inferences=gaferences,
+                group_metadata=group_metadata,
+                extensions_constraints=extensions_constraints,
+                rule_contexts=["import"] if dataset_metadata.get("import", False) else [],
+                gaf_output_version=gaf_output_version,
+                rule_set=rule_set,
+                workers=workers,
+                report_examples=report_examples,
+                sinks=sinks,
+                compresslevel=compress_level,
+                compress_threads=compress_threads
+                )[0]
+
+            if single_pass:
+                # The gpi is read back when validating the mixins
+                gpi_file.close()
+                # Mixin associations only go into the gpad and ttl products, as with make_products
+                sinks = [product_writers.write]
+            else:
+                gpi = produce_gpi(dataset, absolute_target, valid_gaf, ontology_graph,
+                                  compresslevel=compress_level, compress_threads=compress_threads)
+
+            gpi_list = [gpi]
+            # Try to find other GPIs in metadata and merge
+            for ds in group_metadata["datasets"]:
+                # Where type=GPI for the same dataset (e.g. "zfin", "goa_cow")
+                if ds["type"] == "gpi" and ds["dataset"] == dataset and ds.get("source"):
+                    matching_gpi_path = download_a_dataset_source(group, ds, absolute_target, ds["source"],
+                                                                  replace_existing_files=not skip_existing_files)
+                    if ds.get("compression", None) == "gzip":
+                        matching_gpi_path = unzip_simple(matching_gpi_path)
+                    gpi_list.append(matching_gpi_path)
+
+            end_gaf = mixin_a_dataset(valid_gaf, mixin_metadata_list, group_metadata["id"], dataset, absolute_target,
+                                      ontology_graph, gpipaths=gpi_list, base_download_url=base_download_url,
+                                      rule_metadata=rule_metadata, replace_existing_files=not skip_existing_files,
+                                      gaf_output_version=gaf_output_version, sinks=sinks,
+                                      compresslevel=compress_level, compress_threads=compress_threads)
+        finally:
+            if gpi_file is not None:
+                gpi_file.close()
+            if product_writers is not None:
+                product_writers.close()
+
+        if not single_pass:
+            make_products(dataset, absolute_target, end_gaf, products, ontology_graph,
+                          compresslevel=compress_level, compress_threads=compress_threads)
 
 
 @cli.command()
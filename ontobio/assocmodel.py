@@ -13,8 +13,12 @@ taxa of interest or evidence criteria.
 
 """
 import logging
+from array import array
+from collections.abc import Mapping
+import numpy as np
 import scipy.stats # TODO - move
 import scipy as sp # TODO - move
+from scipy import sparse
 import pandas as pd
 
 logger = logging.getLogger(__name__)
@@ -32,7 +36,7 @@ class AssociationSet():
 
     """
 
-    def __init__(self, ontology=None, association_map=None, subject_label_map=None, meta=None):
+    def __init__(self, ontology=None, association_map=None, subject_label_map=None, meta=None, compact=False):
         """
         NOTE: in general you do not need to call this yourself. See assoc_factory
 
@@ -41,25 +45,33 @@ class AssociationSet():
          - an ontology (e.g. GO, HP)
          - a map between subjects (e.g genes) and sets/lists of term IDs
 
+        Inferred types are only held in the :class:`InferredTypeIndex`;
+        `inferred_types` builds each set on request. If compact is True,
+        subject_to_inferred_map is left empty, otherwise it is a read-only
+        :class:`InferredTypeMap` view of the index.
+
         """
         self.ontology = ontology
         self.association_map = association_map
         self.subject_label_map = subject_label_map
         self.subject_to_inferred_map = {}
+        self.inferred_index = None
+        self._background_cache = None
+        self.compact = compact
         self.meta = meta  # TODO
         self.associations_by_subj = None
         self.associations_by_subj_obj = None
         self.strict = False
-        self.index()
 
         if self.association_map is None:
             self.association_map = {}
 
+        self.index()
+
         logger.info("Created {}".format(self))
 
     def __str__(self):
-        imap = self.subject_to_inferred_map
-        return "AssocSet |S|={} |S->I|={}".format(len(imap.keys()), len(imap.items()))
+        return "AssocSet |S|={} |S->I|={}".format(len(self.subjects), len(self.objects))
 
     def index(self):
         """
@@ -74,18 +86,13 @@ class AssociationSet():
             self.association_map[subj] = list(set(self.association_map[subj]))
             
         logger.info("Indexing {} items".format(len(self.subjects)))
-        n = 0
-        all_objs = set()
-        for (subj,terms) in self.association_map.items():
-            ancs = self.termset_ancestors(terms)
-            all_objs.update(ancs)
-            self.subject_to_inferred_map[subj] = ancs
-            n = n+1
-            if n<5:
-                logger.debug(" Indexed: {} -> {}".format(subj, ancs))
-            elif n == 6:
-                logger.info("[TRUNCATING>5]....")
-        self.objects = all_objs
+        ix = InferredTypeIndex.from_association_map(self.association_map, self.ontology)
+        self.inferred_index = ix
+        self._background_cache = None
+        self.subject_to_inferred_map = {} if self.compact else InferredTypeMap(ix)
+        for subj in self.subjects[:5]:
+            logger.debug(" Indexed: {} -> {}".format(subj, ix.inferred_types(subj)))
+        self.objects = set(ix.terms)
 
     def inferred_types(self, subj):
         """
@@ -102,8 +109,8 @@ class AssociationSet():
         Returns: set of class IDs
 
         """
-        if subj in self.subject_to_inferred_map:
-            return self.subject_to_inferred_map[subj]
+        if subj in self.inferred_index.subject_index:
+            return self.inferred_index.inferred_types(subj)
         if self.strict:
             raise UnknownSubjectException(subj)
         else:
@@ -216,17 +223,15 @@ class AssociationSet():
         matches_all = 'owl:Thing' in terms
         if negated_terms is None:
             negated_terms = []
-        termset = set(terms)
-        negated_termset = set(negated_terms)
-        matches = []
-        n_terms = len(termset)
-        for subj in self.subjects:
-            if matches_all or len(termset.intersection(self.inferred_types(subj))) == n_terms:
-                if len(negated_termset.intersection(self.inferred_types(subj))) == 0:
-                    matches.append(subj)
-        return matches
-
-    def query_intersections(self, x_terms=None, y_terms=None, symmetric=False):
+        ix = self.inferred_index
+        if matches_all:
+            mask = ix.subjects_with_any([], negate=True)
+        else:
+            mask = ix.subjects_with_all(set(terms))
+        mask &= ix.subjects_with_any(set(negated_terms), negate=True)
+        return [ix.subjects[i] for i in np.flatnonzero(mask)]
+
+    def query_intersections(self, x_terms=None, y_terms=None, symmetric=False, include_shared=True):
         """
         Query for intersections of terms in two lists
 
@@ -235,37 +240,33 @@ class AssociationSet():
          - y : term from y
          - c : count of intersection
          - j : jaccard score
+         - shared : set of subjects in the intersection (only if include_shared is True)
+
+        Counts come from a single sparse product of the subject x term
+        columns for each list; pass include_shared=False for large term
+        lists to avoid building a set for every pair.
         """
         if x_terms is None:
             x_terms = []
         if y_terms is None:
             y_terms = []
-        xset = set(x_terms)
-        yset = set(y_terms)
-        zset = xset.union(yset)
+        ix = self.inferred_index
+        (shared_counts, jm) = ix.term_intersections(x_terms, y_terms)
 
-        # first built map of gene->termClosure.
-        # this could be calculated ahead of time for all g,
-        # but this may be space-expensive. TODO: benchmark
         gmap={}
-        for z in zset:
-            gmap[z] = []
-        for subj in self.subjects:
-            ancs = self.inferred_types(subj)
-            for a in ancs.intersection(zset):
-                gmap[a].append(subj)
-        for z in zset:
-            gmap[z] = set(gmap[z])
+        if include_shared:
+            zterms = list(set(x_terms).union(y_terms))
+            cols = ix.select_terms(zterms).tocsc()
+            for (n, z) in enumerate(zterms):
+                gmap[z] = set(ix.subjects[i] for i in cols.indices[cols.indptr[n]:cols.indptr[n+1]])
         ilist = []
-        for x in x_terms:
-            for y in y_terms:
+        for (xi, x) in enumerate(x_terms):
+            for (yi, y) in enumerate(y_terms):
                 if not symmetric or x<y:
-                    shared = gmap[x].intersection(gmap[y])
-                    union = gmap[x].union(gmap[y])
-                    j = 0
-                    if len(union)>0:
-                        j = len(shared) / len(union)
-                    ilist.append({'x':x,'y':y,'shared':shared, 'c':len(shared), 'j':j})
+                    r = {'x':x,'y':y, 'c':int(shared_counts[xi, yi]), 'j':float(jm[xi, yi])}
+                    if include_shared:
+                        r['shared'] = gmap[x].intersection(gmap[y])
+                    ilist.append(r)
         return ilist
 
     @staticmethod
@@ -387,79 +388,113 @@ class AssociationSet():
         """
         if subjects is None:
             subjects = []
+        return self.batch_enrichment_test([subjects], background=background, hypotheses=hypotheses,
+                                          threshold=threshold, labels=labels, direction=direction)[0]
+
+    def batch_enrichment_test(self, samples, background=None, hypotheses=None, threshold=0.05, labels=False, direction='greater'):
+        """
+        Performs term enrichment analysis for many samples against the same background
+
+        Arguments are as for `enrichment_test`, except that samples is a list of
+        sample sets. Returns a list of results, one per sample.
+
+        Background counts are computed once per call (and cached between calls),
+        sample counts for all samples come from one sparse product, and the
+        p-values for each sample are computed as arrays using the
+        hypergeometric distribution.
+        """
+        ix = self.inferred_index
+        samples = [set(subjects) for subjects in samples]
+        sample_counts = ix.group_counts(samples)
 
-        subjects=set(subjects)
-        bg_count = {}
-        sample_count = {}
-        potential_hypotheses = set()
-        sample_size = len(subjects)
-        for s in subjects:
-            potential_hypotheses.update(self.inferred_types(s))
-        if hypotheses is None:
-            hypotheses = potential_hypotheses
-        else:
-            hypotheses = potential_hypotheses.intersection(hypotheses)
-        logger.info("Hypotheses: {}".format(hypotheses))
-        
         # get background counts
-        # TODO: consider doing this ahead of time
         if background is None:
-            background = set(self.subjects)
+            bg_count = ix.total_counts()
         else:
             background = set(background)
+            bg_count = self._background_counts(background)
+
+        hypothesis_cols = None
+        if hypotheses is not None:
+            hypothesis_cols = np.array([ix.term_index[h] for h in set(hypotheses) if h in ix.term_index], dtype=np.int32)
 
-        # ensure background includes all subjects
-        background.update(subjects)
-        
-        bg_size = len(background)
-        
-        for c in hypotheses:
-            bg_count[c] = 0
-            sample_count[c] = 0
-        for s in background:
-            ancs = self.inferred_types(s)
-            for a in ancs.intersection(hypotheses):
-                bg_count[a] = bg_count[a]+1
-        for s in subjects:
-            for a in self.inferred_types(s):
-                if a in hypotheses:
-                    sample_count[a] = sample_count[a]+1
-
-        hypotheses = [x for x in hypotheses if bg_count[x] > 1]
-        logger.info("Filtered hypotheses: {}".format(hypotheses))
-        num_hypotheses = len(hypotheses)
-                
         results = []
-        for cls in hypotheses:
-            
-            # https://en.wikipedia.org/wiki/Fisher's_exact_test
-            #
-            #              Cls  NotCls    RowTotal
-            #              ---  ------    ---
-            # study/sample [a,      b]    sample_size
-            # rest of ref  [c,      d]    bg_size - sample_size
-            #              ---     ---
-            #              nCls  nNotCls
-
-            a = sample_count[cls]
-            b = sample_size - a
-            c = bg_count[cls] - a
-            d = (bg_size - bg_count[cls]) - b
-            #logger.debug("ABCD="+str((cls,a,b,c,d,sample_size)))
-            _, p_uncorrected = sp.stats.fisher_exact( [[a, b], [c, d]], direction)
-            p = p_uncorrected * num_hypotheses
-            if p>1.0:
-                p=1.0
-            #logger.debug("P={} uncorrected={}".format(p,p_uncorrected))
-            if p<threshold:
-                res = {'c':cls,'p':p,'p_uncorrected':p_uncorrected}
+        for (i, subjects) in enumerate(samples):
+            sample_size = len(subjects)
+            row = sample_counts.getrow(i)
+            cols = row.indices
+            a = row.data.astype(np.int64)
+            if hypothesis_cols is not None:
+                keep = np.isin(cols, hypothesis_cols)
+                cols = cols[keep]
+                a = a[keep]
+            logger.info("Hypotheses: {}".format(len(cols)))
+
+            # ensure background includes all subjects
+            if background is None:
+                extra = [s for s in subjects if s not in ix.subject_index]
+                n = bg_count[cols]
+            else:
+                extra = subjects.difference(background)
+                n = bg_count[cols] + ix.term_counts(extra)[cols]
+            bg_size = (len(ix.subjects) if background is None else len(background)) + len(extra)
+
+            keep = n > 1
+            cols = cols[keep]
+            a = a[keep]
+            n = n[keep].astype(np.int64)
+            num_hypotheses = len(cols)
+            logger.info("Filtered hypotheses: {}".format(num_hypotheses))
+
+            p_uncorrected = self._enrichment_pvalues(a, n, sample_size, bg_size, direction)
+            p = np.minimum(p_uncorrected * num_hypotheses, 1.0)
+            sample_results = []
+            for j in np.flatnonzero(p < threshold):
+                cls = ix.terms[cols[j]]
+                res = {'c':cls,'p':float(p[j]),'p_uncorrected':float(p_uncorrected[j])}
                 if labels:
                     res['n'] = self.ontology.label(cls)
-                results.append(res)
-            
-        results = sorted(results, key=lambda x:x['p'])
+                sample_results.append(res)
+            results.append(sorted(sample_results, key=lambda x:x['p']))
         return results
-            
+
+    def _background_counts(self, background):
+        # counts are cached for the most recently used explicit background
+        key = frozenset(background)
+        if self._background_cache is None or self._background_cache[0] != key:
+            self._background_cache = (key, self.inferred_index.term_counts(key))
+        return self._background_cache[1]
+
+    @staticmethod
+    def _enrichment_pvalues(a, n, sample_size, bg_size, direction):
+        """
+        Fisher exact test p-values for arrays of sample and background counts
+
+        https://en.wikipedia.org/wiki/Fisher's_exact_test
+
+        ::
+
+                         Cls  NotCls    RowTotal
+                         ---  ------    ---
+            study/sample [a,      b]    sample_size
+            rest of ref  [c,      d]    bg_size - sample_size
+                         ---     ---
+                         n    bg_size-n
+
+        One-sided tests use the hypergeometric distribution directly;
+        two-sided tests fall back to scipy.stats.fisher_exact per class.
+        """
+        if direction == 'greater':
+            p = sp.stats.hypergeom.sf(a - 1, bg_size, sample_size, n)
+        elif direction == 'less':
+            p = sp.stats.hypergeom.cdf(a, bg_size, sample_size, n)
+        else:
+            p = np.array([sp.stats.fisher_exact([[x, sample_size - x], [y - x, bg_size - y - sample_size + x]], direction)[1]
+                          for (x, y) in zip(a, n)], dtype=float)
+        # a zero margin in the contingency table gives p=1, as for fisher_exact
+        p = np.where((n == bg_size) | (sample_size == bg_size), 1.0, p)
+        return np.minimum(p, 1.0)
+
     def jaccard_similarity(self,s1,s2):
         """
         Calculate jaccard index of inferred associations of two subjects
@@ -469,50 +504,323 @@ class AssociationSet():
         |ancs(s1) \/ ancs(s2)|
 
         """
-        a1 = self.inferred_types(s1)
-        a2 = self.inferred_types(s2)
-        num_union = len(a1.union(a2))
-        if num_union == 0:
-            return 0.0
-        return len(a1.intersection(a2)) / num_union
+        if self.strict:
+            for s in (s1, s2):
+                if s not in self.inferred_index.subject_index:
+                    raise UnknownSubjectException(s)
+        return self.inferred_index.jaccard_similarity(s1, s2)
 
     def similarity_matrix(self, x_subjects=None, y_subjects=None, symmetric=False):
         """
         Query for similarity matrix between groups of subjects
 
-        Return a list of intersection result objects with keys:
-         - x : term from x
-         - y : term from y
-         - c : count of intersection
-         - j : jaccard score
+        Return a tuple (z, x_subjects, y_subjects), where z[i][j] is the jaccard score
+        between y_subjects[i] and x_subjects[j]. If symmetric is true, only pairs where
+        x<y are scored.
+
+        All scores come from one sparse product of the subject rows of the
+        inferred-type index; for large groups see `similarity_top_k`.
         """
         if x_subjects is None:
             x_subjects = []
         if y_subjects is None:
             y_subjects = []
 
-        xset = set(x_subjects)
-        yset = set(y_subjects)
-        zset = xset.union(yset)
+        jm = self.inferred_index.jaccard_matrix(x_subjects, y_subjects)
+        if symmetric and len(jm) > 0:
+            jm = np.where(np.less.outer(np.array(x_subjects, dtype=object), np.array(y_subjects, dtype=object)), jm, 0.0)
+        return (jm.T.tolist(), x_subjects, y_subjects)
 
-        # first built map of gene->termClosure.
-        # this could be calculated ahead of time for all g,
-        # but this may be space-expensive. TODO: benchmark
-        gmap={}
-        for z in zset:
-            gmap[z] = self.inferred_types(z)
-        ilist = []
-        for x in x_subjects:
-            for y in y_subjects:
-                if not symmetric or x<y:
-                    shared = gmap[x].intersection(gmap[y])
-                    union = gmap[x].union(gmap[y])
-                    j = 0
-                    if len(union)>0:
-                        j = len(shared) / len(union)
-                    ilist.append({'x':x,'y':y,'shared':shared, 'c':len(shared), 'j':j})
-        return self.intersectionlist_to_matrix(ilist, x_subjects, y_subjects)
-    
+    def similarity_top_k(self, x_subjects=None, y_subjects=None, k=10, exclude_self=True):
+        """
+        Query for the most similar subjects for each of a group of subjects
+
+        Unlike `similarity_matrix`, the full matrix is never materialized,
+        so this can be used for all-by-all comparisons of every subject in
+        the association set.
+
+        Arguments
+        ---------
+        x_subjects: list
+            subjects to find matches for. Defaults to all subjects
+        y_subjects: list
+            candidate matches. Defaults to all subjects
+        k: int
+            maximum number of matches per subject
+        exclude_self: bool
+            if true, a subject is not reported as a match for itself
+
+        Return a list of result objects with keys x, y, c (count of shared inferred types) and j (jaccard score),
+        ordered by x then descending j
+        """
+        if x_subjects is None:
+            x_subjects = self.subjects
+        if y_subjects is None:
+            y_subjects = self.subjects
+        results = []
+        for (xi, matches) in self.inferred_index.top_k_similar(x_subjects, y_subjects, k, exclude_self=exclude_self):
+            x = x_subjects[xi]
+            for (yi, c, j) in matches:
+                results.append({'x':x, 'y':y_subjects[yi], 'c':c, 'j':j})
+        return results
+
+
+class InferredTypeMap(Mapping):
+    """
+    Read-only map between each subject and its set of reflexive inferred types,
+    built on request from an :class:`InferredTypeIndex`
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+    def __getitem__(self, subj):
+        if subj not in self.index.subject_index:
+            raise KeyError(subj)
+        return self.index.inferred_types(subj)
+
+    def __contains__(self, subj):
+        return subj in self.index.subject_index
+
+    def __iter__(self):
+        return iter(self.index.subjects)
+
+    def __len__(self):
+        return len(self.index.subjects)
+
+
+class InferredTypeIndex():
+    """
+    Reflexive inferred types of every subject, as a sparse boolean matrix
+
+    Subjects and terms are interned to integers, and row i of the CSR
+    matrix holds the closure of the classes directly associated with
+    subject i. Closures are computed once per distinct class and combined
+    with a single sparse product, rather than as a Python set per subject.
+
+    Built by :meth:`AssociationSet.index`
+    """
+
+    def __init__(self, subjects, terms, matrix):
+        """
+        Arguments
+        ---------
+        subjects : list
+            subject IDs; the position of each ID is its row
+        terms : list
+            class IDs; the position of each ID is its column
+        matrix : scipy.sparse.csr_matrix
+            boolean subjects x terms matrix
+        """
+        self.subjects = subjects
+        self.terms = terms
+        self.subject_index = {s: i for (i, s) in enumerate(subjects)}
+        self.term_index = {t: i for (i, t) in enumerate(terms)}
+        self.matrix = matrix
+        self._csc = None
+        self._total_counts = None
+
+    @staticmethod
+    def from_association_map(association_map, ontology=None):
+        """
+        Build an index from a map between subjects and lists of directly associated class IDs
+        """
+        subjects = list(association_map.keys())
+        direct = {}
+        d_rows, d_cols = array('i'), array('i')
+        for (i, subj) in enumerate(subjects):
+            for t in set(association_map[subj]):
+                d_rows.append(i)
+                d_cols.append(direct.setdefault(t, len(direct)))
+
+        terms = []
+        term_index = {}
+        c_rows, c_cols = array('i'), array('i')
+        for (t, j) in direct.items():
+            ancs = [t]
+            if ontology is not None:
+                ancs += ontology.ancestors(t)
+            for a in ancs:
+                k = term_index.get(a)
+                if k is None:
+                    k = term_index[a] = len(terms)
+                    terms.append(a)
+                c_rows.append(j)
+                c_cols.append(k)
+
+        d = InferredTypeIndex._incidence(d_rows, d_cols, (len(subjects), len(direct)))
+        c = InferredTypeIndex._incidence(c_rows, c_cols, (len(direct), len(terms)))
+        matrix = (d @ c).astype(bool)
+        matrix.sort_indices()
+        return InferredTypeIndex(subjects, terms, matrix)
+
+    @staticmethod
+    def _incidence(rows, cols, shape):
+        data = np.ones(len(rows), dtype=np.int32)
+        return sparse.csr_matrix((data, (np.asarray(rows), np.asarray(cols))), shape=shape)
+
+    def _row(self, subj):
+        i = self.subject_index.get(subj)
+        if i is None:
+            return self.matrix.indices[:0]
+        m = self.matrix
+        return m.indices[m.indptr[i]:m.indptr[i+1]]
+
+    def _columns(self):
+        if self._csc is None:
+            self._csc = self.matrix.tocsc()
+        return self._csc
+
+    def inferred_types(self, subj):
+        """
+        Returns the set of inferred class IDs for a subject; empty if the subject is unknown
+        """
+        terms = self.terms
+        return set(terms[k] for k in self._row(subj))
+
+    def select(self, subjects):
+        """
+        Returns the rows for a list of subjects as a sparse int matrix; unknown subjects are empty rows
+        """
+        return self.group_counts([[s] for s in subjects])
+
+    def group_counts(self, groups):
+        """
+        Returns a sparse len(groups) x terms matrix, counting the subjects in each group inferred to have each term
+
+        Unknown subjects are ignored
+        """
+        rows, cols = array('i'), array('i')
+        for (n, group) in enumerate(groups):
+            for s in group:
+                i = self.subject_index.get(s)
+                if i is not None:
+                    rows.append(n)
+                    cols.append(i)
+        sel = self._incidence(rows, cols, (len(groups), len(self.subjects)))
+        counts = sel @ self.matrix.astype(np.int32)
+        counts.eliminate_zeros()
+        return counts
+
+    def term_counts(self, subjects):
+        """
+        Returns an array with the number of the given subjects inferred to have each term
+        """
+        return np.asarray(self.group_counts([subjects]).sum(axis=0)).ravel()
+
+    def total_counts(self):
+        """
+        Returns an array with the number of subjects inferred to have each term
+        """
+        if self._total_counts is None:
+            self._total_counts = np.asarray(self.matrix.sum(axis=0)).ravel()
+        return self._total_counts
+
+    def subjects_with_all(self, terms):
+        """
+        Returns a boolean mask over subjects that are inferred to have every one of terms
+        """
+        cols = [self.term_index.get(t) for t in terms]
+        if None in cols:
+            return np.zeros(len(self.subjects), dtype=bool)
+        counts = np.asarray(self._columns()[:, cols].sum(axis=1)).ravel()
+        return counts == len(cols)
+
+    def subjects_with_any(self, terms, negate=False):
+        """
+        Returns a boolean mask over subjects that are inferred to have at least one of terms
+
+        If negate is True, the mask is of subjects that have none of them
+        """
+        cols = [self.term_index[t] for t in terms if t in self.term_index]
+        counts = np.asarray(self._columns()[:, cols].sum(axis=1)).ravel()
+        return (counts == 0) if negate else (counts > 0)
+
+    def jaccard_similarity(self, s1, s2):
+        """
+        Jaccard index of the inferred types of two subjects
+        """
+        r1 = self._row(s1)
+        r2 = self._row(s2)
+        num_shared = len(np.intersect1d(r1, r2, assume_unique=True))
+        num_union = len(r1) + len(r2) - num_shared
+        if num_union == 0:
+            return 0.0
+        return num_shared / num_union
+
+    def select_terms(self, terms):
+        """
+        Returns the columns for a list of terms as a sparse int subjects x terms matrix; unknown terms are empty columns
+        """
+        cols = [(n, self.term_index[t]) for (n, t) in enumerate(terms) if t in self.term_index]
+        sel = self._incidence(array('i', [k for (_, k) in cols]),
+                              array('i', [n for (n, _) in cols]),
+                              (len(self.terms), len(terms)))
+        return self.matrix.astype(np.int32) @ sel
+
+    @staticmethod
+    def _jaccard(shared, x_sizes, y_sizes):
+        union = np.add.outer(x_sizes, y_sizes) - shared
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(union > 0, shared / union, 0.0)
+
+    @staticmethod
+    def _sizes(m, axis):
+        return np.asarray(m.sum(axis=axis)).ravel()
+
+    def jaccard_matrix(self, x_subjects, y_subjects):
+        """
+        Returns a dense len(x_subjects) x len(y_subjects) array of jaccard indexes
+        """
+        x = self.select(x_subjects)
+        y = self.select(y_subjects)
+        shared = (x @ y.T).toarray()
+        return self._jaccard(shared, self._sizes(x, 1), self._sizes(y, 1))
+
+    def term_intersections(self, x_terms, y_terms):
+        """
+        Returns dense len(x_terms) x len(y_terms) arrays of shared subject counts and jaccard indexes
+        """
+        x = self.select_terms(x_terms)
+        y = self.select_terms(y_terms)
+        shared = (x.T @ y).toarray()
+        return (shared, self._jaccard(shared, self._sizes(x, 0), self._sizes(y, 0)))
+
+    def top_k_similar(self, x_subjects, y_subjects, k, exclude_self=True, chunk_size=256):
+        """
+        Yields the k subjects in y_subjects most similar to each subject in x_subjects
+
+        Rows of x_subjects are compared against all of y_subjects in chunks,
+        so at most chunk_size x len(y_subjects) scores are held at a time.
+        Pairs with no shared types are not reported.
+
+        Yields
+        ------
+        (x index, list of (y index, shared count, jaccard) tuples, best first)
+        """
+        x = self.select(x_subjects)
+        y = self.select(y_subjects)
+        y_t = y.T.tocsc()
+        x_sizes = self._sizes(x, 1)
+        y_sizes = self._sizes(y, 1)
+        y_positions = {}
+        for (n, s) in enumerate(y_subjects):
+            y_positions.setdefault(s, []).append(n)
+        k = min(k, len(y_subjects))
+        if k <= 0:
+            return
+        for start in range(0, len(x_subjects), chunk_size):
+            end = min(start + chunk_size, len(x_subjects))
+            shared = (x[start:end] @ y_t).toarray()
+            jm = self._jaccard(shared, x_sizes[start:end], y_sizes)
+            jm[shared == 0] = -1.0
+            if exclude_self:
+                for r in range(end - start):
+                    jm[r, y_positions.get(x_subjects[start + r], [])] = -1.0
+            top = np.argpartition(-jm, k - 1, axis=1)[:, :k]
+            for r in range(end - start):
+                cols = top[r][np.argsort(-jm[r, top[r]], kind='stable')]
+                yield (start + r, [(c, int(shared[r, c]), float(jm[r, c])) for c in cols if jm[r, c] >= 0])
 
 class NamedEntity():
     """
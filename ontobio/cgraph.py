@@ -1,77 +1,600 @@
+"""
+A compact, array-backed representation of an ontology graph
+
+Node IDs are interned to integers, node labels and metadata are held in
+parallel lists, and edges are stored as one pair of CSR (compressed sparse
+row) arrays per predicate. This uses a fraction of the memory of a
+networkx MultiDiGraph, and is suitable for large read-only ontologies.
+
+```
+Ontology
+  CompactOntology
+```
+
+See also:
+
+ - ontol.py
+ - ontol_factory.py
+
+"""
+
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+
+import networkx as nx
+import numpy as np
+
+from ontobio.ontol import Ontology, ClosureIndex, LogicalDefinition, PropertyChainAxiom
+
+logger = logging.getLogger(__name__)
+
+# incremented whenever the snapshot layout written by CompactOntology.save_snapshot changes
+SNAPSHOT_VERSION = 1
+
+
+class ReadOnlyOntologyError(TypeError):
+    """
+    Raised when a method that modifies the ontology is called on a :class:`CompactOntology`
+    """
+    pass
+
 
 class CompactGraph():
+    """
+    Read-only ontology graph with interned integer node IDs and per-predicate CSR adjacency
+
+    Supports the subset of the networkx API used by :class:`ontobio.obograph_util.OboJsonMapper`
+    when loading (`add_node`, `add_edge`), so a CompactGraph can be populated in
+    place of a MultiDiGraph. As with the ontology graph, edges passed to
+    `add_edge` are directed from parent to child. The CSR arrays are built on
+    the first query; edges cannot be added afterwards.
+    """
 
     def __init__(self, nodes=None, edges=None):
-        if nodes is None:
-            nodes = []
-        if edges is None:
-            edges = []
-
-        id2index = {}
-        label_arr = []
-        id_arr = []
-
-        e_by_p = {}
-        o_by_ps = {}
-        
-        i = 0
-
-            
-        # TODO: order nodes
-        # TODO: include undeclared
-        for n in nodes:
-            id = n.id
-            id2index[id] = i
-            i = i+1
-            id_arr.append(id)
-            label_arr.append(n.lbl)
-            
-        for e in edges:
-            ids = [e.sub,e.pred,e.obj]
-            for id in ids:
-                if id not in id2index:
-                    id2index[id] = i
-                    i = i+1
-                    id_arr.append(id)
-                    label_arr.append(id)
-            
-        for e in edges:
-            (s,p,o) = (e.sub,e.pred,e.obj)
-            (si,pi,oi) = (id2index[s],id2index[p],id2index[o])
-            if pi not in e_by_p:
-                e_by_p[pi] = []
-            e_by_p[pi].append((si,oi))
-            if pi not in o_by_ps:
-                o_by_ps[pi] = {}
-            if si not in o_by_ps[pi]:
-                o_by_ps[pi][si] = []
-            o_by_ps[pi][si].append(oi)
-
-        self.id2index = id2index
-        self.id_arr = id_arr
-        self.label_arr = label_arr
-        self.e_by_p = e_by_p
-        self.o_by_ps = o_by_ps
-
-    def parse(self):
-        print("TODO")
-        
-    def serialize(self):
+        """
+        Arguments
+        ---------
+        nodes : list
+            obograph node dicts, with keys id and (optionally) lbl, type and meta
+        edges : list
+            obograph edge dicts, with keys sub, pred, obj
+        """
+        self.id2index = {}
+        self.id_arr = []
+        self.label_arr = []
+        self.type_arr = []
+        self.meta_arr = []
+
+        # pending edges, as parallel arrays of parent and child indexes per predicate
+        self._edges_by_p = {}
+        # pred -> (indptr, indices). parents_by_p rows are children; children_by_p rows are parents
+        self.parents_by_p = None
+        self.children_by_p = None
+        self._union_cache = {}
+
+        if nodes is not None:
+            for n in nodes:
+                self.add_node(n['id'], label=n.get('lbl'), type=n.get('type'), meta=n.get('meta'))
+        if edges is not None:
+            for e in edges:
+                self.add_edge(e['obj'], e['sub'], pred=e['pred'])
+
+    def __len__(self):
+        return len(self.id_arr)
+
+    def __contains__(self, id):
+        return id in self.id2index
+
+    def _intern(self, id):
+        ix = self.id2index.get(id)
+        if ix is None:
+            ix = len(self.id_arr)
+            self.id2index[id] = ix
+            self.id_arr.append(id)
+            self.label_arr.append(None)
+            self.type_arr.append(None)
+            self.meta_arr.append(None)
+        return ix
+
+    def add_node(self, n, label=None, type=None, meta=None, **args):
+        """
+        Adds a node, or updates the label/type/meta of an existing node
+
+        Other node attributes are not retained
+        """
+        ix = self._intern(n)
+        if label is not None:
+            self.label_arr[ix] = label
+        if type is not None:
+            self.type_arr[ix] = type
+        if meta is not None:
+            self.meta_arr[ix] = meta
+
+    def add_edge(self, parent, child, pred=None, **args):
+        """
+        Adds an edge from parent to child. Edge metadata is not retained
+        """
+        if self.parents_by_p is not None:
+            raise ValueError("Cannot add edges to a CompactGraph after it has been queried")
+        (pi, ci) = (self._intern(parent), self._intern(child))
+        if pred not in self._edges_by_p:
+            self._edges_by_p[pred] = (array('i'), array('i'))
+        (parents, children) = self._edges_by_p[pred]
+        parents.append(pi)
+        children.append(ci)
+
+    def build(self):
+        """
+        Compile pending edges into CSR arrays
+
+        Called automatically on the first query
+        """
+        if self.parents_by_p is not None:
+            return
+        n = len(self.id_arr)
+        self.parents_by_p = {}
+        self.children_by_p = {}
+        for (pred, (parents, children)) in self._edges_by_p.items():
+            parents = np.frombuffer(parents, dtype=np.intc)
+            children = np.frombuffer(children, dtype=np.intc)
+            self.parents_by_p[pred] = _to_csr(children, parents, n)
+            self.children_by_p[pred] = _to_csr(parents, children, n)
+        self._edges_by_p = {}
+        logger.info("Built CSR for {} nodes, predicates: {}".format(n, list(self.parents_by_p.keys())))
+
+    def predicates(self):
+        """
+        Returns all predicates used in edges
+        """
+        self.build()
+        return list(self.parents_by_p.keys())
+
+    def _csr(self, up, relations):
+        """
+        Returns (indptr, indices) over the union of relations; rows are
+        children if up is True, otherwise parents
+        """
+        self.build()
+        by_p = self.parents_by_p if up else self.children_by_p
+        if relations is None:
+            preds = list(by_p.keys())
+        else:
+            preds = [p for p in relations if p in by_p]
+        if len(preds) == 1:
+            return by_p[preds[0]]
+        key = (up, frozenset(preds))
+        if key not in self._union_cache:
+            n = len(self.id_arr)
+            rows = [np.repeat(np.arange(n, dtype=np.intc), np.diff(by_p[p][0])) for p in preds]
+            cols = [by_p[p][1] for p in preds]
+            if len(preds) == 0:
+                rows, cols = [np.zeros(0, dtype=np.intc)], [np.zeros(0, dtype=np.intc)]
+            self._union_cache[key] = _to_csr(np.concatenate(rows), np.concatenate(cols), n)
+        return self._union_cache[key]
+
+    def _neighbors(self, up, id, relations):
+        ix = self.id2index.get(id)
+        if ix is None:
+            return []
+        (indptr, indices) = self._csr(up, relations)
+        id_arr = self.id_arr
+        return [id_arr[j] for j in indices[indptr[ix]:indptr[ix+1]].tolist()]
+
+    def _reachable(self, up, id, relations, reflexive):
+        ix = self.id2index.get(id)
+        if ix is None:
+            return [id] if reflexive else []
+        (indptr, indices) = self._csr(up, relations)
+        seen = {ix}
+        stack = [ix]
+        while len(stack) > 0:
+            i = stack.pop()
+            for j in indices[indptr[i]:indptr[i+1]].tolist():
+                if j not in seen:
+                    seen.add(j)
+                    stack.append(j)
+        if not reflexive:
+            seen.discard(ix)
+        id_arr = self.id_arr
+        return [id_arr[j] for j in seen]
+
+    def parents(self, id, relations=None):
+        return self._neighbors(True, id, relations)
+
+    def children(self, id, relations=None):
+        return self._neighbors(False, id, relations)
+
+    def ancestors(self, id, relations=None, reflexive=False):
+        return self._reachable(True, id, relations, reflexive)
+
+    def descendants(self, id, relations=None, reflexive=False):
+        return self._reachable(False, id, relations, reflexive)
+
+    def relations_between(self, child, parent):
+        """
+        Returns set of predicates connecting child to parent
+        """
+        (ci, pi) = (self.id2index.get(child), self.id2index.get(parent))
+        if ci is None or pi is None:
+            return set()
+        self.build()
+        preds = set()
+        for (pred, (indptr, indices)) in self.parents_by_p.items():
+            if pi in indices[indptr[ci]:indptr[ci+1]]:
+                preds.add(pred)
+        return preds
+
+    def edge_pairs(self, relations=None):
+        """
+        Returns list of (parent index, child index) tuples for a set of relations
+        """
+        (indptr, indices) = self._csr(False, relations)
+        rows = np.repeat(np.arange(len(self.id_arr), dtype=np.intc), np.diff(indptr))
+        return list(zip(rows.tolist(), indices.tolist()))
+
+    def to_networkx(self):
+        """
+        Returns an equivalent networkx MultiDiGraph, with edges from parent to child
+        """
+        self.build()
+        g = nx.MultiDiGraph()
+        for (ix, id) in enumerate(self.id_arr):
+            g.add_node(id, **self.node_data(ix))
+        for (pred, (indptr, indices)) in self.children_by_p.items():
+            rows = np.repeat(np.arange(len(self.id_arr)), np.diff(indptr))
+            for (pi, ci) in zip(rows.tolist(), indices.tolist()):
+                g.add_edge(self.id_arr[pi], self.id_arr[ci], pred=pred)
+        return g
+
+    def node_data(self, ix):
+        """
+        Returns attribute dict for a node index, in the form used by networkx-backed ontologies
+        """
+        d = {'id': self.id_arr[ix]}
+        if self.label_arr[ix] is not None:
+            d['label'] = self.label_arr[ix]
+            d['lbl'] = self.label_arr[ix]
+        if self.type_arr[ix] is not None:
+            d['type'] = self.type_arr[ix]
+        if self.meta_arr[ix] is not None:
+            d['meta'] = self.meta_arr[ix]
+        return d
+
+    def parse(self, file):
+        """
+        Populates the graph from the text format written by `serialize`
+        """
+        in_edges = False
+        pred = None
+        for line in file:
+            line = line.rstrip("\n")
+            if line == "#EDGES":
+                in_edges = True
+                continue
+            if not in_edges:
+                [id, lbl] = line.split("\t")
+                self.add_node(id, label=None if lbl == "None" else lbl)
+            elif line.startswith("#P:"):
+                pred = line[3:]
+            else:
+                toks = line.split("\t")
+                child = self.id_arr[int(toks[0])]
+                for o in toks[1:]:
+                    self.add_edge(self.id_arr[int(o)], child, pred=pred)
+
+    def serialize(self, file=None):
+        """
+        Writes nodes and per-predicate adjacency in a simple text format
+        """
+        if file is None:
+            file = sys.stdout
+        self.build()
         for id in self.id_arr:
             ix = self.id2index[id]
             lbl = self.label_arr[ix]
-            print("{}\t{}".format(id,lbl))
-        print("#EDGES")
-        for (pi,o_by_s) in self.o_by_ps.items():
-            print("#P:{}".format(pi))
-            for (s,olist) in o_by_s.items():
-                olist_str = "\t".join([str(x) for x in olist])
-                print("{}\t{}".format(str(s),olist_str))
-        #for (p,tuples) in self.e_by_p.items():
-        #    print("#P:{}",p)
-        #    for (s,o) in tuples:
-        #        print("{}\t{}".format(s,o))
-                  
-            
-            
+            file.write("{}\t{}\n".format(id,lbl))
+        file.write("#EDGES\n")
+        for (p,(indptr, indices)) in self.parents_by_p.items():
+            file.write("#P:{}\n".format(p))
+            for s in range(len(self.id_arr)):
+                olist = indices[indptr[s]:indptr[s+1]].tolist()
+                if len(olist) > 0:
+                    olist_str = "\t".join([str(x) for x in olist])
+                    file.write("{}\t{}\n".format(str(s),olist_str))
+
+    def save(self, dirname):
+        """
+        Writes the graph to a directory of flat files
+
+        Adjacency arrays are written as .npy files, node IDs as a newline
+        separated string table, and node meta as a blob of JSON values with
+        an offsets array. See `load`
+        """
+        self.build()
+        os.makedirs(dirname, exist_ok=True)
+        with open(os.path.join(dirname, 'ids.txt'), 'w', encoding='utf-8') as f:
+            f.write("\n".join(self.id_arr))
+        with open(os.path.join(dirname, 'labels.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.label_arr, f)
+        with open(os.path.join(dirname, 'types.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.type_arr, f)
+        offsets = np.zeros(len(self.id_arr) + 1, dtype=np.int64)
+        with open(os.path.join(dirname, 'meta.bin'), 'wb') as f:
+            for ix in range(len(self.id_arr)):
+                meta = self.meta_arr[ix]
+                b = b'' if meta is None else json.dumps(meta).encode('utf-8')
+                f.write(b)
+                offsets[ix + 1] = offsets[ix] + len(b)
+        np.save(os.path.join(dirname, 'meta_offsets.npy'), offsets)
+        preds = list(self.parents_by_p.keys())
+        with open(os.path.join(dirname, 'predicates.json'), 'w', encoding='utf-8') as f:
+            json.dump(preds, f)
+        for (k, pred) in enumerate(preds):
+            for (direction, by_p) in [('parents', self.parents_by_p), ('children', self.children_by_p)]:
+                (indptr, indices) = by_p[pred]
+                np.save(os.path.join(dirname, '{}.{}.indptr.npy'.format(k, direction)), indptr)
+                np.save(os.path.join(dirname, '{}.{}.indices.npy'.format(k, direction)), indices)
+
+    @staticmethod
+    def load(dirname, mmap_mode='r'):
+        """
+        Reads a graph written by `save`
+
+        By default the adjacency arrays and node meta are memory-mapped, so
+        loading is fast and pages are shared between processes that load
+        the same files. Node meta is only decoded when accessed.
+        """
+        cg = CompactGraph()
+        with open(os.path.join(dirname, 'ids.txt'), encoding='utf-8') as f:
+            ids = f.read()
+        cg.id_arr = ids.split("\n") if ids != "" else []
+        cg.id2index = dict(zip(cg.id_arr, range(len(cg.id_arr))))
+        with open(os.path.join(dirname, 'labels.json'), encoding='utf-8') as f:
+            cg.label_arr = json.load(f)
+        with open(os.path.join(dirname, 'types.json'), encoding='utf-8') as f:
+            cg.type_arr = json.load(f)
+        offsets = np.load(os.path.join(dirname, 'meta_offsets.npy'), mmap_mode=mmap_mode)
+        meta_path = os.path.join(dirname, 'meta.bin')
+        if os.path.getsize(meta_path) > 0:
+            blob = np.memmap(meta_path, dtype=np.uint8, mode='r')
+        else:
+            blob = np.zeros(0, dtype=np.uint8)
+        cg.meta_arr = JsonBlobList(blob, offsets)
+        with open(os.path.join(dirname, 'predicates.json'), encoding='utf-8') as f:
+            preds = json.load(f)
+        cg.parents_by_p = {}
+        cg.children_by_p = {}
+        for (k, pred) in enumerate(preds):
+            for (direction, by_p) in [('parents', cg.parents_by_p), ('children', cg.children_by_p)]:
+                indptr = np.load(os.path.join(dirname, '{}.{}.indptr.npy'.format(k, direction)), mmap_mode=mmap_mode)
+                indices = np.load(os.path.join(dirname, '{}.{}.indices.npy'.format(k, direction)), mmap_mode=mmap_mode)
+                by_p[pred] = (indptr, indices)
+        return cg
+
+
+class JsonBlobList():
+    """
+    Read-only list of JSON values decoded on access from a byte blob
+
+    The blob holds the encoded values back to back; value i is at
+    blob[offsets[i]:offsets[i+1]], and an empty slice denotes None.
+    Decoded values are cached, so mutations to them are retained.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+        self._decoded = {}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, ix):
+        if ix in self._decoded:
+            return self._decoded[ix]
+        (start, end) = (int(self.offsets[ix]), int(self.offsets[ix + 1]))
+        v = None
+        if end > start:
+            v = json.loads(self.blob[start:end].tobytes().decode('utf-8'))
+        self._decoded[ix] = v
+        return v
+
+    def __setitem__(self, ix, v):
+        self._decoded[ix] = v
+
+    def __iter__(self):
+        for ix in range(len(self)):
+            yield self[ix]
+
+
+def _to_csr(rows, cols, n):
+    """
+    Returns (indptr, indices) for deduplicated (row, col) pairs over n rows
+    """
+    keys = np.unique(rows.astype(np.int64) * n + cols)
+    rows = (keys // n).astype(np.intc) if n > 0 else keys.astype(np.intc)
+    indices = (keys % n).astype(np.intc) if n > 0 else keys.astype(np.intc)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return (indptr, indices)
+
+
+class CompactOntology(Ontology):
+    """
+    An ontology backed by a :class:`CompactGraph`
+
+    Graph queries (parents, children, ancestors, descendants, label and node
+    lookup) run directly on the compact arrays. Methods that require a
+    networkx graph still work, but materialize one on first use via `get_graph`.
+
+    The ontology is read-only; create via `OntologyFactory().create(handle, compact=True)`,
+    or from a snapshot via `OntologyFactory().create(handle, snapshot=True)`.
+    Methods that add nodes, edges or node metadata (`add_node`, `add_parent`,
+    `merge`, `set_obsolete`, `add_synonym`, `add_text_definition`,
+    `add_to_subset`) raise :class:`ReadOnlyOntologyError`
+    """
+
+    def __init__(self, handle=None, cgraph=None, payload=None, **args):
+        super().__init__(handle=handle, payload=payload, **args)
+        if payload is not None:
+            cgraph = payload.get('graph')
+        self.cgraph = cgraph if cgraph is not None else CompactGraph()
+        # networkx graph, only materialized on demand
+        self.graph = None
+
+    def get_graph(self):
+        if self.graph is None:
+            logger.info("Materializing networkx graph for {}".format(self))
+            self.graph = self.cgraph.to_networkx()
+        return self.graph
+
+    def nodes(self):
+        return list(self.cgraph.id_arr)
+
+    def node(self, id):
+        ix = self.cgraph.id2index.get(id)
+        if ix is None:
+            return None
+        return self.cgraph.node_data(ix)
+
+    def has_node(self, id):
+        return id in self.cgraph
+
+    def _meta(self, nid):
+        ix = self.cgraph.id2index.get(nid)
+        if ix is None or self.cgraph.meta_arr[ix] is None:
+            return {}
+        return self.cgraph.meta_arr[ix]
+
+    def label(self, nid, id_if_null=False):
+        ix = self.cgraph.id2index.get(nid)
+        lbl = None if ix is None else self.cgraph.label_arr[ix]
+        if lbl is None and id_if_null:
+            return nid
+        return lbl
+
+    def relations_used(self):
+        return self.cgraph.predicates()
+
+    def child_parent_relations(self, subj, obj, graph=None):
+        return self.cgraph.relations_between(subj, obj)
+
+    def parents(self, node, relations=None):
+        return self.cgraph.parents(node, relations=relations)
+
+    def children(self, node, relations=None):
+        return self.cgraph.children(node, relations=relations)
+
+    def ancestors(self, node, relations=None, reflexive=False):
+        if self.cache_closures:
+            return self.closure_index(relations).ancestors(node, reflexive=reflexive)
+        return self.cgraph.ancestors(node, relations=relations, reflexive=reflexive)
+
+    def descendants(self, node, relations=None, reflexive=False):
+        if self.cache_closures:
+            return self.closure_index(relations).descendants(node, reflexive=reflexive)
+        return self.cgraph.descendants(node, relations=relations, reflexive=reflexive)
+
+    def closure_index(self, relations=None):
+        if self._closure_indexes is None:
+            self._closure_indexes = {}
+        key = None if relations is None else frozenset(relations)
+        cix = self._closure_indexes.get(key)
+        if cix is None:
+            logger.info("Building closure index for {} relations: {}".format(self, relations))
+            cg = self.cgraph
+            cix = ClosureIndex(cg.id_arr, cg.edge_pairs(relations), id2index=cg.id2index)
+            self._closure_indexes[key] = cix
+        return cix
+
+    def add_node(self, id, label=None, type='CLASS', meta=None):
+        raise ReadOnlyOntologyError("CompactOntology is read-only")
+
+    def add_parent(self, id, pid, relation='subClassOf'):
+        raise ReadOnlyOntologyError("CompactOntology is read-only")
+
+    def merge(self, ontologies):
+        raise ReadOnlyOntologyError("CompactOntology is read-only")
+
+    def set_obsolete(self, nid):
+        raise ReadOnlyOntologyError("CompactOntology is read-only")
+
+    # node() builds a fresh dict on each call, so edits to node metadata would be lost
+    def _add_meta_element(self, id, k, edict):
+        raise ReadOnlyOntologyError("CompactOntology is read-only")
+
+    def inline_xref_graph(self):
+        # xrefs are kept in the node metadata when loading
+        pass
+
+    def add_synonym(self, syn):
+        raise ReadOnlyOntologyError("CompactOntology is read-only")
+
+    def add_to_subset(self, id, s):
+        raise ReadOnlyOntologyError("CompactOntology is read-only")
+
+    def save_snapshot(self, dirname):
+        """
+        Writes the ontology to a snapshot directory. See `load_snapshot`
+
+        The snapshot is written to a temporary directory that is then renamed,
+        so concurrent readers never see a partial snapshot
+        """
+        parent = os.path.dirname(os.path.abspath(dirname))
+        os.makedirs(parent, exist_ok=True)
+        tmpdir = tempfile.mkdtemp(dir=parent, prefix='.tmp-snapshot-')
+        try:
+            self.cgraph.save(tmpdir)
+            xrefs = []
+            if self.xref_graph is not None:
+                xrefs = [[x, y, d.get('source')] for (x, y, d) in self.xref_graph.edges(data=True)]
+            doc = {
+                'version': SNAPSHOT_VERSION,
+                'id': self.id,
+                'meta': self.meta,
+                'xrefs': xrefs,
+                'logical_definitions': [[ld.class_id, ld.genus_ids, ld.restrictions]
+                                        for ld in (self.all_logical_definitions or [])],
+                'property_chain_axioms': [pca.as_dict() for pca in (self.all_property_chain_axioms or [])]
+            }
+            with open(os.path.join(tmpdir, 'ontology.json'), 'w', encoding='utf-8') as f:
+                json.dump(doc, f)
+            os.rename(tmpdir, dirname)
+        except OSError:
+            # another process may have written the same snapshot first
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            if not os.path.isdir(dirname):
+                raise
+
+    @staticmethod
+    def load_snapshot(dirname, handle=None):
+        """
+        Creates an ontology from a snapshot directory written by `save_snapshot`
 
+        Returns
+        -------
+        CompactOntology
+        """
+        with open(os.path.join(dirname, 'ontology.json'), encoding='utf-8') as f:
+            doc = json.load(f)
+        if doc.get('version') != SNAPSHOT_VERSION:
+            raise ValueError("Unsupported snapshot version {} in {}".format(doc.get('version'), dirname))
+        xref_graph = nx.MultiGraph()
+        for (x, y, source) in doc['xrefs']:
+            xref_graph.add_edge(x, y, source=source)
+        payload = {
+            'id': doc['id'],
+            'meta': doc['meta'],
+            'graph': CompactGraph.load(dirname),
+            'xref_graph': xref_graph,
+            'logical_definitions': [LogicalDefinition(c, g, [tuple(r) for r in rs])
+                                    for (c, g, rs) in doc['logical_definitions']],
+            'property_chain_axioms': [PropertyChainAxiom(a['predicateId'], a['chainPredicateIds'])
+                                      for a in doc['property_chain_axioms']]
+        }
+        return CompactOntology(handle=handle, payload=payload)
@@ -23,20 +23,50 @@ class EcoMap():
     """
     Provides mapping between GO Evidence codes (IDA, IEA, ISS, etc) and ECO classes.
 
-    The mapping is actually between a (code, ref) pair and an eco class
+    The mapping is actually between a (code, ref) pair and an eco class.
+
+    By default the mapping is fetched from the ECO PURL. To use a local copy
+    or another release, pass the path or URL of a gaf-eco-mapping.txt file.
+    The mapping is read on first use. The parsers, GO rules and writers share
+    the EcoMap from :func:`get_ecomap` unless their config has its own.
     """
 
     PURL = 'http://purl.obolibrary.org/obo/eco/gaf-eco-mapping.txt'
 
-    def __init__(self):
+    def __init__(self, path=None):
+        self.path = self.PURL if path is None else path
         self._mappings = None
-    
+        self._coderef_index = None
+        self._default_index = None
+        self._ecoclass_index = None
+
     def mappings(self):
         if self._mappings is None:
-            s = get_ecomap_str(self.PURL)
+            if self.path.startswith("http"):
+                s = get_ecomap_str(self.path)
+            else:
+                logger.info("Reading ecomap from {}".format(self.path))
+                with open(self.path) as f:
+                    s = f.read()
             self._mappings = self.parse_ecomap_str(s)
         return self._mappings
 
+    def _index(self):
+        if self._coderef_index is None:
+            coderef_index = {}
+            default_index = {}
+            ecoclass_index = {}
+            for (code, ref, cls) in self.mappings():
+                # The first mapping for a (code, ref) or class wins, and the last default for a code
+                coderef_index.setdefault((str(code), ref), cls)
+                if ref is None:
+                    default_index[str(code)] = cls
+                ecoclass_index.setdefault(cls, (code, ref))
+            self._default_index = default_index
+            self._ecoclass_index = ecoclass_index
+            self._coderef_index = coderef_index
+        return self._coderef_index
+
     def parse_ecomap_str(self, str):
         lines = str.split("\n")
         tups = []
@@ -69,15 +99,11 @@ class EcoMap():
         str
             ECO class CURIE/ID
         """
-        mcls = None
-        for (this_code, this_ref, cls) in self.mappings():
-            if str(this_code) == str(code):
-                if this_ref == reference:
-                    return cls
-                if this_ref is None:
-                    mcls = cls
-                    
-        return mcls
+        cls = self._index().get((str(code), reference))
+        if cls is not None:
+            return cls
+
+        return self._default_index.get(str(code))
                 
     def ecoclass_to_coderef(self, cls):
         """
@@ -97,9 +123,33 @@ class EcoMap():
         (str, str)
             code, reference tuple
         """
-        code = ''
-        ref = None
-        for (code, ref, this_cls) in self.mappings():
-            if cls == this_cls:
-                return code, ref
-        return None, None
+        self._index()
+        return self._ecoclass_index.get(cls, (None, None))
+
+
+_ecomap = None
+
+
+def get_ecomap():
+    """
+    Returns the EcoMap shared by the association parsers, GO rules and writers
+
+    The mapping is only read the first time it is queried, so getting it
+    does not touch the network. See :func:`set_ecomap`.
+    """
+    global _ecomap
+    if _ecomap is None:
+        _ecomap = EcoMap()
+    return _ecomap
+
+
+def set_ecomap(path=None):
+    """
+    Sets the shared EcoMap to read the gaf-eco-mapping.txt file at path, a local file or URL
+
+    Configs created afterwards use it, unless given their own `ecomap`. If path
+    is None, the mapping is read from the ECO PURL.
+    """
+    global _ecomap
+    _ecomap = EcoMap(path)
+    return _ecomap
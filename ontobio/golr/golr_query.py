@@ -57,9 +57,6 @@ ACTS_UPSTREAM_OF_OR_WITHIN="acts_upstream_of_or_within"
 ISA_PARTOF_CLOSURE="isa_partof_closure"
 REGULATES_CLOSURE="regulates_closure"
 
-ecomapping = ecomap.EcoMap()
-iea_eco = ecomapping.coderef_to_ecoclass("IEA")
-
 logger = logging.getLogger(__name__)
 
 
@@ -1232,7 +1229,7 @@ class GolrAssociationQuery(GolrAbstractQuery):
                 fq['evidence_object_closure'] = e
 
         if self.exclude_automatic_assertions:
-            fq['-evidence_object_closure'] = iea_eco
+            fq['-evidence_object_closure'] = ecomap.get_ecomap().coderef_to_ecoclass("IEA")
 
         # Homolog service params
         # TODO can we sync with argparse.choices?
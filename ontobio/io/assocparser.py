@@ -18,14 +18,16 @@ import io
 import gzip
 import datetime
 import dateutil.parser
+import itertools
+import multiprocessing
 
 from dataclasses import dataclass
 
-from collections import namedtuple, defaultdict
+from collections import namedtuple, defaultdict, deque, Counter
 from typing import Callable, ClassVar, Collection, Iterable, Optional, List, Dict, Set, TypeVar, Union, Any
 
 from ontobio import ontol
-from ontobio import ecomap
+from ontobio.ecomap import get_ecomap
 from ontobio.io import parsereport
 from ontobio.util.user_agent import get_user_agent
 from ontobio.model import association
@@ -168,8 +170,7 @@ class TaxonValidator(CurieValidator):
             if not result.valid:
                 return result
 
-            result.parsed.namespace = "NCBITaxon"
-            parsed_taxons.append(result.parsed)
+            parsed_taxons.append(association.Curie("NCBITaxon", result.parsed.identity))
 
         return ValidateResult(True, entity, parsed_taxons, "")
 
@@ -212,6 +213,19 @@ class AssocParserConfig():
     rule_metadata: Dictionary of rule IDs to metadata pulled out by yamldown
 
     rule_sets: an Iterable of integers representing 
+
+    workers: number of processes used to parse lines. If greater than 1, lines are
+    parsed in chunks of chunk_size lines by a pool of forked worker processes
+
+    ecomap: the EcoMap used to map GAF evidence codes to ECO classes. Defaults to
+    the shared :func:`ontobio.ecomap.get_ecomap`
+
+    report_examples: if set, the parse report counts the messages for each rule, but
+    only keeps this many example messages of each type for each rule
+
+    prefilter_columns: if True, the GAF parser rejects lines with bad columns (column
+    count, empty ids, taxon, date, qualifier, references, evidence code) from the split
+    values, before building any association objects
     """
     def __init__(self,
                  remove_double_prefixes=False,
@@ -222,7 +236,7 @@ class AssocParserConfig():
                  class_idspaces=None,
                  entity_idspaces=None,
                  group_idspace=None,
-                 ecomap=ecomap.EcoMap(),
+                 ecomap=None,
                  exclude_relations=None,
                  include_relations=None,
                  filter_out_evidence=None,
@@ -237,7 +251,11 @@ class AssocParserConfig():
                  annotation_inferences=None,
                  extensions_constraints=None,
                  rule_contexts=[],
-                 rule_set=None):
+                 rule_set=None,
+                 workers=1,
+                 chunk_size=5000,
+                 prefilter_columns=False,
+                 report_examples=None):
 
         self.remove_double_prefixes=remove_double_prefixes
         self.ontology=ontology
@@ -245,7 +263,7 @@ class AssocParserConfig():
         self.entity_map=entity_map
         self.valid_taxa=valid_taxa
         self.class_idspaces=class_idspaces
-        self.ecomap=ecomap
+        self.ecomap=ecomap if ecomap is not None else get_ecomap()
         self.include_relations=include_relations
         self.exclude_relations=exclude_relations
         self.filter_out_evidence = filter_out_evidence
@@ -261,6 +279,10 @@ class AssocParserConfig():
         self.extensions_constraints = AssocParserConfig._compute_constraint_subclasses(extensions_constraints, ontology)
         self.group_idspace = None if group_idspace is None else set(group_idspace)
         self.rule_contexts = rule_contexts
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.prefilter_columns = prefilter_columns
+        self.report_examples = report_examples
         # We'll say that the default None should run no rules, so let's set the rule_set to []
         # print("Rule Set is {}".format(rule_set))
         if rule_set == None:
@@ -270,6 +292,8 @@ class AssocParserConfig():
             self.rule_set = RuleSet(None)
         else:
             self.rule_set = RuleSet(rule_set)
+        # Set by qc.compile_rules
+        self.rule_plan = None
 
 
         # This is a dictionary from ruleid: `gorule-0000001` to title strings
@@ -351,10 +375,13 @@ class Report(object):
         self.n_lines = 0
         self.n_assocs = 0
         self.skipped = 0
-        self.reporter = parsereport.Report(group, dataset)
         if config is None:
             config = AssocParserConfig()
         self.config = config
+        self.reporter = parsereport.Report(group, dataset, examples=config.report_examples)
+        # lookups answered from / missing in the parser's validation memo, by kind
+        self.memo_hits = Counter()
+        self.memo_misses = Counter()
         self.header = []
 
     def error(self, line, type, obj, msg="", taxon: str = "", rule=None):
@@ -364,6 +391,11 @@ class Report(object):
         self.message(self.WARNING, line, type, obj, msg, taxon=taxon, rule=rule)
 
     def message(self, level, line, type, obj, msg="", taxon: str = "", rule=None, dont_record=["INFO"]):
+        if level == self.INFO and level in dont_record:
+            # INFO messages are not kept anywhere, so skip building one
+            self.reporter.touch(rule)
+            return
+
         message = {
             'level': level,
             'line': line,
@@ -373,11 +405,27 @@ class Report(object):
             'taxon': taxon,
             'rule': rule
         }
-        if not level in dont_record:
+        kept = self.reporter.message(message, rule)
+        if not level in dont_record and (kept or self.reporter.examples is None):
             # Only record a message if we want that
             self.messages.append(message)
 
-        self.reporter.message(message, rule)
+    def merge_messages(self, messages, reporter):
+        """
+        Adds messages recorded by another report, e.g. one for a chunk of lines parsed in a worker process
+
+        Arguments
+        ---------
+        messages : list
+            the `messages` of the other report
+        reporter : parsereport.Report
+            the `reporter` of the other report
+        """
+        kept = self.reporter.merge(reporter)
+        if self.reporter.examples is None:
+            self.messages.extend(messages)
+        else:
+            self.messages.extend(kept)
 
     def add_associations(self, associations):
         for a in associations:
@@ -409,6 +457,13 @@ class Report(object):
     def short_summary(self):
         return "Parsed {} assocs from {} lines. Skipped: {}".format(self.n_assocs, self.n_lines, self.skipped)
 
+    def memo_summary(self):
+        """
+        Hits and misses of the parser's validation memo, by kind of lookup
+        """
+        return {kind: {"hits": self.memo_hits[kind], "misses": self.memo_misses[kind]}
+                for kind in sorted(set(self.memo_hits) | set(self.memo_misses))}
+
     def to_report_json(self):
         """
         Generate a summary in json format
@@ -458,7 +513,7 @@ class Report(object):
             s += "### {rule}\n\n".format(rule=rule)
             if rule != "other" and self.config.rule_metadata:
                 s += "{title}\n\n".format(title=self.config.rule_metadata.get(rule, {}).get("title", ""))
-            s += "* total: {amount}\n".format(amount=len(messages))
+            s += "* total: {amount}\n".format(amount=self.reporter.counts.get(rule, len(messages)))
             if len(messages) > 0:
                 s += "#### Messages\n"
             for message in messages:
@@ -467,6 +522,21 @@ class Report(object):
 
         return s
 
+# parser used by worker processes in AssocParser._parallel_parse, inherited on fork
+_worker_parser = None
+
+def _parse_chunk(lines):
+    parser = _worker_parser
+    parser.report = Report(group=parser.report.reporter.group, dataset=parser.report.reporter.dataset, config=parser.config)
+    results = []
+    for line in lines:
+        result = parser.parse_line(line)
+        # the report holds the config and ontology, so it stays in the worker process
+        has_report = result.report is not None
+        result.report = None
+        results.append((result, has_report))
+    return (results, parser.report.messages, parser.report.reporter, (parser.report.memo_hits, parser.report.memo_misses))
+
 @dataclass
 class ParseResult:
     parsed_line: str
@@ -517,8 +587,13 @@ class AssocParser(object):
         association
         """
         file = self._ensure_file(file)
-        for line in file:
-            parsed_result = self.parse_line(line)
+        if self.config.workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+            parsed_results = self._parallel_parse(file)
+        else:
+            if self.config.workers > 1:
+                logger.warning("Parallel parsing needs the fork start method; parsing in a single process")
+            parsed_results = (self.parse_line(line) for line in file)
+        for parsed_result in parsed_results:
             self.report.report_parsed_result(parsed_result, outfile, self.config.filtered_evidence_file, self.config.filter_out_evidence)
             for association in parsed_result.associations:
                 # yield association if we don't care if it's a header or if it's definitely a real gaf line
@@ -526,8 +601,49 @@ class AssocParser(object):
                     yield association
 
         logger.info(self.report.short_summary())
+        logger.info("Validation memo hits and misses: {}".format(self.report.memo_summary()))
         file.close()
 
+    def _parallel_parse(self, file):
+        """
+        Yields the ParseResult for each line of file, in order, parsing chunks of lines in worker processes
+
+        The leading header lines and first annotation line are parsed here, as they set
+        parser state such as the format version. Workers are then forked, so they share the
+        ontology and config with this process. Only parse results and report messages are
+        sent back, and those messages are merged into this parser's report chunk by chunk.
+        """
+        global _worker_parser
+        lines = iter(file)
+        for line in lines:
+            yield self.parse_line(line)
+            if not self.is_header(line):
+                break
+
+        workers = self.config.workers
+        _worker_parser = self
+        try:
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                pending = deque()
+                while True:
+                    chunk = list(itertools.islice(lines, self.config.chunk_size))
+                    if len(chunk) > 0:
+                        pending.append(pool.apply_async(_parse_chunk, (chunk,)))
+                    # bound the number of chunks held in memory
+                    while len(pending) > 0 and (len(chunk) == 0 or len(pending) >= 2 * workers):
+                        (results, messages, reporter, (memo_hits, memo_misses)) = pending.popleft().get()
+                        self.report.merge_messages(messages, reporter)
+                        self.report.memo_hits.update(memo_hits)
+                        self.report.memo_misses.update(memo_misses)
+                        for (result, has_report) in results:
+                            if has_report:
+                                result.report = self.report
+                            yield result
+                    if len(chunk) == 0:
+                        break
+        finally:
+            _worker_parser = None
+
     def generate_associations(self, line, outfile=None):
         associations = self.association_generator(line, outfile=outfile)
         for association in associations:
@@ -627,11 +743,19 @@ class AssocParser(object):
         if self.config.ontology == None:
             return None
 
+        return self._memoized("aspect", term, self._compute_aspect)
+
+    def _compute_aspect(self, term):
         BP = "GO:0008150"
         CC = "GO:0005575"
         MF = "GO:0003674"
 
-        ancestors = self.config.ontology.ancestors(term)
+        ontology = self.config.ontology
+        if ontology.cache_closures:
+            # membership tests against the closure index; avoids building the ancestor list
+            ancestors = [root for root in (BP, CC, MF) if ontology.has_ancestor(term, root)]
+        else:
+            ancestors = ontology.ancestors(term)
         if BP in ancestors:
             return "P"
         if CC in ancestors:
@@ -646,6 +770,35 @@ class AssocParser(object):
     def _parse_qualifier(self, qualifier, aspect):
         return _parse_qualifier(qualifier, aspect)
 
+    # Entries kept for each kind of lookup in the validation memo
+    memo_size = 1000000
+
+    def _memoized(self, kind, key, lookup):
+        """
+        Returns lookup(key), remembering the result in this parser's memo for `kind`
+        of lookup. Terms and IDs repeat across the lines of a file, so most
+        lookups are answered from the memo. Hits and misses are counted in the report.
+
+        The memo only holds results that depend on the ontology, which is checked here,
+        or on the key alone.
+        """
+        memo = getattr(self, "_memo", None)
+        if memo is None or memo[0] is not self.config.ontology:
+            memo = (self.config.ontology, defaultdict(dict))
+            self._memo = memo
+
+        results = memo[1][kind]
+        try:
+            result = results[key]
+            self.report.memo_hits[kind] += 1
+        except KeyError:
+            result = lookup(key)
+            self.report.memo_misses[kind] += 1
+            if len(results) < self.memo_size:
+                results[key] = result
+
+        return result
+
     # split an ID/CURIE into prefix and local parts
     # (not currently used)
     def _parse_id(self, id):
@@ -698,22 +851,33 @@ class AssocParser(object):
         else:
             return []
 
+    def _term_status(self, id):
+        """
+        Returns (in ontology, obsolete, replaced by) for a term
+        """
+        ont = self.config.ontology
+        if not ont.has_node(id):
+            return (False, False, [])
+        if not ont.is_obsolete(id):
+            return (True, False, [])
+        return (True, True, ont.replaced_by(id, strict=False))
+
     # check the term id is in the ontology, and is not obsolete
     def _validate_ontology_class_id(self, id, line: SplitLine, subclassof=None):
         ont = self.config.ontology
         if ont is None:
             return id
 
-        if not ont.has_node(id):
+        (present, obsolete, rb) = self._memoized("term", id, self._term_status)
+        if not present:
             self.report.warning(line.line, Report.UNKNOWN_ID, id, "Class ID {} is not present in the ontology".format(id),
                 taxon=line.taxon, rule=27)
             return id
 
-        if ont.is_obsolete(id):
+        if obsolete:
             # the default behavior should always be to repair, unless the caller explicitly states
             # that this should not be done by setting repair_obsoletes to False
             if self.config.repair_obsoletes is None or self.config.repair_obsoletes:
-                rb = ont.replaced_by(id, strict=False)
                 if len(rb) == 1:
                     # We can repair
                     self.report.warning(line.line, Report.OBSOLETE_CLASS, id, msg="Violates GORULE:0000020, but was repaired",
@@ -745,23 +909,11 @@ class AssocParser(object):
         if id == "":
             self.report.error(line.line, Report.INVALID_ID, id, "GORULE:0000027: identifier is empty", taxon=line.taxon, rule=27)
             return False
-        if ':' not in id:
-            self.report.error(line.line, Report.INVALID_ID, id, "GORULE:0000027: must be CURIE/prefixed ID", rule=27)
-            return False
-
-        # we won't check IDs with doi prefix, everything else we want to check
-        if not AssocParser.doi_regex.match(id) and AssocParser.non_id_regex.search(id):
-            self.report.error(line.line, Report.INVALID_ID, id, "GORULE:0000027: contains non letter, non number character, or spaces", rule=27)
-            return False
-
-        (id_prefix, right) = id.split(":", maxsplit=1)
-        if right.startswith("MGI:"):
-            ## See ticket https://github.com/geneontology/go-site/issues/91
-            ## For purposes of determining allowed IDs in DB XREF, MGI IDs shall look like `MGI:12345`
-            right = right[4:]
 
-        if id_prefix == "" or right == "":
-            self.report.error(line.line, Report.INVALID_ID, id, "GORULE:0000027: Empty ID", rule=27)
+        (valid, id_prefix) = self._memoized("id", id, self._check_id_syntax)
+        if not valid:
+            # id_prefix is the reason here
+            self.report.error(line.line, Report.INVALID_ID, id, id_prefix, rule=27)
             return False
 
         if allowed_ids is not None and id_prefix not in allowed_ids:
@@ -777,6 +929,28 @@ class AssocParser(object):
 
         return True
 
+    def _check_id_syntax(self, id):
+        """
+        Returns (True, prefix) for a well formed ID, or (False, reason) if it is not
+        """
+        if ':' not in id:
+            return (False, "GORULE:0000027: must be CURIE/prefixed ID")
+
+        # we won't check IDs with doi prefix, everything else we want to check
+        if not AssocParser.doi_regex.match(id) and AssocParser.non_id_regex.search(id):
+            return (False, "GORULE:0000027: contains non letter, non number character, or spaces")
+
+        (id_prefix, right) = id.split(":", maxsplit=1)
+        if right.startswith("MGI:"):
+            ## See ticket https://github.com/geneontology/go-site/issues/91
+            ## For purposes of determining allowed IDs in DB XREF, MGI IDs shall look like `MGI:12345`
+            right = right[4:]
+
+        if id_prefix == "" or right == "":
+            return (False, "GORULE:0000027: Empty ID")
+
+        return (True, id_prefix)
+
     def validate_pipe_separated_ids(self, column, line: SplitLine, empty_allowed=False, extra_delims="") -> Optional[List[str]]:
         if column == "" and empty_allowed:
             return []
@@ -120,7 +120,7 @@ class GpadWriter(AssocWriter):
             self.version = GPAD_1_2
 
         self._write("!gpa-version: {}\n".format(self.version))
-        self.ecomap = ecomap.EcoMap()
+        self.ecomap = ecomap.get_ecomap()
 
     def as_tsv(self, assoc: Union[association.GoAssociation, dict]):
         """
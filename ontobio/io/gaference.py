@@ -12,7 +12,7 @@ from ontobio.rdfgen import relations
 
 import functools
 import logging
-import copy
+import dataclasses
 
 prefix_context = {key: value for context in curie_util.default_curie_maps + [curie_util.read_biocontext("go_context")] for key, value in context.items()}
 
@@ -169,12 +169,11 @@ def gaf_inferences_from_value(original_gaf: association.GoAssociation, inferred_
     # At this point it has inferences
     inferred_gafs = []  # type: List[association.GoAssociation]
     for inference in inferred_value.inferences:
-        new_gaf = copy.deepcopy(original_gaf)
         goterm = inference.term.rsplit("/", maxsplit=1)[1].replace("_", ":")
         aspect = relation_aspect_map[inference.relation]
-        new_gaf.object.id = goterm
-        new_gaf.aspect = aspect
-        new_gaf.object_extensions = []
+        # Inferred gafs share all unchanged fields with the original
+        new_object = dataclasses.replace(original_gaf.object, id=goterm)
+        new_gaf = dataclasses.replace(original_gaf, object=new_object, aspect=aspect, object_extensions=[])
         inferred_gafs.append(new_gaf)
 
     return InferenceResult(inferred_gafs, None)
@@ -2,7 +2,8 @@ import re
 import logging
 import json
 
-from typing import List, Tuple, Set, Dict
+from typing import List, Tuple, Set, Dict, Optional
+import dataclasses
 from dataclasses import dataclass
 
 from prefixcommons import curie_util
@@ -15,7 +16,7 @@ from ontobio.io import entityparser
 from ontobio.io import entitywriter
 from ontobio.model import association
 from ontobio.model import collections
-from ontobio.ecomap import EcoMap
+from ontobio.ecomap import EcoMap, get_ecomap
 from ontobio.rdfgen import relations
 from ontobio.ontol import Ontology
 
@@ -122,7 +123,7 @@ class GafParser(assocparser.AssocParser):
 
     def make_internal_cell_component_closure(self):
         if self.config.ontology:
-            self.cell_component_descendants_closure = protein_complex_sublcass_closure(self.config.ontology)
+            self.cell_component_descendants_closure = qc.compile_rules(self.config).protein_complex_descendants()
 
     def parse_line(self, line):
         """
@@ -174,11 +175,16 @@ class GafParser(assocparser.AssocParser):
 
         vals = [el.strip() for el in line.split("\t")]
 
+        if self.config.prefilter_columns:
+            rejected = reject_columns(vals, report=self.report, qualifier_parser=self.qualifier_parser(), ecomap=self.config.ecomap)
+            if rejected is not None:
+                return rejected
+
         # GAF v1 is defined as 15 cols, GAF v2 as 17.
         # We treat everything as GAF2 by adding two blank columns.
         # TODO: check header metadata to see if columns corresponds to declared dataformat version
 
-        parsed = to_association(list(vals), report=self.report, qualifier_parser=self.qualifier_parser(), bio_entities=self.bio_entities)
+        parsed = to_association(list(vals), report=self.report, qualifier_parser=self.qualifier_parser(), bio_entities=self.bio_entities, ecomap=self.config.ecomap)
         if parsed.associations == []:
             return parsed
 
@@ -224,7 +230,7 @@ class GafParser(assocparser.AssocParser):
             if upgrade is not None:
                 # If we found a synonym
                 self.report.warning(line, Report.INVALID_ID_DBXREF, db, "GORULE:0000027: {} is a synonym for the correct ID {}, and has been updated".format(db, upgrade), taxon=str(assoc.object.taxon), rule=27)
-                assoc.subject.id.namespace = upgrade
+                assoc.subject = dataclasses.replace(assoc.subject, id=association.Curie(upgrade, assoc.subject.id.identity))
 
         ## --
         ## db + db_object_id. CARD=1
@@ -300,7 +306,7 @@ class GafParser(assocparser.AssocParser):
         :return: the possibly upgraded GoAssociation
         """
         term = str(assoc.object.id)
-        namespace = self.config.ontology.obo_namespace(term)
+        namespace = self._memoized("namespace", term, self.config.ontology.obo_namespace)
 
         if term == "GO:0008150":
             involved_in = association.Curie(namespace="RO", identity="0002331")
@@ -333,11 +339,74 @@ class GafParser(assocparser.AssocParser):
                             taxon=str(assoc.subject.taxon), rule=59)
         return assoc
 
-ecomap = EcoMap()
-ecomap.mappings()
+
+curie_regex = re.compile(r"^[^: ]+:[^ ]+$")
+gaf_date_regex = re.compile(r"^[0-9]{8}$")
+
+def reject_columns(gaf_line: List[str], report: Report, qualifier_parser=assocparser.Qualifier2_1(), ecomap: EcoMap=None) -> Optional[assocparser.ParseResult]:
+    """
+    Checks the split columns of a GAF line the way `to_association` does, up to
+    and including the evidence code, without building any association objects.
+
+    If `to_association` would reject the line, the same messages are added to
+    `report` and the rejected ParseResult is returned. Otherwise returns None,
+    and nothing is reported: the line still has to go through `to_association`.
+    """
+    source_line = "\t".join(gaf_line)
+    if source_line == "":
+        # Blank lines are reported by to_association
+        return None
+
+    def reject(type, obj, msg, taxon=""):
+        if len(gaf_line) > 17:
+            report.warning(source_line, assocparser.Report.WRONG_NUMBER_OF_COLUMNS, "",
+                msg="There were more than 17 columns in this line. Proceeding by cutting off extra columns after column 17.",
+                rule=1)
+        report.error(source_line, type, obj, msg, taxon=taxon, rule=1)
+        return assocparser.ParseResult(source_line, [], True, report=report)
+
+    if len(gaf_line) < 15:
+        return reject(assocparser.Report.WRONG_NUMBER_OF_COLUMNS, "",
+            "There were {columns} columns found in this line, and there should be 15 (for GAF v1) or 17 (for GAF v2)".format(columns=len(gaf_line)))
+
+    taxon_column = gaf_line[12]
+    if gaf_line[0] == "":
+        return reject(Report.INVALID_IDSPACE, "EMPTY", "col1 is empty", taxon=taxon_column)
+    if gaf_line[1] == "":
+        return reject(Report.INVALID_ID, "EMPTY", "col2 is empty", taxon=taxon_column)
+    if gaf_line[5] == "":
+        return reject(Report.INVALID_ID, "EMPTY", "reference column 6 is empty", taxon=taxon_column)
+
+    taxa = [t for t in taxon_column.split("|") if t != ""]
+    if not (1 <= len(taxa) <= 2 and all(curie_regex.match(t) for t in taxa)):
+        parsed_taxons_result = gaf_line_validators["taxon"].validate(taxon_column)
+        if not parsed_taxons_result.valid:
+            return reject(Report.INVALID_TAXON, parsed_taxons_result.original, parsed_taxons_result.message, taxon=parsed_taxons_result.original)
+
+    if gaf_line[13] == "":
+        return reject(Report.INVALID_DATE, "\'\'", "GORULE:0000001: empty")
+    if not gaf_date_regex.match(gaf_line[13]):
+        # Other date formats are warned about and parsed by to_association
+        return None
+
+    parsed_qualifiers = qualifier_parser.validate(gaf_line[3])
+    if not parsed_qualifiers.valid:
+        return reject(Report.INVALID_QUALIFIER, parsed_qualifiers.original, parsed_qualifiers.message, taxon=taxon_column)
+
+    references = [r for r in gaf_line[5].split("|") if r]
+    if not all(curie_regex.match(r) for r in references):
+        return reject(Report.INVALID_SYMBOL, gaf_line[5], "Problem parsing references", taxon=taxon_column)
+
+    gorefs = [association.Curie.from_str(r) for r in references if r.startswith("GO_REF:")] + [None]
+    if ecomap is None:
+        ecomap = get_ecomap()
+    if ecomap.coderef_to_ecoclass(gaf_line[6], reference=gorefs[0]) is None:
+        return reject(Report.UNKNOWN_EVIDENCE_CLASS, gaf_line[6], "Expecting a known ECO GAF code, e.g ISS")
+
+    return None
 
 
-def to_association(gaf_line: List[str], report=None, group="unknown", dataset="unknown", qualifier_parser=assocparser.Qualifier2_1(), bio_entities=None) -> assocparser.ParseResult:
+def to_association(gaf_line: List[str], report=None, group="unknown", dataset="unknown", qualifier_parser=assocparser.Qualifier2_1(), bio_entities=None, ecomap: EcoMap=None) -> assocparser.ParseResult:
     report = Report(group=group, dataset=dataset) if report is None else report
     bio_entities = collections.BioEntities(dict()) if bio_entities is None else bio_entities
     source_line = "\t".join(gaf_line)
@@ -422,6 +491,8 @@ def to_association(gaf_line: List[str], report=None, group="unknown", dataset="u
             return assocparser.ParseResult(source_line, [], True, report=report)
 
     gorefs = [ref for ref in references if ref.namespace == "GO_REF"] + [None]
+    if ecomap is None:
+        ecomap = get_ecomap()
     eco_curie = ecomap.coderef_to_ecoclass(gaf_line[6], reference=gorefs[0])
     if eco_curie is None:
         report.error(source_line, Report.UNKNOWN_EVIDENCE_CLASS, gaf_line[6], msg="Expecting a known ECO GAF code, e.g ISS", rule=1)
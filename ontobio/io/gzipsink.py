@@ -0,0 +1,113 @@
+"""
+Streaming gzip output, so writers can produce compressed files as they write
+rather than compressing them afterwards.
+
+Example: a GafWriter that writes both out.gaf and out.gaf.gz
+
+    with GzipTee(open("out.gaf", "w"), "out.gaf.gz") as f:
+        writer = GafWriter(file=f)
+"""
+import gzip
+import io
+import logging
+import shutil
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMPRESSLEVEL = 9
+
+
+def open_gzip(path, mode="wt", compresslevel=DEFAULT_COMPRESSLEVEL, threads=1):
+    """
+    Opens path for writing, compressed with gzip
+
+    Arguments
+    ---------
+    mode : str
+        "wt" to write text, "wb" to write bytes
+    compresslevel : int
+        gzip compression level, 1 (fastest) to 9 (smallest)
+    threads : int
+        if greater than 1 and `pigz` is installed, compress in a pigz
+        process using this many threads
+    """
+    if threads > 1:
+        pigz = shutil.which("pigz")
+        if pigz is not None:
+            return PigzFile(path, pigz, mode=mode, compresslevel=compresslevel, threads=threads)
+        logger.warning("pigz not found, compressing {} in a single thread".format(path))
+
+    return gzip.open(path, mode, compresslevel=compresslevel)
+
+
+class PigzFile(object):
+    """
+    Write only file object that compresses what is written to it with pigz
+    """
+
+    def __init__(self, path, pigz="pigz", mode="wt", compresslevel=DEFAULT_COMPRESSLEVEL, threads=2):
+        self.name = path
+        self._out = open(path, "wb")
+        self._process = subprocess.Popen([pigz, "-c", "-{}".format(compresslevel), "-p", str(threads)],
+                                         stdin=subprocess.PIPE, stdout=self._out)
+        self._stdin = self._process.stdin
+        if "b" not in mode:
+            self._stdin = io.TextIOWrapper(self._stdin, encoding="utf-8")
+
+    def write(self, data):
+        return self._stdin.write(data)
+
+    def close(self):
+        if self._out.closed:
+            return
+
+        self._stdin.close()
+        returncode = self._process.wait()
+        self._out.close()
+        if returncode != 0:
+            raise IOError("pigz exited with {} while writing {}".format(returncode, self.name))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class GzipTee(object):
+    """
+    Write only file object that writes to `file` and also to a gzip compressed
+    copy at `gzip_path`. Bytes or text, matching the mode of `file`.
+    """
+
+    def __init__(self, file, gzip_path, compresslevel=DEFAULT_COMPRESSLEVEL, threads=1):
+        self.file = file
+        self.name = getattr(file, "name", None)
+        mode = "wb" if "b" in getattr(file, "mode", "w") else "wt"
+        self.gzip_file = open_gzip(gzip_path, mode=mode, compresslevel=compresslevel, threads=threads)
+
+    @property
+    def closed(self):
+        return self.file.closed
+
+    def write(self, data):
+        self.gzip_file.write(data)
+        return self.file.write(data)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+        self.gzip_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,42 +1,115 @@
 import json
 
 import typing
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 Message = Dict[str, str]
 
 class Report(object):
 
-    def __init__(self, group, dataset):
+    def __init__(self, group, dataset, examples=None):
+        """
+        If `examples` is given, only that many messages of each type are kept
+        for each rule, as examples. All messages are still counted.
+        """
         self.group = group
         self.dataset = dataset
         self.messages = {} # type: Dict[str, List[Message]] # rule id --> List of messages
         self.messages["other"] = []
+        self.counts = {} # type: Dict[str, int] # rule id --> number of messages, kept or not
+        self.examples = examples
+        self._type_counts = {} # type: Dict[Tuple[str, str], int] # (rule id, message type) --> number of messages
         self._rule_message_cap = 10000
+        self._rule_ids = {} # type: Dict[Optional[int], str]
 
     def _rule_id(self, id: int) -> str:
         """
         Convert an integer into a gorule key id.
         """
-        if id is None or id == 0 or id >= 10000000:
-            return "other"
+        rule_id = self._rule_ids.get(id)
+        if rule_id is None:
+            if id is None or id == 0 or id >= 10000000:
+                rule_id = "other"
+            else:
+                rule_id = "gorule-{:0>7}".format(id)
+            self._rule_ids[id] = rule_id
+
+        return rule_id
 
-        return "gorule-{:0>7}".format(id)
+    def touch(self, rule: Optional[int]) -> None:
+        """
+        Make sure `rule` is listed in the report, without adding a message.
+        This is what an INFO message amounts to.
+        """
+        rule_id = self._rule_id(rule)
+        if rule_id not in self.messages:
+            self.messages[rule_id] = []
 
-    def message(self, message: Message, rule: Optional[int]) -> None:
+    def message(self, message: Message, rule: Optional[int]) -> bool:
         """
         Add a message to the appropriate list of messages. If `rule` refers
         to a valid id range for a go rule, the message is entered in a list
         keyed by the full gorule-{id}. Otherwise, if `rule` is None, or
         outside the id range, then we put this in the catch-all "other"
         keyed list of messages.
+
+        Returns True if the message was kept.
         """
         rule_id = self._rule_id(rule)
         if rule_id not in self.messages:
             self.messages[rule_id] = []
 
-        if len(self.messages[rule_id]) < self._rule_message_cap and message["level"] != "INFO":
+        if message["level"] == "INFO":
+            return False
+
+        self.counts[rule_id] = self.counts.get(rule_id, 0) + 1
+        if self.examples is not None:
+            key = (rule_id, message["type"])
+            self._type_counts[key] = self._type_counts.get(key, 0) + 1
+            if self._type_counts[key] > self.examples:
+                return False
+
+        if len(self.messages[rule_id]) < self._rule_message_cap:
             self.messages[rule_id].append(message)
+            return True
+
+        return False
+
+    def merge(self, other: "Report") -> List[Message]:
+        """
+        Add the messages and counts of another report, keeping the per rule
+        message cap and the number of examples. Merging the reports for
+        consecutive chunks of a file in order gives the same messages as one
+        report for the file.
+
+        Returns the messages that were kept.
+        """
+        kept = []
+        for rule_id, rule_messages in other.messages.items():
+            if rule_id not in self.messages:
+                self.messages[rule_id] = []
+            if rule_id in other.counts:
+                self.counts[rule_id] = self.counts.get(rule_id, 0) + other.counts[rule_id]
+
+            if self.examples is not None:
+                seen = {}
+                examples = []
+                for message in rule_messages:
+                    key = (rule_id, message["type"])
+                    seen[key] = seen.get(key, 0) + 1
+                    if self._type_counts.get(key, 0) + seen[key] <= self.examples:
+                        examples.append(message)
+                rule_messages = examples
+
+            room = self._rule_message_cap - len(self.messages[rule_id])
+            if room > 0:
+                self.messages[rule_id].extend(rule_messages[:room])
+                kept.extend(rule_messages[:room])
+
+        for key, count in other._type_counts.items():
+            self._type_counts[key] = self._type_counts.get(key, 0) + count
+
+        return kept
 
     def json(self, lines, associations, skipped) -> Dict:
         result = {
@@ -2,7 +2,7 @@ import json
 import enum
 import collections
 import datetime
-import copy
+import dataclasses
 import logging
 
 from dataclasses import dataclass
@@ -23,16 +23,26 @@ FailMode = enum.Enum("FailMode", {"SOFT": "soft", "HARD": "hard"})
 ResultType = enum.Enum("Result", {"PASS": "Pass", "WARNING": "Warning", "ERROR": "Error"})
 RepairState = enum.Enum("RepairState", {"OKAY": "Okay", "REPAIRED": "Repaired", "FAILED": "Failed"})
 
-ecomapping = ecomap.EcoMap()
-iea_eco = ecomapping.coderef_to_ecoclass("IEA")
-ida_eco = ecomapping.coderef_to_ecoclass("IDA")
-ipi_eco = ecomapping.coderef_to_ecoclass("IPI")
-ic_eco = ecomapping.coderef_to_ecoclass("IC")
-nd_eco = ecomapping.coderef_to_ecoclass("ND")
-ikr_eco = ecomapping.coderef_to_ecoclass("IKR")
-iba_eco = ecomapping.coderef_to_ecoclass("IBA")
-iep_eco = ecomapping.coderef_to_ecoclass("IEP")
-hep_eco = ecomapping.coderef_to_ecoclass("HEP")
+# ECO classes of the default mapping, looked up on first access so that importing does not read it
+_eco_codes = {
+    "iea_eco": "IEA",
+    "ida_eco": "IDA",
+    "ipi_eco": "IPI",
+    "ic_eco": "IC",
+    "nd_eco": "ND",
+    "ikr_eco": "IKR",
+    "iba_eco": "IBA",
+    "iep_eco": "IEP",
+    "hep_eco": "HEP"
+}
+
+
+def __getattr__(name):
+    if name == "ecomapping":
+        return ecomap.get_ecomap()
+    if name in _eco_codes:
+        return ecomap.get_ecomap().coderef_to_ecoclass(_eco_codes[name])
+    raise AttributeError("module {} has no attribute {}".format(__name__, name))
 
 
 # TestResult = collections.namedtuple("TestResult", ["result_type", "message", "result"])
@@ -120,24 +130,48 @@ class GoRule(object):
         # Or, if any run_context_tags is in rule_tags_to_match, then run
         return len(self.run_context_tags) == 0 or any(self.run_context_tags & rule_tags_to_match)
 
-    def _run_if_context(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
-        if not config.rule_set.should_run_rule(self.id.split(":")[1]):
-            # We check that this rule can be run based on the ID and what is in the config rule_set.
-            # If we should not run the rule, we'll auto-pass it here.
-            # In the future, we could use a new result type, SKIP here.
-            return TestResult(ResultType.PASS, "", annotation)
+    def is_enabled(self, config: assocparser.AssocParserConfig) -> bool:
+        """
+        True if this rule is in the config rule_set and runs in the config rule_contexts
+        """
+        return config.rule_set.should_run_rule(int(self.id.split(":")[1])) and self._is_run_from_context(config)
 
-        result = TestResult(ResultType.PASS, "", annotation)
-        if self._is_run_from_context(config):
-            result = self.test(annotation, config, group=group)
+    def compile(self, plan: "RulePlan") -> Any:
+        """
+        Subclasses that look up term sets or metadata for every annotation should
+        override this to compute them once for the config of the plan. Whatever is
+        returned is available in `test` as `self.compiled(config)`.
+        """
+        return None
 
-        return result
+    def compiled(self, config: assocparser.AssocParserConfig) -> Any:
+        return compile_rules(config).compiled(self)
 
-    def run_test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
-        result = self._run_if_context(annotation, config, group=group)
+    def eco_class(self, config: assocparser.AssocParserConfig, code: str) -> Optional[str]:
+        """
+        ECO class of a GAF evidence code in the ecomap of config
+        """
+        return compile_rules(config).eco_class(code)
+
+    def eco_classes(self, config: assocparser.AssocParserConfig, codes: List[str]) -> Set[str]:
+        return compile_rules(config).eco_classes(codes)
+
+    def apply(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
+        """
+        Tests the annotation without checking if the rule is enabled for config
+        """
+        result = self.test(annotation, config, group=group)
         result.result = annotation
         return result
 
+    def run_test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
+        if not self.is_enabled(config):
+            # If we should not run the rule, we'll auto-pass it here.
+            # In the future, we could use a new result type, SKIP here.
+            return TestResult(ResultType.PASS, "", annotation)
+
+        return self.apply(annotation, config, group=group)
+
     def test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
         """
         Subclasses should override this function to implement the logic of the rule.
@@ -167,9 +201,8 @@ class RepairRule(GoRule):
 
         return message
 
-    def run_test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
-        result = self._run_if_context(annotation, config, group=group)
-        return result
+    def apply(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
+        return self.test(annotation, config, group=group)
 
     def repair(self, annotation: association.GoAssociation, group=None) -> Tuple[List, RepairState]:
         pass
@@ -197,7 +230,7 @@ class GoRule06(GoRule):
 
         go_namespace = [predval for predval in config.ontology.get_graph().nodes.get(str(annotation.object.id), {}).get("meta", {}).get("basicPropertyValues", []) if predval["pred"]=="OIO:hasOBONamespace"]
         evidence = str(annotation.evidence.type)
-        fails = evidence in [iep_eco, hep_eco] and "biological_process" not in [o["val"] for o in go_namespace]
+        fails = evidence in self.eco_classes(config, ["IEP", "HEP"]) and "biological_process" not in [o["val"] for o in go_namespace]
         return self._result(not fails)
 
 
@@ -205,21 +238,24 @@ class GoRule07(GoRule):
 
     def __init__(self):
         super().__init__("GORULE:0000007", "IPI should not be used with catalytic activity molecular function terms", FailMode.SOFT)
-        self.children_of_catalytic_activity = None
 
-    def test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
+    def compile(self, plan: "RulePlan") -> Optional[Set[str]]:
         catalytic_activity = "GO:0003824"
-        if config.ontology is not None and self.children_of_catalytic_activity is None:
-            # We'll define children_of_catalytic_activity if we have an ontology *and* if we haven't defined it before already
-            self.children_of_catalytic_activity = set(config.ontology.descendants(catalytic_activity, relations=["subClassOf"], reflexive=True))
+        if plan.ontology is None:
+            return None
+
+        return plan.descendants(catalytic_activity, ["subClassOf"])
+
+    def test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
+        children_of_catalytic_activity = self.compiled(config)
 
         goterm = str(annotation.object.id)
         evidence = str(annotation.evidence.type)
 
         fails = False
-        if self.children_of_catalytic_activity is not None:
+        if children_of_catalytic_activity is not None:
             # We fail if evidence is IPI and the goterm is a subclass of catalytic activity, else we good
-            fails = evidence == ipi_eco and goterm in self.children_of_catalytic_activity
+            fails = evidence == self.eco_class(config, "IPI") and goterm in children_of_catalytic_activity
 
         return self._result(not fails)
 
@@ -228,26 +264,26 @@ class GoRule08(GoRule):
 
     def __init__(self):
         super().__init__("GORULE:0000008", "No annotations should be made to uninformatively high level terms", FailMode.SOFT)
-        self.do_not_annotate = None
-        self.do_not_manually_annotate = None
+
+    def compile(self, plan: "RulePlan") -> Optional[Tuple[Set[str], Set[str]]]:
+        if plan.ontology is None:
+            return None
+
+        do_not_annotate = set(plan.ontology.extract_subset("gocheck_do_not_annotate"))
+        do_not_manually_annotate = set(plan.ontology.extract_subset("gocheck_do_not_manually_annotate"))
+        return (do_not_annotate, do_not_manually_annotate)
 
     def test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
-        # Cache the subsets
         if config.ontology is None:
             return self._result(True)
 
-        if self.do_not_annotate is None and config.ontology is not None:
-            self.do_not_annotate = set(config.ontology.extract_subset("gocheck_do_not_annotate"))
-            self.do_not_manually_annotate = set(config.ontology.extract_subset("gocheck_do_not_manually_annotate"))
-        elif self.do_not_annotate is None and config.ontology is None:
-            self.do_not_annotate = []
-            self.do_not_manually_annotate = []
+        do_not_annotate, do_not_manually_annotate = self.compiled(config)
 
         goid = str(annotation.object.id)
         evidence = str(annotation.evidence.type)
 
-        auto_annotated = goid in self.do_not_annotate
-        manually_annotated = evidence != iea_eco and goid in self.do_not_manually_annotate
+        auto_annotated = goid in do_not_annotate
+        manually_annotated = evidence != self.eco_class(config, "IEA") and goid in do_not_manually_annotate
         not_high_level = not (auto_annotated or manually_annotated)
 
         t = result(not_high_level, self.fail_mode)
@@ -258,7 +294,7 @@ class GoRule11(GoRule):
 
     def __init__(self):
         super().__init__("GORULE:0000011", "ND annotations to root nodes only", FailMode.HARD)
-        self.root_go_classes = ["GO:0003674", "GO:0005575", "GO:0008150"]
+        self.root_go_classes = {"GO:0003674", "GO:0005575", "GO:0008150"}
 
     def test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
         goclass = str(annotation.object.id)
@@ -266,6 +302,7 @@ class GoRule11(GoRule):
 
         # If we see a bad evidence, and we're not in a paint file then fail.
         # We're good if both predicates are true, or neither are true
+        nd_eco = self.eco_class(config, "ND")
         success = (evidence == nd_eco and goclass in self.root_go_classes) or (evidence != nd_eco and goclass not in self.root_go_classes)
         return self._result(success)
 
@@ -275,7 +312,6 @@ class GoRule13(GoRule):
 
     def __init__(self):
         super().__init__("GORULE:0000013", "Taxon-appropriate annotation check", FailMode.HARD)
-        self.non_experimental_evidence = self.get_non_experimental_evidence_eco()
 
     def test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
         if config.annotation_inferences is None:
@@ -297,45 +333,42 @@ class GoRule13(GoRule):
             return self._result(True)
         else:
             # Filter non experimental evidence
-            if str(annotation.evidence.type) in self.non_experimental_evidence:
+            if str(annotation.evidence.type) in self.get_non_experimental_evidence_eco(config):
                 return self._result(False)
             else:
                 # Only submit a warning/report if we are an experimental evidence
                 return TestResult(ResultType.WARNING, self.title, False)
 
-    def get_non_experimental_evidence_eco(self):
-        non_experimental_eco_codes = set()
-        for ev_code in self.NON_EXPERIMENTAL_EVIDENCE:
-            non_experimental_eco_codes.add(ecomapping.coderef_to_ecoclass(ev_code))
-        return non_experimental_eco_codes
+    def get_non_experimental_evidence_eco(self, config: assocparser.AssocParserConfig) -> Set[str]:
+        return self.eco_classes(config, self.NON_EXPERIMENTAL_EVIDENCE)
 
 
 class GoRule15(GoRule):
 
     def __init__(self):
         super().__init__("GORULE:0000015", "Dual species taxon check", FailMode.SOFT)
-        self.allowed_dual_species_terms = None
 
-    def test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
+    def compile(self, plan: "RulePlan") -> Optional[Set[str]]:
+        if plan.ontology is None:
+            return None
+
+        interaction_terms = plan.descendants("GO:0044419", ["subClassOf", "BFO:0000050"])
+        interspecies_interactions_regulation = plan.descendants("GO:0043903", ["subClassOf"])
+        host_cellular_component = plan.descendants("GO:0018995", ["subClassOf"])
+        return interaction_terms | interspecies_interactions_regulation | host_cellular_component
 
-        # Cache the allowed terms
-        if self.allowed_dual_species_terms is None and config.ontology is not None:
-            interaction_terms = config.ontology.descendants("GO:0044419", relations=["subClassOf", "BFO:0000050"], reflexive=True)
-            interspecies_interactions_regulation = config.ontology.descendants("GO:0043903", relations=["subClassOf"], reflexive=True)
-            host_cellular_component = config.ontology.descendants("GO:0018995", relations=["subClassOf"], reflexive=True)
-            self.allowed_dual_species_terms = set(interaction_terms + interspecies_interactions_regulation + host_cellular_component)
-        elif config.ontology is None:
+    def test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
+        if config.ontology is None:
             return self._result(True)
 
-        passes = False
-        if self.allowed_dual_species_terms is not None:
-            dual = annotation.interacting_taxon is not None
-            goterm = str(annotation.object.id)
+        allowed_dual_species_terms = self.compiled(config)
+        dual = annotation.interacting_taxon is not None
+        goterm = str(annotation.object.id)
 
-            # We fail if we are a dual taxon and then the term is not in this list
-            # This is the same as dual -> goterm in list
-            # Implication rewritten is Not P OR Q
-            passes = not dual or (goterm in self.allowed_dual_species_terms)
+        # We fail if we are a dual taxon and then the term is not in this list
+        # This is the same as dual -> goterm in list
+        # Implication rewritten is Not P OR Q
+        passes = not dual or (goterm in allowed_dual_species_terms)
 
         return self._result(passes)
 
@@ -350,7 +383,7 @@ class GoRule16(GoRule):
         withfrom = annotation.evidence.with_support_from
 
         okay = True
-        if evidence == ic_eco:
+        if evidence == self.eco_class(config, "IC"):
             only_go = [t for conjunctions in withfrom for t in conjunctions.elements if t.namespace == "GO"] # Filter terms that aren't GO terms
             okay = len(only_go) >= 1
 
@@ -366,7 +399,7 @@ class GoRule17(GoRule):
         evidence = str(annotation.evidence.type)
         withfrom = annotation.evidence.with_support_from
 
-        if evidence == ida_eco:
+        if evidence == self.eco_class(config, "IDA"):
             return self._result(not bool(withfrom))
         else:
             return self._result(True)
@@ -381,7 +414,7 @@ class GoRule18(GoRule):
         evidence = str(annotation.evidence.type)
         withfrom = annotation.evidence.with_support_from
 
-        if evidence == ipi_eco:
+        if evidence == self.eco_class(config, "IPI"):
             return self._result(bool(withfrom))
         else:
             return self._result(True)
@@ -392,12 +425,11 @@ class GoRule26(GoRule):
     def __init__(self):
         super().__init__("GORULE:0000026", "IBA evidence codes should be filtered from main MOD gaf sources", FailMode.HARD)
         self.offending_evidence = ["IBA"]
-        self.offending_evidence_eco = [ecomapping.coderef_to_ecoclass(ev) for ev in self.offending_evidence]
 
     def test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
         evidence = str(annotation.evidence.type)
         # If we see a bad evidence, and we're not in a paint file then fail.
-        fails = (evidence in self.offending_evidence_eco and not config.paint)
+        fails = (evidence in self.eco_classes(config, self.offending_evidence) and not config.paint)
         return self._result(not fails)
 
 
@@ -429,12 +461,12 @@ class GoRule28(RepairRule):
         expected_aspect = self.namespace_aspect_map[namespace]
 
         correct_aspect = expected_aspect == aspect
-        annotation.aspect = expected_aspect
 
         repair_state = None
         if correct_aspect:
             repair_state = RepairState.OKAY
         else:
+            annotation = dataclasses.replace(annotation, aspect=expected_aspect)
             repair_state = RepairState.REPAIRED
 
         return TestResult(repair_result(repair_state, self.fail_mode), self.message(repair_state), annotation)
@@ -460,7 +492,7 @@ class GoRule29(GoRule):
                                             int(date.day),
                                             0, 0, 0, 0)
 
-        if evidence == iea_eco:
+        if evidence == self.eco_class(config, "IEA"):
             if time_diff > time_compare_delta_long:
                 return self._result(False)
             elif time_diff > time_compare_delta_short:
@@ -504,7 +536,7 @@ class GoRule37(GoRule):
         assigned_by = annotation.provided_by
 
         result = self._result(True) # By default we pass
-        if evidence == iba_eco:
+        if evidence == self.eco_class(config, "IBA"):
             result = self._result(assigned_by == "GO_Central" and "PMID:21873635" in references)
 
         return result
@@ -534,7 +566,7 @@ class GoRule42(GoRule):
         evidence = str(annotation.evidence.type)
 
         result = self._result(True)
-        if evidence == ikr_eco:
+        if evidence == self.eco_class(config, "IKR"):
             result = self._result(annotation.negated)
 
         return result
@@ -574,25 +606,24 @@ class GoRule46(GoRule):
     def __init__(self):
         super().__init__("GORULE:0000046", "The ‘with’ field (GAF column 8) must be the same as the gene product (GAF colummn 2) when annotating to ‘self-binding’ terms", FailMode.SOFT)
         self.self_binding_roots = ["GO:0042803", "GO:0051260", "GO:0051289", "GO:0070207", "GO:0043621", "GO:0032840"]
-        self.self_binding_terms = None
 
-    def test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
-        if config.ontology is not None and self.self_binding_terms is None:
-            all_terms = []
-            # Initialize the self_binding terms if we have an ontology and we haven't already initialized the terms
-            for binding_root in self.self_binding_roots:
-                root_descendants = config.ontology.descendants(binding_root, relations=["subClassOf"], reflexive=True)
-                all_terms += root_descendants
-
-            self.self_binding_terms = set(all_terms)
-        elif config.ontology is None:
+    def compile(self, plan: "RulePlan") -> Set[str]:
+        if plan.ontology is None:
             # Make sure if we don't have an ontology we still use the set roots
-            self.self_binding_terms = self.self_binding_roots
+            return set(self.self_binding_roots)
 
+        self_binding_terms = set()
+        for binding_root in self.self_binding_roots:
+            self_binding_terms |= plan.descendants(binding_root, ["subClassOf"])
+
+        return self_binding_terms
+
+    def test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
+        self_binding_terms = self.compiled(config)
         withfroms = annotation.evidence.with_support_from
         goterm = str(annotation.object.id)
 
-        if goterm in self.self_binding_terms:
+        if goterm in self_binding_terms:
             # Then we're in the self-binding case, and check if object ID is in withfrom
             for conj in withfroms:
                 if annotation.subject.id in conj.elements:
@@ -608,14 +639,13 @@ class GoRule50(GoRule):
     def __init__(self):
         super().__init__("GORULE:0000050", "Annotations to ISS, ISA and ISO should not be self-referential", FailMode.SOFT)
         self.the_evidences = ["ISS", "ISA", "ISO"]
-        self.the_evidences_eco = [ecomapping.coderef_to_ecoclass(ev) for ev in self.the_evidences]
 
     def test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
         # should not have the same identifier in the 'gene product column' (column 2) and in the 'with/from' column
         # (column 8)
         evidence = str(annotation.evidence.type)
         result = self._result(True)
-        if evidence in self.the_evidences_eco:
+        if evidence in self.eco_classes(config, self.the_evidences):
             # Ensure the gp ID is not an entry in withfrom
             for conj in annotation.evidence.with_support_from:
                 result = self._result(annotation.subject.id not in conj.elements)
@@ -644,23 +674,30 @@ class GoRule57(GoRule):
     def __init__(self):
         super().__init__("GORULE:0000057", "Group specific filter rules should be applied to annotations", FailMode.HARD, tags=["context-import"])
 
+    def compile(self, plan: "RulePlan") -> Optional[Tuple[Set[str], Set[Tuple[str, str]], List[str]]]:
+        if plan.group_metadata is None:
+            return None
+
+        filter_out = plan.group_metadata.get("filter_out", {})
+        evidence_codes = set(filter_out.get("evidence", []))
+        evidences_references = {(er["evidence"], er["reference"]) for er in filter_out.get("evidence_reference", [])}
+        properties = filter_out.get("annotation_properties", [])
+        return (evidence_codes, evidences_references, properties)
+
     def test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
         # Check group_metadata is present
         if config.group_metadata is None:
             return self._result(True)
 
-        evidence_codes = config.group_metadata.get("filter_out", {}).get("evidence", [])
-        if str(annotation.evidence.type) in evidence_codes:
+        evidence_codes, evidences_references, properties = self.compiled(config)
+        evidence = str(annotation.evidence.type)
+        if evidence in evidence_codes:
             return self._result(False)
 
-        evidences_references = config.group_metadata.get("filter_out", {}).get("evidence_reference", [])
-        for er in evidences_references:
-            evidence_code = er["evidence"]
-            reference = er["reference"]
-            if str(annotation.evidence.type) == evidence_code and [str(ref) for ref in annotation.evidence.has_supporting_reference] == [reference]:
-                return self._result(False)
+        references = annotation.evidence.has_supporting_reference
+        if len(references) == 1 and (evidence, str(references[0])) in evidences_references:
+            return self._result(False)
 
-        properties = config.group_metadata.get("filter_out", {}).get("annotation_properties", [])
         for p in properties:
             if p in annotation.properties.keys():
                 return self._result(False)
@@ -684,21 +721,22 @@ class GoRule58(RepairRule):
 
         repair_state = RepairState.OKAY
 
-        bad_conjunctions = []
+        good_conjunctions = []
         for con in annotation.object_extensions:
             # Count each extension unit, represented by tuple (Relation, Namespace)
             extension_counts = collections.Counter([(str(unit.relation), unit.term.namespace) for unit in con.elements])
 
             matches = self._do_conjunctions_match_constraint(con, annotation.object.id, config.extensions_constraints, extension_counts)
             # If there is a match in the constraints, then we're all good and we can exit with a pass!
-            if not matches:
-                bad_conjunctions.append(con)
+            if matches:
+                good_conjunctions.append(con)
+            else:
                 repair_state = RepairState.REPAIRED
 
-        repaired_annotation = copy.deepcopy(annotation)
-        for con in bad_conjunctions:
+        repaired_annotation = annotation
+        if repair_state == RepairState.REPAIRED:
             # Remove the bad conjunctions as the "repair"
-            repaired_annotation.object_extensions.remove(con)
+            repaired_annotation = dataclasses.replace(annotation, object_extensions=good_conjunctions)
 
         return TestResult(repair_result(repair_state, self.fail_mode), self.message(repair_state), repaired_annotation)
 
@@ -750,7 +788,6 @@ class GoRule61(RepairRule):
 
     def __init__(self):
         super().__init__("GORULE:0000061", "Only certain gene product to term relations are allowed for a given GO term", FailMode.HARD)
-        self.protein_containing_complex_descendents = None
 
         self.allowed_mf = set([association.Curie(namespace="RO", identity="0002327"), association.Curie(namespace="RO", identity="0002326")])
         self.allowed_bp = set([association.Curie("RO", "0002331"), association.Curie("RO", "0002264"),
@@ -760,12 +797,12 @@ class GoRule61(RepairRule):
         self.repairable_cc_complex = set([association.Curie("RO", "0002432"), association.Curie("RO", "0001025")])
         self.allowed_cc_other = set([association.Curie("RO", "0001025"), association.Curie("RO", "0002432"), association.Curie("RO", "0002325")])
 
-    def make_protein_complex_descendents_if_not_present(self, ontology: Optional[ontol.Ontology]) -> Set:
-        if ontology is not None and self.protein_containing_complex_descendents is None:
-            closure = gafparser.protein_complex_sublcass_closure(ontology)
-            self.protein_containing_complex_descendents = closure
+    def compile(self, plan: "RulePlan") -> Set[str]:
+        return plan.protein_complex_descendants()
 
-        return {} if self.protein_containing_complex_descendents is None else self.protein_containing_complex_descendents
+    def _repair_relation(self, annotation: association.GoAssociation, relation: association.Curie) -> association.GoAssociation:
+        # Copy only the fields we change, sharing everything else with the original annotation
+        return dataclasses.replace(annotation, relation=relation, qualifiers=[relation])
 
     def test(self, annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> TestResult:
         """
@@ -794,51 +831,39 @@ class GoRule61(RepairRule):
         if term == "GO:0005554":
             enables = association.Curie(namespace="RO", identity="0002327")
             if relation != enables:
-                repaired_annotation = copy.deepcopy(annotation)
-                repaired_annotation.relation = enables
-                repaired_annotation.qualifiers = [enables]
+                repaired_annotation = self._repair_relation(annotation, enables)
                 allowed = set([enables])
                 repair_state = RepairState.REPAIRED
         elif namespace == "molecular_function":
             if relation not in self.allowed_mf:
                 enables = association.Curie(namespace="RO", identity="0002327")
-                repaired_annotation = copy.deepcopy(annotation)
-                repaired_annotation.relation = enables
-                repaired_annotation.qualifiers = [enables]
+                repaired_annotation = self._repair_relation(annotation, enables)
                 allowed = self.allowed_mf
                 repair_state = RepairState.REPAIRED
         elif term == "GO:0008150":
             involved_in = association.Curie(namespace="RO", identity="0002331")
             if relation != involved_in:
-                repaired_annotation = copy.deepcopy(annotation)
-                repaired_annotation.relation = involved_in
-                repaired_annotation.qualifiers = [involved_in]
+                repaired_annotation = self._repair_relation(annotation, involved_in)
                 allowed = set([involved_in])
                 repair_state = RepairState.REPAIRED
         elif namespace == "biological_process":
             acts_upstream_of_or_within = association.Curie("RO", "0002264")
             if relation not in self.allowed_bp:
-                repaired_annotation = copy.deepcopy(annotation)
-                repaired_annotation.relation = acts_upstream_of_or_within
-                repaired_annotation.qualifiers = [acts_upstream_of_or_within]
+                repaired_annotation = self._repair_relation(annotation, acts_upstream_of_or_within)
                 allowed = self.allowed_bp
                 repair_state = RepairState.REPAIRED
         elif term == "GO:0005575":
             is_active_in = association.Curie(namespace="RO", identity="0002432")
             if relation != is_active_in:
-                repaired_annotation = copy.deepcopy(annotation)
-                repaired_annotation.relation = is_active_in
-                repaired_annotation.qualifiers = [is_active_in]
+                repaired_annotation = self._repair_relation(annotation, is_active_in)
                 allowed = set([is_active_in])
                 repair_state = RepairState.REPAIRED
         elif namespace == "cellular_component":
-            if term in self.make_protein_complex_descendents_if_not_present(config.ontology):
+            if term in self.compiled(config):
                 part_of = association.Curie(namespace="BFO", identity="0000050")
                 if relation not in self.allowed_cc_complex:
                     if relation in self.repairable_cc_complex:
-                        repaired_annotation = copy.deepcopy(annotation)
-                        repaired_annotation.relation = part_of
-                        repaired_annotation.qualifiers = [part_of]
+                        repaired_annotation = self._repair_relation(annotation, part_of)
                         allowed = self.allowed_cc_complex
                         repair_state = RepairState.REPAIRED
                     else:
@@ -849,9 +874,7 @@ class GoRule61(RepairRule):
             else:
                 located_in = association.Curie(namespace="RO", identity="0001025")
                 if relation not in self.allowed_cc_other:
-                    repaired_annotation = copy.deepcopy(annotation)
-                    repaired_annotation.relation = located_in
-                    repaired_annotation.qualifiers = [located_in]
+                    repaired_annotation = self._repair_relation(annotation, located_in)
                     allowed = self.allowed_cc_other
                     repair_state = RepairState.REPAIRED
         else:
@@ -896,14 +919,105 @@ GoRules = enum.Enum("GoRules", {
 GoRulesResults = collections.namedtuple("GoRulesResults", ["all_results", "annotation"])
 
 
+class RulePlan(object):
+    """
+    The GO Rules enabled for an AssocParserConfig, with the term sets and metadata
+    lookups they need computed once up front. Build with `compile_rules`.
+    """
+
+    def __init__(self, config: assocparser.AssocParserConfig):
+        self.ontology = config.ontology
+        self.rule_set = config.rule_set
+        self.rule_contexts = list(config.rule_contexts)
+        self.group_metadata = config.group_metadata
+        self.ecomap = config.ecomap
+        self._eco_classes = {}  # type: Dict[str, Optional[str]]
+        self._eco_class_sets = {}  # type: Dict[Tuple[str, ...], Set[str]]
+        self._descendants = {}  # type: Dict[Tuple[str, Tuple[str, ...]], Set[str]]
+        self._compiled = {}  # type: Dict[str, Any]
+        self.all_rules = [rule.value for rule in GoRules]
+        # Rules that can never fire for this config are not run, but still pass
+        self.rules = [rule for rule in self.all_rules if rule.is_enabled(config)]
+        self.skipped = set(self.all_rules) - set(self.rules)
+        for rule in self.rules:
+            self.compiled(rule)
+
+    def is_compiled_for(self, config: assocparser.AssocParserConfig) -> bool:
+        return (config.ontology is self.ontology and config.rule_set is self.rule_set
+                and config.rule_contexts == self.rule_contexts and config.group_metadata is self.group_metadata
+                and config.ecomap is self.ecomap)
+
+    def descendants(self, term: str, relations: List[str]) -> Set[str]:
+        """
+        Reflexive descendants of term over relations, or an empty set without an ontology
+        """
+        key = (term, tuple(relations))
+        if key not in self._descendants:
+            if self.ontology is None:
+                self._descendants[key] = set()
+            else:
+                self._descendants[key] = set(self.ontology.descendants(term, relations=relations, reflexive=True))
+
+        return self._descendants[key]
+
+    def eco_class(self, code: str) -> Optional[str]:
+        """
+        ECO class of a GAF evidence code, or None if it is not in the ecomap. The
+        ecomap is first read when a rule needs it, rather than on import
+        """
+        if code not in self._eco_classes:
+            self._eco_classes[code] = self.ecomap.coderef_to_ecoclass(code)
+
+        return self._eco_classes[code]
+
+    def eco_classes(self, codes: List[str]) -> Set[str]:
+        key = tuple(codes)
+        if key not in self._eco_class_sets:
+            self._eco_class_sets[key] = {self.eco_class(code) for code in codes}
+
+        return self._eco_class_sets[key]
+
+    def protein_complex_descendants(self) -> Set[str]:
+        return self.descendants("GO:0032991", ["subClassOf"])
+
+    def compiled(self, rule: GoRule) -> Any:
+        """
+        What `rule.compile` returns for this plan. Rules that are not in the plan,
+        such as ones tested directly, are compiled on first use.
+        """
+        if rule.id not in self._compiled:
+            self._compiled[rule.id] = rule.compile(self)
+
+        return self._compiled[rule.id]
+
+
+def compile_rules(config: assocparser.AssocParserConfig) -> RulePlan:
+    """
+    Returns the RulePlan for config. The plan is kept on the config and rebuilt
+    only if the ontology, rule set, rule contexts, group metadata or ecomap change.
+    """
+    plan = config.rule_plan
+    if plan is None or not plan.is_compiled_for(config):
+        plan = RulePlan(config)
+        config.rule_plan = plan
+
+    return plan
+
+
 def test_go_rules(annotation: association.GoAssociation, config: assocparser.AssocParserConfig, group=None) -> GoRulesResults:
     all_results = {}
 
     active_annotation = annotation
-    for rule in list(GoRules):
-        result = rule.value.run_test(active_annotation, config, group=group)
+    plan = compile_rules(config)
+    for rule in plan.all_rules:
+        if rule in plan.skipped:
+            # Report disabled rules as passing, as every rule is listed in the report
+            all_results[rule] = TestResult(ResultType.PASS, "", active_annotation)
+            continue
+
+        result = rule.apply(active_annotation, config, group=group)
         # Accumulate all repairs performed  by all tests to the annotation
         active_annotation = result.result
-        all_results[rule.value] = result
+        all_results[rule] = result
 
     return GoRulesResults(all_results, active_annotation)
@@ -26,6 +26,7 @@ reciprocal_score: int
 import networkx as nx
 from networkx.algorithms import strongly_connected_components
 import logging
+import multiprocessing
 import re
 from ontobio.ontol import Synonym, Ontology
 from collections import defaultdict
@@ -44,6 +45,12 @@ def logit(p):
 def inv_logit(w):
     return 1/(1+2**(-w))
 
+# engine used by worker processes in LexicalMapEngine.get_xref_graph, inherited on fork
+_worker_engine = None
+
+def _shard_best_candidates(keys):
+    return _worker_engine._best_candidates(keys)
+
 def default_wsmap():
     """
     Default word to normalized synonym list
@@ -267,6 +274,9 @@ class LexicalMapEngine():
 
         This avoids N^2 pairwise comparisons: instead the time taken is linear
 
+        - The keys can be split into shards compared by a pool of processes (config `workers`),
+          and keys with very many synonyms can be left out (config `max_bucket_size`)
+
         After initial mapping is made, additional scoring is performed on each mapping
 
         Edge properties
@@ -286,61 +296,46 @@ class LexicalMapEngine():
             nx graph (bidirectional)
         """
 
-        # initial graph; all matches
-        g = nx.MultiDiGraph()
-
         # lmap collects all syns by token
-        items = self.lmap.items()
-        logger.info("collecting initial xref graph, items={}".format(len(items)))
-        i = 0
-        sum_nsyns = 0
-        n_skipped = 0
-        has_self_comparison = False
-        if self.ontology_pairs:
-            for (o1id,o2id) in self.ontology_pairs:
-                if o1id == o2id:
-                    has_self_comparison = True
-
-        for (v,syns) in items:
-            sum_nsyns += len(syns)
-            i += 1
-            if i % 1000 == 1:
-                logger.info('{}/{}  lexical items avgSyns={}, skipped={}'.format(i,len(items), sum_nsyns/len(items), n_skipped))
-            if len(syns) < 2:
-                n_skipped += 1
-                next
-            if len(syns) > 10:
-                logger.info('Syns for {} = {}'.format(v,len(syns)))
-            for s1 in syns:
-                s1oid = s1.ontology.id
-                s1cid = s1.class_id
-                for s2 in syns:
-                    # optimization step: although this is redundant with _is_comparable,
-                    # we avoid inefficient additional calls
-                    if s1oid == s2.ontology.id and not has_self_comparison:
-                        next
-                    if s1cid != s2.class_id:
-                        if self._is_comparable(s1,s2):
-                            g.add_edge(s1.class_id, s2.class_id, syns=(s1,s2))
-
-        logger.info("getting best supporting synonym pair for each match")
-        # graph of best matches
+        keys = list(self.lmap.keys())
+        logger.info("collecting initial xref graph, items={}".format(len(keys)))
+
+        # best supporting synonym pair for each match
+        best = {}
+        workers = self.config.get('workers', 1)
+        if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+            global _worker_engine
+            shard_size = max(1, math.ceil(len(keys) / (workers * 8)))
+            shards = [keys[k:k+shard_size] for k in range(0, len(keys), shard_size)]
+            _worker_engine = self
+            try:
+                with multiprocessing.get_context("fork").Pool(workers) as pool:
+                    for (n, shard_best) in enumerate(pool.imap(_shard_best_candidates, shards)):
+                        logger.info('{}/{} shards of lexical items'.format(n+1, len(shards)))
+                        self._merge_best_candidates(best, shard_best)
+            finally:
+                _worker_engine = None
+        else:
+            if workers > 1:
+                logger.warning("Parallel candidate generation needs the fork start method; using a single process")
+            best = self._best_candidates(keys)
+
+        # graph of best matches, with edges added in the order the matches were found
+        successors = defaultdict(list)
+        nodes = {}
+        for (i,j) in best:
+            nodes.setdefault(i)
+            nodes.setdefault(j)
+            successors[i].append(j)
         xg = nx.Graph()
-        for i in g.nodes():
-            for j in g.neighbors(i):
-                best = 0
-                bestm = None
-                for m in g.get_edge_data(i,j).values():
-                    (s1,s2) = m['syns']
-                    score = self._combine_syns(s1,s2)
-                    if score > best:
-                        best = score
-                        bestm = m
-                syns = bestm['syns']
+        for i in nodes:
+            for j in successors[i]:
+                (score, v, a, b) = best[(i,j)]
+                syns = self.lmap[v]
                 xg.add_edge(i, j,
-                            score=best,
-                            lexscore=best,
-                            syns=syns,
+                            score=score,
+                            lexscore=score,
+                            syns=(syns[a], syns[b]),
                             idpair=(i,j))
 
         self.score_xrefs_by_semsim(xg)
@@ -352,6 +347,84 @@ class LexicalMapEngine():
         logger.info("finished xref graph")
         return xg
 
+    def _best_candidates(self, keys):
+        """
+        Compares the synonyms indexed under each of the lexical keys, and finds the best
+        scoring synonym pair for each pair of classes that match
+
+        Returns a dict from (class1, class2) to (score, key, index1, index2), where
+        index1 and index2 locate the synonyms in self.lmap[key]. Entries are in the
+        order the class pairs are first matched, and ties go to the first pair found.
+        """
+        best = {}
+        max_bucket_size = self.config.get('max_bucket_size', None)
+        sum_nsyns = 0
+        n_skipped = 0
+        for (i, v) in enumerate(keys):
+            syns = self.lmap[v]
+            sum_nsyns += len(syns)
+            if i % 1000 == 0:
+                logger.info('{}/{}  lexical items avgSyns={}, skipped={}'.format(i+1,len(keys), sum_nsyns/(i+1), n_skipped))
+            if len(syns) < 2:
+                n_skipped += 1
+                continue
+            if max_bucket_size is not None and len(syns) > max_bucket_size:
+                # very common strings would give a quadratic number of weak candidates
+                logger.warning('Skipping {} syns for {}; more than max_bucket_size'.format(len(syns), v))
+                n_skipped += 1
+                continue
+            if len(syns) > 10:
+                logger.info('Syns for {} = {}'.format(v,len(syns)))
+            for (a, b) in self._candidate_pairs(syns):
+                (s1, s2) = (syns[a], syns[b])
+                pair = (s1.class_id, s2.class_id)
+                score = self._combine_syns(s1,s2)
+                if pair not in best or score > best[pair][0]:
+                    best[pair] = (score, v, a, b)
+        return best
+
+    def _candidate_pairs(self, syns):
+        """
+        Positions (a, b) of the pairs of synonyms under one lexical key that should be
+        compared, in order
+
+        Synonyms are grouped by ontology, and only the groups for pairs of ontologies that
+        are compared are enumerated. `_is_comparable` is called once for each pair of classes.
+        """
+        by_ontology = defaultdict(list)
+        for (a, syn) in enumerate(syns):
+            by_ontology[syn.ontology.id].append(a)
+
+        if self.ontology_pairs is None:
+            ontology_pairs = [(o1, o2) for o1 in by_ontology for o2 in by_ontology]
+        else:
+            ontology_pairs = [(o1, o2) for (o1, o2) in dict.fromkeys(self.ontology_pairs)
+                              if o1 in by_ontology and o2 in by_ontology]
+
+        pairs = []
+        for (o1, o2) in ontology_pairs:
+            comparable = {}
+            for a in by_ontology[o1]:
+                c1 = syns[a].class_id
+                for b in by_ontology[o2]:
+                    c2 = syns[b].class_id
+                    if c1 == c2:
+                        continue
+                    if (c1, c2) not in comparable:
+                        comparable[(c1, c2)] = self._is_comparable(syns[a], syns[b])
+                    if comparable[(c1, c2)]:
+                        pairs.append((a, b))
+        pairs.sort()
+        return pairs
+
+    def _merge_best_candidates(self, best, other):
+        """
+        Adds the best candidates found for a later set of lexical keys to `best`
+        """
+        for (pair, candidate) in other.items():
+            if pair not in best or candidate[0] > best[pair][0]:
+                best[pair] = candidate
+
     # true if syns s1 and s2 should be compared.
     #  - if ontology_pairs is set, then only consider (s1,s2) if their respective source ontologies are in the list of pairs
     #  - otherwise compare all classes, but only in one direction
@@ -941,3 +1014,5 @@ class LexicalMapConfigSchema(Schema):
     match_weights = fields.List(fields.Nested(MatchWeights()))
     cardinality_weights = fields.List(fields.Nested(CardinalityWeights()))
     xref_weights = fields.List(fields.Nested(XrefWeights()))
+    workers = fields.Int(default=1, description="number of processes used to compare the synonyms under each lexical key")
+    max_bucket_size = fields.Int(description="lexical keys with more synonyms than this are not used for matching")
@@ -15,15 +15,13 @@ import enum
 import datetime
 import re
 import logging
+import sys
 
 import bidict
 from prefixcommons import curie_util
 
 from ontobio.rdfgen import relations
-from ontobio.ecomap import EcoMap
-
-ecomap = EcoMap()
-ecomap.mappings()
+from ontobio.ecomap import get_ecomap
 
 
 from typing import List, Optional, NamedTuple, Dict, Callable, Union, TypeVar, Tuple
@@ -70,22 +68,37 @@ def parse_annotation_properties(properties_field: str) -> List[tuple]:
     properties_list = [TwoTupleStr(prop.split("=", maxsplit=1)) for prop in properties_field.split("|") if prop]
     return properties_list
 
-@dataclass(unsafe_hash=True)
+# Curies parsed by Curie.from_str, so that each distinct CURIE string is held once
+_curie_cache = {}  # type: Dict[str, Curie]
+CURIE_CACHE_SIZE = 1000000
+
+@dataclass(unsafe_hash=True, frozen=True)
 class Curie:
     """
     Object representing a Compact URI, with a namespace identifier along with an ID, like GO:1234567.
 
     Use `from_str` to parse a string like "GO:1234567" into a Curie. The result should be checked for errors
     with `is_error`
+
+    Curies are immutable, so that `from_str` can hand out the same instance for the same string.
     """
+    __slots__ = ("namespace", "identity")
+
     namespace: str
     identity: str
 
     def __str__(self) -> str:
         return "{}:{}".format(self.namespace, self.identity)
 
+    def __reduce__(self):
+        return (self.__class__, (self.namespace, self.identity))
+
     @classmethod
     def from_str(Curie, entity: str):
+        curie = _curie_cache.get(entity)
+        if curie is not None:
+            return curie
+
         splitup = entity.split(":", maxsplit=1)
         splitup += [""] * (2 - len(splitup))
         namespace, identity = splitup
@@ -101,7 +114,11 @@ class Curie:
         if " " in namespace or " " in identity:
             return Error("No spaces allowed in CURIEs")
 
-        return Curie(namespace, identity)
+        if len(_curie_cache) >= CURIE_CACHE_SIZE:
+            _curie_cache.clear()
+        curie = Curie(sys.intern(namespace), identity)
+        _curie_cache[entity] = curie
+        return curie
 
     def is_error(self) -> bool:
         return False
@@ -109,6 +126,9 @@ class Curie:
 
 @dataclass(unsafe_hash=True)
 class Subject:
+    __slots__ = ("id", "label", "fullname", "synonyms", "type", "taxon", "encoded_by", "parents",
+                 "contained_complex_members", "db_xrefs", "properties")
+
     id: Curie
     label: str
     """
@@ -270,6 +290,8 @@ class Term:
     """
     Represents a Gene Ontology term
     """
+    __slots__ = ("id", "taxon")
+
     id: Curie
     taxon: Curie
 
@@ -286,6 +308,8 @@ class ConjunctiveSet:
     The field `elements` can be a list of Curie or ExtensionUnit. Curie for with/from, and
     ExtensionUnit for extensions field.
     """
+    __slots__ = ("elements",)
+
     elements: List
 
     def __str__(self) -> str:
@@ -346,6 +370,8 @@ class ConjunctiveSet:
 
 @dataclass(unsafe_hash=True)
 class Evidence:
+    __slots__ = ("type", "has_supporting_reference", "with_support_from")
+
     type: Curie # Curie of the ECO class
     has_supporting_reference: List[Curie]
     with_support_from: List[ConjunctiveSet]
@@ -387,6 +413,8 @@ class ExtensionUnit:
     will write the relation using the label with undercores (example: part_of) as defined in ontobio.rdfgen.relations.py.
     To write the relation as a CURIE (as in gpad 2.0), set parameter `use_rel_label` to `True`.
     """
+    __slots__ = ("relation", "term")
+
     relation: Curie
     term: Curie
 
@@ -479,6 +507,9 @@ class GoAssociation:
     Each parser has its own function or functions that converts an annotation line into a GoAssociation, and this is the first
     phase of parsing. In general, GoAssociations are only created by the parsers.
     """
+    __slots__ = ("source_line", "subject", "relation", "object", "negated", "qualifiers", "aspect", "interacting_taxon",
+                 "evidence", "subject_extensions", "object_extensions", "provided_by", "date", "properties")
+
     source_line: Optional[str]
     subject: Subject
     relation: Curie # This is the relation Curie
@@ -514,11 +545,10 @@ class GoAssociation:
 
         qualifier = "|".join(qual_labels)
 
-        self.object.taxon.namespace = "taxon"
-        taxon = str(self.object.taxon)
+        # GAF writes taxa as taxon:nnnn
+        taxon = "taxon:{}".format(self.object.taxon.identity)
         if self.interacting_taxon:
-            self.interacting_taxon.namespace = "taxon"
-            taxon = "{taxon}|{interacting}".format(taxon=taxon, interacting=str(self.interacting_taxon))
+            taxon = "{taxon}|taxon:{interacting}".format(taxon=taxon, interacting=self.interacting_taxon.identity)
 
         # For extensions, we provide the to string function on ConjunctElement that
         # calls its `display` method, with the flag to use labels instead of the CURIE.
@@ -530,7 +560,7 @@ class GoAssociation:
             qualifier,
             str(self.object.id),
             "|".join([str(ref) for ref in self.evidence.has_supporting_reference]),
-            ecomap.ecoclass_to_coderef(str(self.evidence.type))[0],
+            get_ecomap().ecoclass_to_coderef(str(self.evidence.type))[0],
             ConjunctiveSet.list_to_str(self.evidence.with_support_from),
             self.aspect if self.aspect else "",
             self.subject.fullname_field(),
@@ -556,11 +586,10 @@ class GoAssociation:
 
         qualifier = "|".join(qual_labels)
 
-        self.object.taxon.namespace = "taxon"
-        taxon = str(self.object.taxon)
+        # GAF writes taxa as taxon:nnnn
+        taxon = "taxon:{}".format(self.object.taxon.identity)
         if self.interacting_taxon:
-            self.interacting_taxon.namespace = "taxon"
-            taxon = "{taxon}|{interacting}".format(taxon=taxon, interacting=str(self.interacting_taxon))
+            taxon = "{taxon}|taxon:{interacting}".format(taxon=taxon, interacting=self.interacting_taxon.identity)
 
         return [
             self.subject.id.namespace,
@@ -569,7 +598,7 @@ class GoAssociation:
             qualifier,
             str(self.object.id),
             "|".join([str(ref) for ref in self.evidence.has_supporting_reference]),
-            ecomap.ecoclass_to_coderef(str(self.evidence.type))[0],
+            get_ecomap().ecoclass_to_coderef(str(self.evidence.type))[0],
             ConjunctiveSet.list_to_str(self.evidence.with_support_from),
             self.aspect if self.aspect else "",
             self.subject.fullname_field(),
@@ -679,7 +708,7 @@ class GoAssociation:
                 withfrom_flat.append(str(curie))
 
         evidence = {
-            "type": ecomap.ecoclass_to_coderef(str(self.evidence.type))[0],
+            "type": get_ecomap().ecoclass_to_coderef(str(self.evidence.type))[0],
             "has_supporting_reference": [str(ref) for ref in self.evidence.has_supporting_reference],
             "with_support_from": withfrom_flat
         }
@@ -9,7 +9,7 @@ import networkx as nx
 import logging
 import ontobio.ontol
 import requests
-from ontobio.ontol import Ontology
+from ontobio.ontol import Ontology, MetadataIndex
 from ontobio.util.user_agent import get_user_agent
 
 logger = logging.getLogger(__name__)
@@ -201,6 +201,12 @@ class RemoteScigraphOntology(Ontology):
                                   depth=0)
         return self._repair(g['nodes'][0])
 
+    # Override
+    def _metadata_for(self, nid):
+        mix = MetadataIndex()
+        mix.add_meta(nid, self._meta(nid))
+        return mix
+
     # Override
     def has_node(self, id):
         return self.node(id) is not None
@@ -2,7 +2,7 @@
 Mapping between obograph-JSON format and networkx
 """
 
-from ontobio.ontol import LogicalDefinition, PropertyChainAxiom
+from ontobio.ontol import LogicalDefinition, PropertyChainAxiom, RelationIndex
 from ontobio.vocabulary.relations import map_legacy_pred
 from ontobio.util.curie_map import get_curie_map
 from ontobio.golr.golr_associations import search_associations
@@ -10,7 +10,9 @@ from ontobio.golr.golr_associations import search_associations
 import json
 import networkx
 import logging
-from prefixcommons.curie_util import expand_uri, contract_uri
+import re
+from functools import lru_cache
+from prefixcommons.curie_util import expand_uri, contract_uri, default_curie_maps
 from diskcache import Cache
 import tempfile
 
@@ -20,13 +22,30 @@ cache = Cache(tempfile.gettempdir())
 
 logger = logging.getLogger(__name__)
 
+# number of URI to CURIE contractions memoized per mapper
+CURIE_CACHE_SIZE = 65536
+
 
 class OboJsonMapper(object):
     def __init__(self,
                  digraph=None,
-                 context=None):
+                 context=None,
+                 relation_index=None):
         self.digraph = digraph
-        self.context = context if context is not None else {}
+        self.context = context
+        # if set, per-relation adjacency is populated alongside the digraph
+        self.relation_index = relation_index
+
+    @property
+    def context(self):
+        return self._context
+
+    @context.setter
+    def context(self, context):
+        # the prefix table and memoized contractions depend on the context
+        self._context = context if context is not None else {}
+        self.prefix_table = PrefixTable([self._context])
+        self.contract_uri = lru_cache(maxsize=CURIE_CACHE_SIZE)(self._contract_uri)
 
     def add_obograph_digraph(
             self,
@@ -42,45 +61,72 @@ class OboJsonMapper(object):
         """
         Converts a single obograph to Digraph edges and adds to an existing networkx DiGraph
         """
-        digraph = self.digraph
         logger.info("NODES: {}".format(len(og['nodes'])))
+        for node in og['nodes']:
+            self.add_obograph_node(node, node_type=node_type, xref_graph=xref_graph, parse_meta=parse_meta)
+        logger.info("EDGES: {}".format(len(og['edges'])))
+        for edge in og['edges']:
+            self.add_obograph_edge(edge, predicates=predicates, reverse_edges=reverse_edges)
+        self.add_obograph_axioms(og,
+                                 logical_definitions=logical_definitions,
+                                 property_chain_axioms=property_chain_axioms)
 
+    def add_obograph_node(self, node, node_type=None, xref_graph=None, parse_meta=True, **args):
+        """
+        Adds a single obograph node object to the digraph
+        """
         # if client passes an xref_graph we must parse metadata
         if xref_graph is not None:
             parse_meta = True
 
-        for node in og['nodes']:
-            is_obsolete = 'is_obsolete' in node and node['is_obsolete'] == 'true'
-            if is_obsolete:
-                continue
-            if node_type is not None and ('type' not in node or node['type'] != node_type):
-                continue
-            id = self.contract_uri(node['id'])
-            digraph.add_node(id, **node)
-            if 'lbl' in node:
-                digraph.nodes[id]['label'] = node['lbl']
-            if parse_meta and 'meta' in node:
-                if node['meta'] is None:
-                    node['meta'] = {}
-                meta = self.transform_meta(node['meta'])
-                if xref_graph is not None and 'xrefs' in meta:
-                    for x in meta['xrefs']:
-                        xref_graph.add_edge(self.contract_uri(x['val']), id, source=id)
-        logger.info("EDGES: {}".format(len(og['edges'])))
-        for edge in og['edges']:
-            sub = self.contract_uri(edge['sub'])
-            obj = self.contract_uri(edge['obj'])
-            pred = self.contract_uri(edge['pred'])
-            pred = map_legacy_pred(pred)
-            if pred == 'is_a':
-                pred = 'subClassOf'
-            if predicates is None or pred in predicates:
-                meta = edge['meta'] if 'meta' in edge else {}
-                if reverse_edges:
-                    digraph.add_edge(obj, sub, pred=pred, **meta)
-                else:
-                    digraph.add_edge(sub, obj, pred=pred, **meta)
-
+        is_obsolete = 'is_obsolete' in node and node['is_obsolete'] == 'true'
+        if is_obsolete:
+            return
+        if node_type is not None and ('type' not in node or node['type'] != node_type):
+            return
+        digraph = self.digraph
+        id = self.contract_uri(node['id'])
+        digraph.add_node(id, **node)
+        if 'lbl' in node:
+            digraph.add_node(id, label=node['lbl'])
+        if parse_meta and 'meta' in node:
+            if node['meta'] is None:
+                node['meta'] = {}
+            meta = self.transform_meta(node['meta'])
+            if xref_graph is not None and 'xrefs' in meta:
+                for x in meta['xrefs']:
+                    xref_graph.add_edge(self.contract_uri(x['val']), id, source=id)
+
+    def add_obograph_edge(self, edge, predicates=None, reverse_edges=True, **args):
+        """
+        Adds a single obograph edge object to the digraph
+        """
+        digraph = self.digraph
+        relation_index = self.relation_index
+        sub = self.contract_uri(edge['sub'])
+        obj = self.contract_uri(edge['obj'])
+        pred = self.contract_uri(edge['pred'])
+        pred = map_legacy_pred(pred)
+        if pred == 'is_a':
+            pred = 'subClassOf'
+        if predicates is None or pred in predicates:
+            meta = edge['meta'] if 'meta' in edge else {}
+            if reverse_edges:
+                digraph.add_edge(obj, sub, pred=pred, **meta)
+                if relation_index is not None:
+                    relation_index.add_edge(obj, sub, pred)
+            else:
+                digraph.add_edge(sub, obj, pred=pred, **meta)
+                if relation_index is not None:
+                    relation_index.add_edge(sub, obj, pred)
+
+    def add_obograph_axioms(self, og, logical_definitions=None, property_chain_axioms=None, **args):
+        """
+        Adds equivalence cliques, and collects logical definitions and property
+        chain axioms, from a single obograph
+        """
+        digraph = self.digraph
+        relation_index = self.relation_index
         if 'equivalentNodesSets' in og:
             nslist = og['equivalentNodesSets']
             logger.info("CLIQUES: {}".format(len(nslist)))
@@ -92,6 +138,8 @@ class OboJsonMapper(object):
                         if i != j:
                             jx = self.contract_uri(j)
                             digraph.add_edge(ix, jx, pred='equivalentTo')
+                            if relation_index is not None:
+                                relation_index.add_edge(ix, jx, 'equivalentTo')
         if logical_definitions is not None and 'logicalDefinitionAxioms' in og:
             for a in og['logicalDefinitionAxioms']:
                 ld = LogicalDefinition(self.contract_uri(a['definedClassId']),
@@ -112,44 +160,118 @@ class OboJsonMapper(object):
                 x['val'] = self.contract_uri(x['val'])
         return meta
 
-    def contract_uri(self, uri):
-        if len(self.context.keys()) > 0:
-            curies = contract_uri(uri, cmaps=[self.context])
-            if len(curies) > 0:
-                return sorted(curies, key=len)[0] # sort by length
+    def _contract_uri(self, uri):
+        """
+        Contract a URI to a CURIE, preferring the @context of the document
+
+        Same results as :func:`prefixcommons.curie_util.contract_uri`
+        taking the shortest candidate, but using precompiled prefix tables;
+        the public ``contract_uri`` memoizes this per mapper
+        """
+        curie = self.prefix_table.contract(uri)
+        if curie is None:
+            curie = default_prefix_table().contract(uri)
+        return curie if curie is not None else uri
+
+
+class PrefixTable(object):
+    """
+    Longest-prefix lookup table for contracting URIs
+
+    Namespaces from one or more curie maps are bucketed by length,
+    so a URI is matched by probing one dict per distinct namespace length
+    rather than by scanning every prefix in the maps.
+    """
+
+    def __init__(self, cmaps):
+        self.by_length = {}
+        for cmap in cmaps:
+            for (prefix, ns) in cmap.items():
+                if isinstance(ns, str) and ns != '':
+                    self.by_length.setdefault(len(ns), {}).setdefault(ns, set()).add(prefix)
+        self.lengths = sorted(self.by_length, reverse=True)
+
+    def contract(self, uri):
+        """
+        Returns the shortest CURIE for a URI, or None if no namespace matches
+
+        Ties are broken in favour of the longest matching namespace
+        """
+        best = None
+        n = len(uri)
+        for length in self.lengths:
+            if length > n:
+                continue
+            prefixes = self.by_length[length].get(uri[:length])
+            if prefixes is None:
+                continue
+            ns = uri[:length]
+            for prefix in sorted(prefixes):
+                curie = uri.replace(ns, prefix + ':')
+                if best is None or len(curie) < len(best):
+                    best = curie
+        return best
+
 
-        curies = sorted(contract_uri(uri), key=len) # Sort by length
-        if len(curies) > 0:
-            return curies[0]
-        else:
-            return uri
+_default_prefix_table = None
 
 
-def convert_json_file(obographfile, **args):
+def default_prefix_table():
+    """
+    Returns a :class:`PrefixTable` for the prefixcommons default curie maps
+    """
+    global _default_prefix_table
+    if _default_prefix_table is None:
+        _default_prefix_table = PrefixTable(default_curie_maps)
+    return _default_prefix_table
+
+
+def convert_json_file(obographfile, stream=False, keep_graphdoc=None, **args):
     """
     Return a networkx MultiDiGraph of the ontologies
     serialized as a json string
 
+    If stream is True, the file is parsed incrementally (see `convert_json_stream`)
+    and the obographs document is not retained, unless keep_graphdoc is
+    explicitly set to True. Otherwise the document is retained unless
+    keep_graphdoc is False.
     """
+    if stream and not keep_graphdoc:
+        return convert_json_stream(obographfile, **args)
     file = open(obographfile, 'r')
     jsonstr = file.read()
     file.close()
-    return convert_json_object(json.loads(jsonstr), **args)
+    payload = convert_json_object(json.loads(jsonstr), **args)
+    if keep_graphdoc is False:
+        payload['graphdoc'] = None
+    return payload
+
 
+def _new_mapper(compact=False, context=None):
+    relation_index = None
+    if compact:
+        from ontobio.cgraph import CompactGraph
+        digraph = CompactGraph()
+    else:
+        digraph = networkx.MultiDiGraph()
+        relation_index = RelationIndex()
+    return OboJsonMapper(digraph=digraph, context=context, relation_index=relation_index)
 
-def convert_json_object(obographdoc, reverse_edges=True, **args):
+
+def convert_json_object(obographdoc, reverse_edges=True, compact=False, **args):
     """
     Return a networkx MultiDiGraph of the ontologies
     serialized as a json object
 
+    If compact is True, the graph is a :class:`ontobio.cgraph.CompactGraph` instead
+
     """
-    digraph = networkx.MultiDiGraph()
     xref_graph = networkx.MultiGraph()
     logical_definitions = []
     property_chain_axioms = []
     context = obographdoc.get('@context',{})
     logger.info("CONTEXT: {}".format(context))
-    mapper = OboJsonMapper(digraph=digraph, context=context)
+    mapper = _new_mapper(compact=compact, context=context)
     ogs = obographdoc['graphs']
     base_og = ogs[0]
     for og in ogs:
@@ -167,10 +289,175 @@ def convert_json_object(obographdoc, reverse_edges=True, **args):
         'xref_graph': xref_graph,
         'graphdoc': obographdoc,
         'logical_definitions': logical_definitions,
-        'property_chain_axioms': property_chain_axioms
+        'property_chain_axioms': property_chain_axioms,
+        'relation_index': mapper.relation_index
+        }
+
+
+def convert_json_stream(obographfile, reverse_edges=True, compact=False, context=None, **args):
+    """
+    Return a networkx MultiDiGraph of the ontologies in an obographs json file,
+    parsing the file incrementally
+
+    Each node and edge object is decoded and passed to :class:`OboJsonMapper`
+    one at a time, so the document as a whole is never held in memory.
+    The returned payload has no graphdoc.
+    """
+    xref_graph = networkx.MultiGraph()
+    logical_definitions = []
+    property_chain_axioms = []
+    mapper = _new_mapper(compact=compact, context=context)
+    opts = dict(xref_graph=xref_graph,
+                logical_definitions=logical_definitions,
+                property_chain_axioms=property_chain_axioms,
+                reverse_edges=reverse_edges,
+                **args)
+    ogs = []
+    with open(obographfile, 'r') as file:
+        reader = JsonStreamReader(file)
+        for key in reader.iter_object():
+            if key == 'graphs':
+                for _ in reader.iter_array():
+                    # everything except nodes and edges is small; decode whole
+                    og = {}
+                    for gkey in reader.iter_object():
+                        if gkey == 'nodes':
+                            n = 0
+                            for _ in reader.iter_array():
+                                mapper.add_obograph_node(reader.value(), **opts)
+                                n += 1
+                            logger.info("NODES: {}".format(n))
+                        elif gkey == 'edges':
+                            n = 0
+                            for _ in reader.iter_array():
+                                mapper.add_obograph_edge(reader.value(), **opts)
+                                n += 1
+                            logger.info("EDGES: {}".format(n))
+                        else:
+                            og[gkey] = reader.value()
+                    mapper.add_obograph_axioms(og, **opts)
+                    ogs.append(og)
+            elif key == '@context':
+                doc_context = reader.value()
+                if context is None:
+                    logger.info("CONTEXT: {}".format(doc_context))
+                    if len(ogs) > 0 and len(doc_context) > 0:
+                        # graphs were already mapped without the context; start again
+                        logger.warning("@context follows graphs in {}; re-reading".format(obographfile))
+                        return convert_json_stream(obographfile, reverse_edges=reverse_edges,
+                                                   compact=compact, context=doc_context, **args)
+                    mapper.context = doc_context
+            else:
+                reader.value()
+
+    base_og = ogs[0]
+    return {
+        'id': base_og.get('id'),
+        'meta': base_og.get('meta'),
+        'graph': mapper.digraph,
+        'xref_graph': xref_graph,
+        'graphdoc': None,
+        'logical_definitions': logical_definitions,
+        'property_chain_axioms': property_chain_axioms,
+        'relation_index': mapper.relation_index
         }
 
 
+class JsonStreamReader(object):
+    """
+    Minimal pull parser for JSON text files
+
+    Containers can be walked incrementally with `iter_object` and
+    `iter_array`; any value can be decoded whole with `value`. The buffer
+    only holds the value currently being decoded.
+    """
+
+    WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+    def __init__(self, file, bufsize=1 << 16):
+        self.file = file
+        self.bufsize = bufsize
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        # drop consumed text; read at least as much again, so that
+        # retried decodes of large values are amortized
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        chunk = self.file.read(max(self.bufsize, len(self.buf)))
+        if chunk == '':
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def peek(self):
+        """
+        Returns the next non-whitespace character without consuming it, or '' at end of file
+        """
+        while True:
+            self.pos = self.WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def _consume(self, expected):
+        c = self.peek()
+        if c not in expected:
+            raise ValueError("Expected one of '{}' but found '{}' in JSON stream".format(expected, c))
+        self.pos += 1
+        return c
+
+    def value(self):
+        """
+        Decodes and consumes the next JSON value
+        """
+        self.peek()
+        while True:
+            try:
+                (v, end) = self.decoder.raw_decode(self.buf, self.pos)
+                # a value ending exactly at the end of the buffer may be truncated, e.g. a number
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return v
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def iter_object(self):
+        """
+        Walks an object, yielding each key. The caller must consume the value for each key
+        """
+        self._consume('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self._consume(':')
+            yield key
+            if self._consume(',}') == '}':
+                return
+
+    def iter_array(self):
+        """
+        Walks an array, yielding once per element. The caller must consume each element
+        """
+        self._consume('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self._consume(',]') == ']':
+                return
+
+
 def _get_association_nodes(digraph, sub, predicate, obj):
     """
     Given a subject, predicate, object, retrieve the OBAN association
@@ -10,6 +10,8 @@ See also:
 import networkx as nx
 import logging
 import re
+from array import array
+from bisect import bisect_left
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +25,15 @@ class Ontology():
 
     """
 
+    # if True, ancestor/descendant queries are answered from a precomputed
+    # :class:`ClosureIndex` for each relation set. See `index_closures`
+    cache_closures = False
+    _closure_indexes = None
+    _relation_index = None
+    _filtered_graphs = None
+    _name_index = None
+    _metadata_index = None
+
     def __init__(self,
                  handle=None,
                  id=None,
@@ -66,6 +77,7 @@ class Ontology():
             self.graphdoc = payload.get('graphdoc')
             self.all_logical_definitions = payload.get('logical_definitions')
             self.all_property_chain_axioms = payload.get('property_chain_axioms')
+            self._relation_index = payload.get('relation_index')
 
     def __str__(self):
         return '{} handle: {} meta: {}'.format(self.id, self.handle, self.meta)
@@ -85,14 +97,15 @@ class Ontology():
         """
         return self.graph
 
-    # consider caching
     def get_filtered_graph(self, relations=None, prefix=None):
         """
         Returns a networkx graph for the whole ontology, for a subset of relations
 
         Only implemented for eager methods.
 
-        Implementation notes: currently this is not cached
+        Implementation notes: the result is a read-only view onto the
+        graph returned by `get_graph`, rather than a copy; views are cached
+        for each combination of relations and prefix.
 
         Arguments
         ---------
@@ -103,35 +116,35 @@ class Ontology():
         Return
         ------
         nx.MultiDiGraph
-            A networkx MultiDiGraph object representing the filtered ontology
+            A networkx MultiDiGraph view representing the filtered ontology
         """
+        if self._filtered_graphs is None:
+            self._filtered_graphs = {}
+        key = (None if relations is None else frozenset(relations), prefix)
+        if key in self._filtered_graphs:
+            return self._filtered_graphs[key]
 
-        # trigger synonym cache
+        # trigger synonym cache; ensures lazily-fetched metadata is present
+        # on the nodes shared with the view
         self.all_synonyms()
         self.all_obsoletes()
 
         # default method - wrap get_graph
         srcg = self.get_graph()
-        if prefix is not None:
-            srcg = srcg.subgraph([n for n in srcg.nodes() if n.startswith(prefix+":")])
-        if relations is None:
+        if relations is None and prefix is None:
             logger.info("No filtering on "+str(self))
             return srcg
-        logger.info("Filtering {} for {}".format(self, relations))
-        g = nx.MultiDiGraph()
-
-        # TODO: copy full metadata
-        logger.info("copying nodes")
-        for (n,d) in srcg.nodes(data=True):
-            g.add_node(n, **d)
-
-        logger.info("copying edges")
-        num_edges = 0
-        for (x,y,d) in srcg.edges(data=True):
-            if d['pred'] in relations:
-                num_edges += 1
-                g.add_edge(x,y,**d)
-        logger.info("Filtered edges: {}".format(num_edges))
+        logger.info("Filtering {} for {} prefix: {}".format(self, relations, prefix))
+        filter_node = nx.filters.no_filter
+        filter_edge = nx.filters.no_filter
+        if prefix is not None:
+            pfx = prefix + ":"
+            filter_node = lambda n: n.startswith(pfx)
+        if relations is not None:
+            rset = set(relations)
+            filter_edge = lambda u, v, k: srcg[u][v][k]['pred'] in rset
+        g = nx.subgraph_view(srcg, filter_node=filter_node, filter_edge=filter_edge)
+        self._filtered_graphs[key] = g
         return g
 
     def merge(self, ontologies):
@@ -158,6 +171,64 @@ class Ontology():
             if ont.all_property_chain_axioms is not None:
                 for pca in ont.all_property_chain_axioms:
                     self.add_property_chain_axiom(pca)
+        self.clear_caches()
+
+    def clear_caches(self):
+        """
+        Discard all precomputed indexes over the graph
+
+        Called automatically by methods that modify the ontology. Clients
+        that modify the underlying networkx graph directly must call this
+        """
+        self._closure_indexes = None
+        self._relation_index = None
+        self._filtered_graphs = None
+        self._name_index = None
+        self._metadata_index = None
+
+    def relation_index(self):
+        """
+        Returns the :class:`RelationIndex` for the graph
+
+        Ontologies loaded from obographs come with an index built at load time;
+        otherwise it is built from the graph on first use
+
+        Returns
+        -------
+        RelationIndex
+        """
+        if self._relation_index is None:
+            self._relation_index = RelationIndex.from_graph(self.get_graph())
+        return self._relation_index
+
+    def name_index(self):
+        """
+        Returns the :class:`NameIndex` over labels and synonyms, building it on first use
+
+        Returns
+        -------
+        NameIndex
+        """
+        if self._name_index is None:
+            self._name_index = NameIndex.from_ontology(self)
+        return self._name_index
+
+    def metadata_index(self):
+        """
+        Returns the :class:`MetadataIndex` of synonyms, obsoletes and definitions, building it on first use
+
+        Returns
+        -------
+        MetadataIndex
+        """
+        if self._metadata_index is None:
+            self._metadata_index = MetadataIndex.from_ontology(self)
+        return self._metadata_index
+
+    def _metadata_for(self, nid):
+        # index serving per-node metadata lookups for nid; implementations that
+        # cannot enumerate their nodes override this to index a single node
+        return self.metadata_index()
 
     def subgraph(self, nodes=None):
         """
@@ -193,7 +264,8 @@ class Ontology():
 
         ont = Ontology(graph=g, xref_graph=self.xref_graph) # TODO - add metadata
         if relations is not None:
-            g = ont.get_filtered_graph(relations)
+            # copy the cached read-only view, so the new ontology can be modified
+            g = nx.MultiDiGraph(ont.get_filtered_graph(relations))
             ont = Ontology(graph=g, xref_graph=self.xref_graph)
         return ont
 
@@ -424,14 +496,11 @@ class Ontology():
            list of relation (object property) IDs used to filter
 
         """
+        if relations is not None:
+            return self.relation_index().parents(node, relations)
         g = self.get_graph()
         if node in g:
-            parents = list(g.predecessors(node))
-            if relations is None:
-                return parents
-            else:
-                rset = set(relations)
-                return [p for p in parents if len(self.child_parent_relations(node, p, graph=g).intersection(rset)) > 0 ]
+            return list(g.predecessors(node))
         else:
             return []
 
@@ -453,14 +522,11 @@ class Ontology():
            list of relation (object property) IDs used to filter
 
         """
+        if relations is not None:
+            return self.relation_index().children(node, relations)
         g = self.get_graph()
         if node in g:
-            children = list(g.successors(node))
-            if relations is None:
-                return children
-            else:
-                rset = set(relations)
-                return [c for c in children if len(self.child_parent_relations(c, node, graph=g).intersection(rset)) > 0 ]
+            return list(g.successors(node))
         else:
             return []
 
@@ -486,6 +552,8 @@ class Ontology():
             ancestor node IDs
 
         """
+        if self.cache_closures:
+            return self.closure_index(relations).ancestors(node, reflexive=reflexive)
         seen = set()
         nextnodes = [node]
         while len(nextnodes) > 0:
@@ -520,6 +588,8 @@ class Ontology():
         list[str]
             descendant node IDs
         """
+        if self.cache_closures:
+            return self.closure_index(relations).descendants(node, reflexive=reflexive)
         seen = set()
         nextnodes = [node]
         while len(nextnodes) > 0:
@@ -531,6 +601,72 @@ class Ontology():
             seen -= {node}
         return list(seen)
 
+    def has_ancestor(self, node, ancestor, relations=None, reflexive=False):
+        """
+        True if ancestor is in the ancestors of node
+
+        Equivalent to testing membership of `ancestors`, but avoids
+        constructing the ancestor list when closures are cached
+
+        Arguments
+        ---------
+        node : str
+            identifier for node in ontology
+        ancestor : str
+            identifier for candidate ancestor node
+        reflexive : bool
+            if true, a node is its own ancestor
+        relations : list
+             relation (object property) IDs used to filter
+        """
+        if self.cache_closures:
+            return self.closure_index(relations).has_ancestor(node, ancestor, reflexive=reflexive)
+        return ancestor in self.ancestors(node, relations=relations, reflexive=reflexive)
+
+    def index_closures(self, relations=None):
+        """
+        Switch on cached closures, and precompute the closure for a set of relations
+
+        After calling this, `ancestors`, `descendants`, `has_ancestor` and
+        `traverse_nodes` are answered by lookup in a :class:`ClosureIndex`.
+        Indexes for relation sets other than the one passed here are built
+        on first use. Indexes are discarded when the ontology is modified.
+
+        Arguments
+        ---------
+        relations : list
+             relation (object property) IDs used to filter
+
+        Returns
+        -------
+        ClosureIndex
+        """
+        self.cache_closures = True
+        return self.closure_index(relations)
+
+    def closure_index(self, relations=None):
+        """
+        Returns the (cached) :class:`ClosureIndex` for a set of relations
+
+        Arguments
+        ---------
+        relations : list
+             relation (object property) IDs used to filter. If None, uses all.
+
+        Returns
+        -------
+        ClosureIndex
+        """
+        if self._closure_indexes is None:
+            self._closure_indexes = {}
+        key = None if relations is None else frozenset(relations)
+        cix = self._closure_indexes.get(key)
+        if cix is None:
+            logger.info("Building closure index for {} relations: {}".format(self, relations))
+            cix = ClosureIndex.from_graph(self.get_graph(), relations=relations)
+            self._closure_indexes[key] = cix
+        return cix
+
 
     def equiv_graph(self):
         """
@@ -566,6 +702,15 @@ class Ontology():
         list[str]
             nodes reachable from qids
         """
+        if self.cache_closures and set(args.keys()) <= {'relations'}:
+            cix = self.closure_index(args.get('relations'))
+            nodes = set(qids)
+            for id in qids:
+                if down:
+                    nodes.update(cix.descendants(id))
+                if up:
+                    nodes.update(cix.ancestors(id))
+            return nodes
         g = self.get_filtered_graph(**args)
         nodes = set()
         for id in qids:
@@ -647,13 +792,7 @@ class Ontology():
         -------
         TextDefinition
         """
-        tdefs = []
-        meta = self._meta(nid)
-        if 'definition' in meta:
-            obj = meta['definition']
-            return TextDefinition(nid, **obj)
-        else:
-            return None
+        return self._metadata_for(nid).definitions.get(nid)
 
 
     def logical_definitions(self, nid):
@@ -745,8 +884,7 @@ class Ontology():
         nid : str
             Node identifier for entity to be queried
         """
-        dep = self._get_meta_prop(nid, 'deprecated')
-        return  dep is not None and dep
+        return nid in self._metadata_for(nid).obsoletes
 
 
     def replaced_by(self, nid, strict=True):
@@ -764,7 +902,7 @@ class Ontology():
         ------
         None if no value set, otherwise returns node id (or list if multiple values, see strict setting)
         """
-        vs = self._get_basic_property_value(nid, 'IAO:0100001')
+        vs = list(self._metadata_for(nid).replaced_by.get(nid, []))
         if len(vs) > 1:
             msg = "replaced_by has multiple values: {}".format(vs)
             if strict:
@@ -790,22 +928,17 @@ class Ontology():
         list[Synonym]
             :class:`Synonym` objects
         """
-        n = self.node(nid)
-        syns = []
-        if 'meta' in n:
-            meta = n['meta']
-            if 'synonyms' in meta:
-                for obj in meta['synonyms']:
-                    syns.append(Synonym(nid, **obj))
+        syns = list(self._metadata_for(nid).synonyms.get(nid, []))
         if include_label:
             syns.append(Synonym(nid, val=self.label(nid), pred='label'))
         return syns
 
     def obo_namespace(self, nid):
+        n = self.node(nid)
+        if n is None:
+            return None
         go_namespace = [predval for predval in
-                        self.get_graph().nodes
-                            .get(nid, {})
-                            .get("meta", {})
+                        n.get("meta", {})
                             .get("basicPropertyValues", []) if predval["pred"] == "OIO:hasOBONamespace"]
 
         if len(go_namespace) >= 1:
@@ -822,6 +955,8 @@ class Ontology():
         if meta is None:
             meta={}
         g.add_node(id, label=label, type=type, meta=meta)
+        self._name_index = None
+        self._metadata_index = None
 
     def add_text_definition(self, textdef):
         """
@@ -841,6 +976,7 @@ class Ontology():
         if 'meta' not in n:
             n['meta'] = {}
         n['meta'][k] = edict
+        self._metadata_index = None
 
     def inline_xref_graph(self):
         """
@@ -857,6 +993,9 @@ class Ontology():
         """
         g = self.get_graph()
         g.add_edge(pid, id, pred=relation)
+        self._closure_indexes = None
+        if self._relation_index is not None:
+            self._relation_index.add_edge(pid, id, relation)
 
     def add_xref(self, id, xref):
         """
@@ -878,6 +1017,9 @@ class Ontology():
         if 'synonyms' not in meta:
             meta['synonyms'] = []
         meta['synonyms'].append(syn.as_dict())
+        self._metadata_index = None
+        if self._name_index is not None:
+            self._name_index.add(syn.class_id, syn.val, synonym=True)
 
     def add_to_subset(self, id, s):
         """
@@ -907,14 +1049,15 @@ class Ontology():
         """
         syns = []
         for n in self.nodes():
-            syns = syns + self.synonyms(n, include_label=include_label)
+            syns.extend(self.synonyms(n, include_label=include_label))
         return syns
 
     def all_obsoletes(self):
         """
         Returns all obsolete nodes
         """
-        return [n for n in self.nodes() if self.is_obsolete(n)]
+        obsoletes = self.metadata_index().obsoletes
+        return [n for n in self.nodes() if n in obsoletes]
 
     def label(self, nid, id_if_null=False):
         """
@@ -991,22 +1134,21 @@ class Ontology():
            if true, treats each name as a regular expression
         is_partial_match : bool
            if true, treats each name as a regular expression .*name.*
+        ignore_case : bool
+           if true, match labels and synonyms case-insensitively
+
+        Implementation notes: names are looked up in the :class:`NameIndex`
+        returned by `name_index`, which is built on the first call, so
+        resolving a large list of names in one call costs one lookup per name.
         """
-        g = self.get_graph()
+        ix = self.name_index()
         r_ids = []
         for n in names:
             logger.debug("Searching for {} syns={}".format(n,synonyms))
             if len(n.split(":")) == 2:
                 r_ids.append(n)
             else:
-                matches = set([nid for nid in g.nodes() if self._is_match(self.label(nid), n, **args)])
-                if synonyms:
-                    logger.debug("Searching syns for {}".format(names))
-                    for nid in g.nodes():
-                        for s in self.synonyms(nid):
-                            if self._is_match(s.val, n, **args):
-                                matches.add(nid)
-                r_ids += list(matches)
+                r_ids += list(ix.match(n, synonyms=synonyms, **args))
         return r_ids
 
     def _is_match(self, label, term, is_partial_match=False, is_regex=False, **args):
@@ -1039,6 +1181,8 @@ class Ontology():
            if true, treats each name as a regular expression
         is_partial_match : bool
            if true, treats each name as a regular expression .*name.*
+        ignore_case : bool
+           if true, match labels and synonyms case-insensitively
 
         Return
         ------
@@ -1047,6 +1191,331 @@ class Ontology():
         """
         return self.resolve_names([searchterm], **args)
 
+class RelationIndex():
+    """
+    Direct parents and children of each node, partitioned by relation
+
+    Stores `{pred: {node: [parents]}}` and `{pred: {node: [children]}}`, so
+    that neighbor queries filtered by relation are dictionary lookups rather
+    than scans over the edge data of the networkx graph.
+
+    Edges follow the ontology graph orientation, i.e. from parent to child
+    """
+
+    def __init__(self):
+        self.parents_by_pred = {}
+        self.children_by_pred = {}
+
+    @staticmethod
+    def from_graph(graph):
+        """
+        Build an index from a networkx MultiDiGraph
+        """
+        rix = RelationIndex()
+        for (p, c, pred) in graph.edges(data='pred'):
+            rix.add_edge(p, c, pred)
+        return rix
+
+    def add_edge(self, parent, child, pred):
+        """
+        Adds a parent-child edge for a relation
+        """
+        self.parents_by_pred.setdefault(pred, {}).setdefault(child, []).append(parent)
+        self.children_by_pred.setdefault(pred, {}).setdefault(parent, []).append(child)
+
+    def _lookup(self, by_pred, node, relations):
+        # dict used as an ordered set; the same pair may be connected by parallel edges
+        results = {}
+        for pred in relations:
+            nodes = by_pred.get(pred, {}).get(node)
+            if nodes is not None:
+                results.update(dict.fromkeys(nodes))
+        return list(results)
+
+    def parents(self, node, relations):
+        """
+        Returns direct parents of node over any of the specified relations
+        """
+        return self._lookup(self.parents_by_pred, node, relations)
+
+    def children(self, node, relations):
+        """
+        Returns direct children of node over any of the specified relations
+        """
+        return self._lookup(self.children_by_pred, node, relations)
+
+    def relations(self):
+        """
+        Returns all relations that are indexed
+        """
+        return list(self.parents_by_pred.keys())
+
+class ClosureIndex():
+    """
+    Precomputed reflexive transitive closure of an ontology graph, for a fixed set of relations
+
+    Node IDs are interned to integers. Nodes in the same strongly connected
+    component share their closure, which is stored once as a sorted array of
+    integer IDs, so lookups do not walk the graph.
+
+    Typically obtained via :meth:`Ontology.closure_index`
+    """
+
+    def __init__(self, ids, edges, id2index=None):
+        """
+        Arguments
+        ---------
+        ids : list
+            node IDs; the position of each ID is its integer index
+        edges : iterable
+            (parent index, child index) tuples
+        id2index : dict
+            maps node IDs to their index. Built from ids if not provided
+        """
+        self.ids = ids
+        self.id2index = id2index if id2index is not None else {n: i for (i, n) in enumerate(ids)}
+
+        dg = nx.DiGraph()
+        dg.add_nodes_from(range(len(self.ids)))
+        dg.add_edges_from(edges)
+
+        # collapse cycles, then propagate along a topological sort of the components
+        cg = nx.condensation(dg)
+        mapping = cg.graph['mapping']
+        self.component = array('i', [mapping[i] for i in range(len(self.ids))])
+        order = list(nx.topological_sort(cg))
+        self.ancestor_arrays = self._propagate(cg, order, cg.predecessors)
+        self.descendant_arrays = self._propagate(cg, reversed(order), cg.successors)
+
+    @staticmethod
+    def from_graph(graph, relations=None):
+        """
+        Build an index from a networkx MultiDiGraph
+
+        Arguments
+        ---------
+        graph : nx.MultiDiGraph
+            ontology graph, with edges directed from parent to child
+        relations : list
+            relation (object property) IDs used to filter. If None, uses all.
+        """
+        rset = None if relations is None else set(relations)
+        ids = list(graph.nodes())
+        id2index = {n: i for (i, n) in enumerate(ids)}
+        edges = [(id2index[p], id2index[c]) for (p, c, pred) in graph.edges(data='pred')
+                 if rset is None or pred in rset]
+        return ClosureIndex(ids, edges, id2index=id2index)
+
+    @staticmethod
+    def _propagate(cg, order, neighbors):
+        arrs = [None] * len(cg)
+        for c in order:
+            s = set(cg.nodes[c]['members'])
+            for nc in neighbors(c):
+                s.update(arrs[nc])
+            arrs[c] = array('i', sorted(s))
+        return arrs
+
+    def _closure(self, arrs, node, reflexive):
+        i = self.id2index.get(node)
+        if i is None:
+            return [node] if reflexive else []
+        ids = self.ids
+        if reflexive:
+            return [ids[j] for j in arrs[self.component[i]]]
+        return [ids[j] for j in arrs[self.component[i]] if j != i]
+
+    def ancestors(self, node, reflexive=False):
+        """
+        Returns all ancestors of a node, as a list of node IDs
+        """
+        return self._closure(self.ancestor_arrays, node, reflexive)
+
+    def descendants(self, node, reflexive=False):
+        """
+        Returns all descendants of a node, as a list of node IDs
+        """
+        return self._closure(self.descendant_arrays, node, reflexive)
+
+    def has_ancestor(self, node, ancestor, reflexive=False):
+        """
+        True if ancestor is in the ancestors of node
+        """
+        if node == ancestor:
+            return reflexive
+        i = self.id2index.get(node)
+        j = self.id2index.get(ancestor)
+        if i is None or j is None:
+            return False
+        arr = self.ancestor_arrays[self.component[i]]
+        k = bisect_left(arr, j)
+        return k < len(arr) and arr[k] == j
+
+class MetadataIndex():
+    """
+    Synonyms, obsoletion status, replacements and text definitions of every node
+
+    Built from the obograph-style meta objects of an ontology in a single
+    pass, so that per-node accessors are dictionary lookups rather than
+    re-parsing meta on every call.
+
+    Typically obtained via :meth:`Ontology.metadata_index`
+    """
+
+    def __init__(self):
+        self.synonyms = {}
+        self.obsoletes = {}
+        self.replaced_by = {}
+        self.definitions = {}
+
+    @staticmethod
+    def from_ontology(ont):
+        """
+        Build an index from the meta objects of all nodes in an ontology
+        """
+        mix = MetadataIndex()
+        for nid in ont.nodes():
+            mix.add_meta(nid, ont._meta(nid))
+        return mix
+
+    def add_meta(self, nid, meta):
+        """
+        Indexes a meta object for a node
+        """
+        if not meta:
+            return
+        if 'synonyms' in meta:
+            self.synonyms[nid] = [Synonym(nid, **obj) for obj in meta['synonyms']]
+        if meta.get('deprecated'):
+            self.obsoletes[nid] = True
+        if 'definition' in meta:
+            self.definitions[nid] = TextDefinition(nid, **meta['definition'])
+        vs = [x['val'] for x in meta.get('basicPropertyValues', []) if x['pred'] == 'IAO:0100001']
+        if len(vs) > 0:
+            self.replaced_by[nid] = vs
+
+class NameIndex():
+    """
+    Inverted index from labels and synonyms to node identifiers
+
+    Exact and case-folded strings map directly to nodes. For substring,
+    wildcard and regex queries, each distinct string is indexed by its
+    (case-folded) character trigrams, so candidates are taken from the
+    rarest trigram of the query and only those strings are checked.
+
+    Typically obtained via :meth:`Ontology.name_index`
+    """
+
+    # characters that make a '%' wildcard term more than a sequence of literals
+    REGEX_CHARS = set('.^$*+?{}[]\\|()')
+
+    def __init__(self, nodes=None):
+        self.all_nodes = list(nodes) if nodes is not None else []
+        self.label_map = {}
+        self.synonym_map = {}
+        self._folded = None
+        self._strings = None
+        self._grams = None
+
+    @staticmethod
+    def from_ontology(ont):
+        """
+        Build an index over all labels and synonyms of an ontology
+        """
+        nodes = list(ont.nodes())
+        ix = NameIndex(nodes)
+        for nid in nodes:
+            ix.add(nid, ont.label(nid))
+            for syn in ont.synonyms(nid):
+                ix.add(nid, syn.val, synonym=True)
+        return ix
+
+    def add(self, nid, name, synonym=False):
+        """
+        Adds a label or synonym for a node
+        """
+        if name is None:
+            name = ''
+        m = self.synonym_map if synonym else self.label_map
+        m.setdefault(name, []).append(nid)
+        self._folded = None
+        self._strings = None
+        self._grams = None
+
+    def _folded_map(self):
+        if self._folded is None:
+            folded = {}
+            for m in (self.label_map, self.synonym_map):
+                for s in m:
+                    folded.setdefault(s.lower(), set()).add(s)
+            self._folded = folded
+        return self._folded
+
+    def _gram_index(self):
+        if self._grams is None:
+            self._strings = list(set(self.label_map) | set(self.synonym_map))
+            grams = {}
+            for (i, s) in enumerate(self._strings):
+                s = s.lower()
+                for g in set(s[k:k+3] for k in range(len(s) - 2)):
+                    grams.setdefault(g, array('i')).append(i)
+            self._grams = grams
+        return self._grams
+
+    def _candidates(self, literal):
+        """
+        Strings that may contain literal, ignoring case
+        """
+        grams = self._gram_index()
+        literal = literal.lower()
+        if len(literal) < 3:
+            return self._strings
+        postings = [grams.get(literal[k:k+3]) for k in range(len(literal) - 2)]
+        if any(p is None for p in postings):
+            return []
+        strings = self._strings
+        return [strings[i] for i in min(postings, key=len)]
+
+    def _regex_candidates(self, pieces):
+        if pieces is not None and not any(c in NameIndex.REGEX_CHARS for p in pieces for c in p):
+            return self._candidates(max(pieces, key=len))
+        self._gram_index()
+        return self._strings
+
+    def match(self, term, synonyms=False, is_partial_match=False, is_regex=False, ignore_case=False, **args):
+        """
+        Returns the set of nodes with a label (or synonym) matching term
+
+        Same semantics as :meth:`Ontology._is_match`, plus case-insensitive
+        matching if ignore_case is True
+        """
+        if term == '%':
+            return set(self.all_nodes)
+        pieces = None
+        if term.find('%') > -1:
+            pieces = term.split('%')
+            term = term.replace('%', '.*')
+            is_regex = True
+        if is_regex:
+            rx = re.compile(term, re.IGNORECASE if ignore_case else 0)
+            matched = [s for s in self._regex_candidates(pieces) if rx.search(s) is not None]
+        elif is_partial_match:
+            if ignore_case:
+                t = term.lower()
+                matched = [s for s in self._candidates(term) if s.lower().find(t) > -1]
+            else:
+                matched = [s for s in self._candidates(term) if s.find(term) > -1]
+        elif ignore_case:
+            matched = self._folded_map().get(term.lower(), [])
+        else:
+            matched = [term]
+        maps = [self.label_map, self.synonym_map] if synonyms else [self.label_map]
+        nids = set()
+        for s in matched:
+            for m in maps:
+                nids.update(m.get(s, []))
+        return nids
+
 class LogicalDefinition():
     """
     A simple OWL logical definition conforming to the pattern:
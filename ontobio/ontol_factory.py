@@ -10,7 +10,9 @@ from ontobio.sparql.sparql_ontology import EagerRemoteSparqlOntology
 import os
 import subprocess
 import hashlib
+import json
 import logging
+import tempfile
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +24,9 @@ default_ontology_handle = 'cache/ontologies/pato.json'
 global default_ontology
 default_ontology = None
 
+# arguments controlling how obographs json is loaded, passed through for handles that resolve to json
+JSON_LOADER_ARGS = ['compact', 'snapshot', 'snapshot_dir', 'stream', 'keep_graphdoc']
+
 
 class OntologyFactory():
     """Implements a factory for generating :class:`Ontology` objects.
@@ -58,6 +63,20 @@ class OntologyFactory():
         ---------
         handle : str
             specifies how to retrieve the ontology info
+        compact : bool
+            if True, ontologies loaded from obographs json are backed by
+            a :class:`ontobio.cgraph.CompactOntology` rather than networkx
+        snapshot : bool
+            if True, obographs json is loaded from a binary snapshot keyed by
+            the checksum of the file, which is written on the first load.
+            Implies compact
+        snapshot_dir : str
+            directory for snapshots. Defaults to ontobio-snapshots in the system temp directory
+        stream : bool
+            if True, obographs json is parsed incrementally, and the json
+            document is not kept as `graphdoc` unless keep_graphdoc is True
+        keep_graphdoc : bool
+            whether to keep the obographs json document on the ontology
 
         """
         if handle is None:
@@ -102,8 +121,8 @@ def create_ontology(handle=None, **args):
             logger.info(cp)
         else:
             logger.info("using cached file: "+fn)
-        g = obograph_util.convert_json_file(fn)
-        ont = Ontology(handle=handle, payload=g)
+        ont = create_ontology_from_json_file(fn, handle=handle,
+                                             **{k: v for (k, v) in args.items() if k in JSON_LOADER_ARGS})
     elif handle.startswith("wdq:"):
         from ontobio.sparql.wikidata_ontology import EagerWikidataOntology
         logger.info("Fetching from Wikidata")
@@ -131,8 +150,8 @@ def create_ontology(handle=None, **args):
             logger.info(cp)
         else:
             logger.info("using cached file: "+fn)
-        g = obograph_util.convert_json_file(fn)
-        ont = Ontology(handle=handle, payload=g)
+        ont = create_ontology_from_json_file(fn, handle=handle,
+                                             **{k: v for (k, v) in args.items() if k in JSON_LOADER_ARGS})
     else:
         logger.info("Fetching from SPARQL")
         ont = EagerRemoteSparqlOntology(handle=handle)
@@ -145,10 +164,35 @@ def create_ontology_from_obograph(og):
     ont = Ontology(handle=None, payload=g)
     return ont
 
+def create_ontology_from_json_file(fn, handle=None, compact=False, snapshot=False, snapshot_dir=None, **args):
+    """
+    Creates an ontology from an obographs json file
+
+    If compact is True, returns a :class:`ontobio.cgraph.CompactOntology`.
+    If snapshot is True, the ontology is memory-mapped from a snapshot
+    in snapshot_dir, which is created from the json file if not present
+    """
+    if snapshot:
+        from ontobio.cgraph import CompactOntology
+        path = get_snapshot_path(fn, snapshot_dir=snapshot_dir,
+                                 **{k: v for (k, v) in args.items() if k not in ['stream', 'keep_graphdoc']})
+        if os.path.isdir(path):
+            logger.info("Loading snapshot: {}".format(path))
+            return CompactOntology.load_snapshot(path, handle=handle)
+        ont = create_ontology_from_json_file(fn, handle=handle, compact=True, **args)
+        logger.info("Writing snapshot: {}".format(path))
+        ont.save_snapshot(path)
+        return ont
+    if compact:
+        from ontobio.cgraph import CompactOntology
+        g = obograph_util.convert_json_file(fn, compact=True, **args)
+        return CompactOntology(handle=handle, payload=g)
+    g = obograph_util.convert_json_file(fn, **args)
+    return Ontology(handle=handle, payload=g)
+
 def translate_file_to_ontology(handle, **args):
     if handle.endswith(".json"):
-        g = obograph_util.convert_json_file(handle, **args)
-        return Ontology(handle=handle, payload=g)
+        return create_ontology_from_json_file(handle, handle=handle, **args)
     elif handle.endswith(".ttl"):
         from ontobio.sparql.rdf2nx import RdfMapper
         logger.info("RdfMapper: {}".format(args))
@@ -166,13 +210,29 @@ def translate_file_to_ontology(handle, **args):
             logger.info(cp)
         else:
             logger.info("using cached file: "+fn)
-        g = obograph_util.convert_json_file(fn, **args)
-        return Ontology(handle=handle, payload=g)
+        return create_ontology_from_json_file(fn, handle=handle, **args)
 
 def get_checksum(file):
     """
     Get SHA256 hash from the contents of a given file
     """
+    h = hashlib.sha256()
     with open(file, 'rb') as FH:
-        contents = FH.read()
-    return hashlib.sha256(contents).hexdigest()
+        for chunk in iter(lambda: FH.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def get_snapshot_path(file, snapshot_dir=None, **args):
+    """
+    Get the snapshot directory for an obographs json file
+
+    The name combines the checksum of the file, any loading arguments,
+    and the snapshot format version
+    """
+    from ontobio.cgraph import SNAPSHOT_VERSION
+    if snapshot_dir is None:
+        snapshot_dir = os.path.join(tempfile.gettempdir(), 'ontobio-snapshots')
+    key = get_checksum(file)
+    if len(args) > 0:
+        key += '-' + hashlib.sha256(json.dumps(args, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    return os.path.join(snapshot_dir, '{}-v{}'.format(key, SNAPSHOT_VERSION))
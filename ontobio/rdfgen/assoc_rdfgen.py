@@ -2,7 +2,7 @@ from prefixcommons import curie_util
 from prefixcommons.curie_util import contract_uri, expand_uri, get_prefixes
 from ontobio.vocabulary.relations import OboRO, Evidence
 from ontobio.vocabulary.upper import UpperLevel
-from ontobio.ecomap import EcoMap
+from ontobio.ecomap import get_ecomap
 from ontobio.rdfgen import relations
 from ontobio.model import association as association_model
 from rdflib import Namespace
@@ -88,7 +88,7 @@ class RdfTransform(object):
 
         self.writer = writer
         self.include_subject_info = False
-        self.ecomap = EcoMap()
+        self.ecomap = get_ecomap()
         self._emit_header_done = False
         self.uribase = writer.base
         self.ecomap.mappings()
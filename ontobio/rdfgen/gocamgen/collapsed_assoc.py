@@ -8,12 +8,8 @@ from ontobio import ecomap
 
 logger = logging.getLogger(__name__)
 
-ecomapping = ecomap.EcoMap()
-ipi_eco = ecomapping.coderef_to_ecoclass("IPI")
-
 GPAD_PARSER = GpadParser()
 BINDING_ROOT = "GO:0005488"  # binding
-IPI_ECO_CODE = ipi_eco
 
 
 class GoAssocWithFrom:
@@ -99,7 +95,7 @@ class CollapsedAssociationSet:
         # Now arrange these into "header" and "line" values
         eco_code = str(annot.evidence.type)
         term = str(annot.object.id)
-        is_binding = eco_code == IPI_ECO_CODE and BINDING_ROOT in self.go_ontology.ancestors(term, reflexive=True)
+        is_binding = eco_code == ecomap.get_ecomap().coderef_to_ecoclass("IPI") and BINDING_ROOT in self.go_ontology.ancestors(term, reflexive=True)
         if is_binding:
             # Using GPI, check with_froms for taxon equivalency to subj_id
             if self.gpi_entities:
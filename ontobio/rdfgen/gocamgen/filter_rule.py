@@ -1,4 +1,4 @@
-from ontobio.ecomap import EcoMap
+from ontobio.ecomap import get_ecomap
 from abc import ABC, abstractmethod
 import yaml
 
@@ -81,7 +81,7 @@ def get_filter_rule(mod_id):
 class AssocFilter:
     def __init__(self, filter_rule : FilterRule):
         self.filter_rule = filter_rule
-        self.ecomap = EcoMap()
+        self.ecomap = get_ecomap()
 
     def validate_line(self, assoc):
         evi_code = self.ecomap.ecoclass_to_coderef(assoc["evidence"]["type"])[0]
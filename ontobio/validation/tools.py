@@ -1,33 +1,25 @@
 import gzip
 import click
 import os
+import shutil
 
-from functools import wraps
+from ontobio.io import gzipsink
 
-def gzips(file_function):
-
-    @wraps(file_function)
-    def wrapper(*args, **kwargs):
-        output_file = file_function(*args, **kwargs)
-        if isinstance(output_file, list):
-            for o in output_file:
-                zipup(o)
-        else:
-            zipup(output_file)
-
-        return output_file
-
-    return wrapper
-
-def zipup(file_path):
+def zipup(file_path, compresslevel=gzipsink.DEFAULT_COMPRESSLEVEL, threads=1):
     click.echo("Zipping {}".format(file_path))
     path, filename = os.path.split(file_path)
     zipname = "{}.gz".format(filename)
     target = os.path.join(path, zipname)
 
     with open(file_path, "rb") as p:
-        with gzip.open(target, "wb") as tf:
-            tf.write(p.read())
+        with gzipsink.open_gzip(target, "wb", compresslevel=compresslevel, threads=threads) as tf:
+            shutil.copyfileobj(p, tf, 512 * 1024)
+
+def gzip_tee(file, compresslevel=gzipsink.DEFAULT_COMPRESSLEVEL, threads=1):
+    """
+    Wraps a file opened for writing so that a gzipped copy, file.name + ".gz", is written alongside it
+    """
+    return gzipsink.GzipTee(file, "{}.gz".format(file.name), compresslevel=compresslevel, threads=threads)
             
 def unzip(path, target):
     click.echo("Unzipping {}".format(path))
@@ -1,8 +1,9 @@
 from ontobio.io import assocwriter
-from ontobio.io import gafparser, gpadparser
+from ontobio.io import gafparser, gpadparser, gzipsink
 from ontobio.model.association import GoAssociation, Curie, Subject, Term, ConjunctiveSet, Evidence, ExtensionUnit, Date, Aspect, Provider
 import json
 import io
+import gzip
 
 
 def test_gaf_writer():
@@ -243,3 +244,19 @@ def test_writing_assoc_properties():
     written_gpad_line = [line for line in out.getvalue().split("\n") if not line.startswith("!")][0]
     written_props = written_gpad_line.split("\t")[11]
     assert len(written_props.split("|")) == 5
+
+
+def test_gaf_writer_gzip_tee(tmp_path):
+    gaf_path = str(tmp_path / "out.gaf")
+    parser = gafparser.GafParser()
+    line = "PomBase\tSPAC25B8.17\typf1\t\tGO:0000006\tGO_REF:0000024\tISO\tSGD:S000001583\tC\tintramembrane aspartyl protease of the perinuclear ER membrane Ypf1 (predicted)\tppp81\tprotein\ttaxon:4896\t20150305\tPomBase\t\t"
+    association = parser.parse_line(line).associations[0]
+
+    with gzipsink.GzipTee(open(gaf_path, "w"), gaf_path + ".gz", compresslevel=1) as out:
+        writer = assocwriter.GafWriter(file=out)
+        writer.write_assoc(association)
+
+    with open(gaf_path) as gaf, gzip.open(gaf_path + ".gz", "rt") as gz:
+        written = gaf.read()
+        assert gz.read() == written
+    assert "SPAC25B8.17" in written
@@ -87,6 +87,88 @@ def test_assoc_query():
     ilist = aset.query_intersections(terms1, terms2)
     print(str(ilist))
 
+def test_compact_inferred_index():
+    """
+    compact index gives same answers as the materialized inferred map
+    """
+    ont = OntologyFactory().create('tests/resources/pato.json')
+    amap = {
+        'a': [],
+        'b': [EUPLOID],
+        'c': [Y_SHAPED],
+        'd': [EUPLOID, Y_SHAPED],
+    }
+    aset = AssociationSet(ontology=ont, association_map=dict(amap))
+    caset = AssociationSet(ontology=ont, association_map=dict(amap), compact=True)
+    assert caset.subject_to_inferred_map == {}
+    # the default set reads its inferred map from the index
+    assert set(aset.subject_to_inferred_map) == set(amap)
+    assert aset.subject_to_inferred_map['d'] == aset.inferred_index.inferred_types('d')
+    assert 'x' not in aset.subject_to_inferred_map
+    assert caset.objects == aset.objects
+    assert str(aset) == "AssocSet |S|=4 |S->I|={}".format(len(aset.objects))
+    for s in amap:
+        assert caset.inferred_types(s) == aset.inferred_types(s)
+    assert PLOIDY in caset.inferred_types('b')
+    assert caset.inferred_types('x') == set()
+    assert caset.query([PLOIDY, SHAPE], []) == ['d']
+    assert caset.query([], [PLOIDY, SHAPE]) == ['a']
+    assert caset.query(['owl:Thing'], [SHAPE]) == ['a', 'b']
+    assert caset.query(['FOO:1'], []) == []
+    assert caset.jaccard_similarity('b', 'd') == aset.jaccard_similarity('b', 'd')
+    assert caset.jaccard_similarity('a', 'x') == 0.0
+    (z, _, _) = caset.similarity_matrix(['b', 'c'], ['b', 'd'])
+    assert z[0][0] == 1.0
+    assert z[1][1] == caset.jaccard_similarity('c', 'd')
+
+def test_batch_enrichment():
+    """
+    batch enrichment matches single enrichment tests and fisher exact test
+    """
+    import scipy.stats
+    ont = OntologyFactory().create('tests/resources/pato.json')
+    random.seed(42)
+    amap = {}
+    for x in range(60):
+        amap['g' + str(x)] = [t for t in [PLOIDY, EUPLOID, SHAPE, Y_SHAPED] if random.random() < 0.5]
+    aset = AssociationSet(ontology=ont, association_map=amap)
+    samples = [['g' + str(x) for x in range(0, 20)], ['g' + str(x) for x in range(10, 40)]]
+    batch = aset.batch_enrichment_test(samples, threshold=1.1)
+    assert len(batch) == 2
+    for (sample, results) in zip(samples, batch):
+        assert results == aset.enrichment_test(sample, threshold=1.1)
+        for r in results:
+            a = len([s for s in sample if r['c'] in aset.inferred_types(s)])
+            n = len([s for s in amap if r['c'] in aset.inferred_types(s)])
+            b = len(sample) - a
+            _, p = scipy.stats.fisher_exact([[a, b], [n - a, len(amap) - n - b]], 'greater')
+            assert abs(r['p_uncorrected'] - p) < 1e-9
+
+def test_similarity_top_k():
+    """
+    top-k similar subjects and intersections from the sparse index
+    """
+    ont = OntologyFactory().create('tests/resources/pato.json')
+    aset = AssociationSet(ontology=ont,
+                          association_map={
+                              'a': [],
+                              'b': [EUPLOID],
+                              'c': [Y_SHAPED],
+                              'd': [EUPLOID, Y_SHAPED],
+                          })
+    results = aset.similarity_top_k(k=2)
+    assert [r['y'] for r in results if r['x'] == 'b'] == ['d', 'c']
+    assert [r['x'] for r in results if r['x'] == 'a'] == []
+    for r in results:
+        assert r['x'] != r['y']
+        assert r['j'] == aset.jaccard_similarity(r['x'], r['y'])
+    ilist = aset.query_intersections([PLOIDY, SHAPE], [QUALITY], include_shared=False)
+    assert [(i['x'], i['y'], i['c']) for i in ilist] == [(PLOIDY, QUALITY, 2), (SHAPE, QUALITY, 2)]
+    assert 'shared' not in ilist[0]
+    ilist = aset.query_intersections([PLOIDY], [SHAPE])
+    assert ilist[0]['shared'] == {'d'}
+    assert ilist[0]['j'] == 1 / 3
+
 def test_enrichment():
     """
     enrichment
@@ -1,4 +1,9 @@
+import subprocess
+import sys
+
+from ontobio import ecomap
 from ontobio.ecomap import EcoMap
+from ontobio.io import assocparser, gafparser, qc
 
 
 def test_ecomap():
@@ -15,3 +20,59 @@ def test_ecomap():
     assert m.coderef_to_ecoclass('BADCODE', 'GO_REF:xxx') == None
     assert m.ecoclass_to_coderef('ECO:9999999999999999999') == (None,None)
     assert m.coderef_to_ecoclass('ISO', None) == 'ECO:0000266'
+
+
+def test_ecomap_path(tmp_path):
+    """
+    test loading mappings from a local file instead of the PURL
+    """
+    path = tmp_path / "gaf-eco-mapping.txt"
+    path.write_text("# test\nIDA\tDefault\tECO:0000314\nIEA\tDefault\tECO:0000501\nIEA\tGO_REF:0000002\tECO:0000256\n")
+    m = EcoMap(str(path))
+    assert len(m.mappings()) == 3
+    assert m.coderef_to_ecoclass('IEA', 'GO_REF:0000002') == 'ECO:0000256'
+    assert m.coderef_to_ecoclass('ISO') == None
+    assert m.ecoclass_to_coderef('ECO:0000314') == ('IDA', None)
+
+
+def test_import_does_not_fetch():
+    """
+    importing the parsers and GO rules does not read the ecomap
+    """
+    # in a new process, as importing any ontobio module imports the parsers
+    code = "\n".join([
+        "import requests",
+        "def fetch(url, *args, **kwargs):",
+        "    raise AssertionError('fetched ' + url)",
+        "requests.get = fetch",
+        "import ontobio.io.qc",
+        "import ontobio.io.gafparser",
+    ])
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_ecomap_pipeline(tmp_path, monkeypatch):
+    """
+    the parser and GO rules use the ecomap set for the pipeline
+    """
+    path = tmp_path / "gaf-eco-mapping.txt"
+    path.write_text("IEA\tDefault\tECO:9999999\nISO\tDefault\tECO:0000266\n")
+    monkeypatch.setattr(ecomap, "_ecomap", None)
+    m = ecomap.set_ecomap(str(path))
+    assert ecomap.get_ecomap() is m
+
+    config = assocparser.AssocParserConfig()
+    assert config.ecomap is m
+    p = gafparser.GafParser(config=config)
+    line = "PomBase\tSPAC25B8.17\typf1\t\tGO:0000006\tGO_REF:0000024\tIEA\t\tC\tdesc\tppp81\tprotein\ttaxon:4896\t20150305\tPomBase"
+    assoc = p.parse_line(line).associations[0]
+    assert str(assoc.evidence.type) == "ECO:9999999"
+
+    # GoRule29 removes IEAs over two years old
+    result = qc.GoRules.GoRule29.value.test(assoc, config)
+    assert result.result_type == qc.ResultType.ERROR
+
+    # a config can also be given its own ecomap
+    config = assocparser.AssocParserConfig(ecomap=EcoMap(str(path)))
+    assert config.ecomap is not m
+    assert qc.GoRules.GoRule29.value.test(assoc, config).result_type == qc.ResultType.ERROR
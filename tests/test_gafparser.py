@@ -131,6 +131,55 @@ def parse_with(f, p):
     # print(p.report.to_markdown())
 
 
+def test_parallel_parse_gaf():
+    ont = OntologyFactory().create(ONT)
+    for f in [POMBASE, "tests/resources/errors.gaf"]:
+        p = GafParser(config=assocparser.AssocParserConfig(ontology=ont))
+        pp = GafParser(config=assocparser.AssocParserConfig(ontology=ont, workers=2, chunk_size=7))
+        results = p.parse(open(f, "r"), skipheader=True)
+        parallel_results = pp.parse(open(f, "r"), skipheader=True)
+        assert parallel_results == results
+        assert pp.report.messages == p.report.messages
+        assert pp.report.reporter.messages == p.report.reporter.messages
+        assert (pp.report.n_lines, pp.report.n_assocs, pp.report.skipped) == (p.report.n_lines, p.report.n_assocs, p.report.skipped)
+
+
+def test_report_examples():
+    ont = OntologyFactory().create(ONT)
+    p = GafParser(config=assocparser.AssocParserConfig(ontology=ont))
+    ep = GafParser(config=assocparser.AssocParserConfig(ontology=ont, report_examples=2))
+    pep = GafParser(config=assocparser.AssocParserConfig(ontology=ont, report_examples=2, workers=2, chunk_size=7))
+    for parser in [p, ep, pep]:
+        parser.parse(open(POMBASE, "r"), skipheader=True)
+
+    assert ep.report.reporter.counts == p.report.reporter.counts
+    assert ep.report.reporter.counts["gorule-0000059"] == len(p.report.reporter.messages["gorule-0000059"])
+    assert len(ep.report.reporter.messages["gorule-0000059"]) == 2
+    assert ep.report.reporter.messages.keys() == p.report.reporter.messages.keys()
+    assert "* total: {}".format(ep.report.reporter.counts["gorule-0000059"]) in ep.report.to_markdown()
+    assert pep.report.reporter.messages == ep.report.reporter.messages
+    assert pep.report.reporter.counts == ep.report.reporter.counts
+
+
+def test_prefilter_columns():
+    ont = OntologyFactory().create(ONT)
+    for f in [POMBASE, "tests/resources/errors.gaf"]:
+        p = GafParser(config=assocparser.AssocParserConfig(ontology=ont))
+        pp = GafParser(config=assocparser.AssocParserConfig(ontology=ont, prefilter_columns=True))
+        results = p.parse(open(f, "r"), skipheader=True)
+        prefiltered_results = pp.parse(open(f, "r"), skipheader=True)
+        assert prefiltered_results == results
+        assert pp.report.messages == p.report.messages
+        assert pp.report.reporter.messages == p.report.reporter.messages
+
+    line = "PomBase\tSPAC25B8.17\typf1\t\tGO:0000006\tGO_REF:0000024\tXYZ\t\tC\tname\t\tprotein\ttaxon:4896\t20150305\tPomBase\t\t"
+    report = assocparser.Report()
+    rejected = gafparser.reject_columns(line.split("\t"), report=report)
+    assert rejected.skipped
+    assert report.messages[0]["type"] == assocparser.Report.UNKNOWN_EVIDENCE_CLASS
+    assert gafparser.reject_columns(line.replace("XYZ", "ISO").split("\t"), report=report) is None
+
+
 def test_flag_invalid_id():
     ont = OntologyFactory().create(ONT)
     p = GafParser()
@@ -139,6 +188,24 @@ def test_flag_invalid_id():
     assert len(p.report.messages) == 1
 
 
+def test_validation_memo():
+    ont = OntologyFactory().create(ONT)
+    p = GafParser(config=assocparser.AssocParserConfig(ontology=ont))
+    line = assocparser.SplitLine("fake", [""]*17, taxon="foo")
+    assert p._validate_ontology_class_id("FAKE:1", line) == "FAKE:1"
+    assert p._validate_ontology_class_id("FAKE:1", line) == "FAKE:1"
+    assert len(p.report.messages) == 2
+    assert p._validate_id("FAKE 1:1", line) is False
+    assert p._validate_id("FAKE 1:1", line) is False
+    assert p.report.messages[-1]["message"] == "GORULE:0000027: contains non letter, non number character, or spaces"
+    assert p.report.memo_summary() == {"id": {"hits": 1, "misses": 1}, "term": {"hits": 1, "misses": 1}}
+
+    # A new ontology starts a new memo
+    p.config.ontology = OntologyFactory().create(ONT)
+    p._validate_ontology_class_id("FAKE:1", line)
+    assert p.report.memo_misses["term"] == 2
+
+
 def test_no_flag_valid_id():
     ont = OntologyFactory().create(ONT)
     p = GafParser()
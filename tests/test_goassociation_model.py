@@ -14,6 +14,14 @@ def test_negated_qualifiers():
     to_gpad = association.to_gpad_1_2_tsv()
     assert to_gpad[2] == "NOT|involved_in"
 
+def test_gaf_tsv_taxon():
+    gaf = ["PomBase", "SPBC11B10.09", "cdc2", "", "GO:0007275", "PMID:21873635", "IBA", "", "P", "Cyclin-dependent kinase 1", "", "protein", "taxon:284812|taxon:9606", "20170228", "GO_Central", "", ""]
+    association = gafparser.to_association(gaf).associations[0]
+    assert association.to_gaf_2_2_tsv()[12] == "taxon:284812|taxon:9606"
+    # Writing a GAF row leaves the association as it was
+    assert str(association.subject.taxon) == "NCBITaxon:284812"
+    assert str(association.interacting_taxon) == "NCBITaxon:9606"
+
 def test_conjunctiveset_tostring():
     c = association.ConjunctiveSet(["MGI:12345"])
     assert str(c) == "MGI:12345"
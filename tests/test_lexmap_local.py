@@ -100,6 +100,53 @@ def test_lexmap_basic():
     df = lexmap.unmapped_dataframe(g)
     print(df.to_csv())
     
+def test_lexmap_workers():
+    """
+    Sharded candidate generation gives the same mappings
+    """
+    factory = OntologyFactory()
+    files = ['x','m','h','bto']
+    graphs = []
+    for config in [{}, {'workers': 2}]:
+        onts = [factory.create('tests/resources/autopod-{}.json'.format(f)) for f in files]
+        lexmap = LexicalMapEngine(config=config)
+        lexmap.index_ontologies(onts)
+        graphs.append(lexmap.get_xref_graph())
+    (g, pg) = graphs
+    assert len(g.edges()) > 0
+    assert list(pg.edges(data='idpair')) == list(g.edges(data='idpair'))
+    assert list(pg.edges(data='score')) == list(g.edges(data='score'))
+
+    lexmap = LexicalMapEngine(config={'max_bucket_size': 1})
+    lexmap.index_ontology(factory.create('tests/resources/lexmap_test.json'))
+    assert len(lexmap.get_xref_graph().edges()) == 0
+
+
+def test_lexmap_candidate_pairs():
+    """
+    Only synonyms from the requested pairs of ontologies are compared
+    """
+    factory = OntologyFactory()
+    lexmap = LexicalMapEngine()
+    for f in ['m', 'h', 'x', 'bto']:
+        ont = factory.create('tests/resources/autopod-{}.json'.format(f))
+        ont.id = f
+        lexmap.index_ontology(ont)
+    lexmap.ontology_pairs = [('m', 'x'), ('bto', 'm')]
+
+    expected = set()
+    for syns in lexmap.lmap.values():
+        for s1 in syns:
+            for s2 in syns:
+                if lexmap._is_comparable(s1, s2):
+                    expected.add((s1.class_id, s2.class_id))
+    best = lexmap._best_candidates(list(lexmap.lmap.keys()))
+    assert len(expected) > 0
+    assert set(best.keys()) == expected
+    for (score, v, a, b) in best.values():
+        assert (lexmap.lmap[v][a].ontology.id, lexmap.lmap[v][b].ontology.id) in lexmap.ontology_pairs
+
+
 def test_lexmap_multi():
     """
     Text lexical mapping
@@ -257,3 +257,18 @@ def test_obsolete():
     assert ont.replaced_by('GO:4') == ['GO:3']
     assert ont.replaced_by('GO:0005913') == ['GO:0005912']
     assert n_obs == 4
+
+def test_contract_uri():
+    """
+    Contract URIs using the document context, falling back to default prefixes
+    """
+    from ontobio.obograph_util import OboJsonMapper
+    mapper = OboJsonMapper(context={'GO': 'http://purl.obolibrary.org/obo/GO_',
+                                    'obo': 'http://purl.obolibrary.org/obo/'})
+    assert mapper.contract_uri('http://purl.obolibrary.org/obo/GO_0008150') == 'GO:0008150'
+    assert mapper.contract_uri('http://purl.obolibrary.org/obo/BFO_0000050') == 'obo:BFO_0000050'
+    assert mapper.contract_uri('http://purl.obolibrary.org/obo/GO_0008150') == 'GO:0008150'
+    assert mapper.contract_uri.cache_info().hits == 1
+    mapper = OboJsonMapper()
+    assert mapper.contract_uri('http://purl.obolibrary.org/obo/BFO_0000050') == 'BFO:0000050'
+    assert mapper.contract_uri('urn:example:x') == 'urn:example:x'
@@ -1,6 +1,7 @@
 import pytest
 
 from ontobio import ontol
+from ontobio import cgraph
 from ontobio import ontol_factory
 
 def test_missing_node_is_none():
@@ -32,3 +33,188 @@ def test_ontology_synonyms():
 
     assert syn[0].__dict__ == ontol.Synonym("GO:0005634", val="cell nucleus", pred="hasExactSynonym", lextype=None,
                         xrefs=[], ontology=None, confidence=1.0, synonymType="http://purl.obolibrary.org/obo/go-test#systematic_synonym").__dict__
+
+def test_metadata_index_updated_on_edit():
+    ontology = ontol_factory.OntologyFactory().create("tests/resources/nucleus.json")
+    nucleus = "GO:0005634"
+    assert ontology.text_definition(nucleus) is not None
+    assert not ontology.is_obsolete(nucleus)
+    assert nucleus not in ontology.all_obsoletes()
+    n_syns = len(ontology.synonyms(nucleus))
+    assert len(ontology.all_synonyms()) == sum(len(ontology.synonyms(n)) for n in ontology.nodes())
+
+    ontology.set_obsolete(nucleus)
+    ontology.add_synonym(ontol.Synonym(nucleus, val="cell nucleus core"))
+    ontology.add_text_definition(ontol.TextDefinition(nucleus, val="new definition"))
+    assert ontology.is_obsolete(nucleus)
+    assert nucleus in ontology.all_obsoletes()
+    assert len(ontology.synonyms(nucleus)) == n_syns + 1
+    assert ontology.text_definition(nucleus).val == "new definition"
+
+def test_closure_index_matches_graph_walk():
+    ontology = ontol_factory.OntologyFactory().create("tests/resources/go-truncated-pombase.json")
+    relation_sets = [None, ["subClassOf"], ["subClassOf", "BFO:0000050"]]
+    expected = {}
+    for relations in relation_sets:
+        for n in ontology.nodes():
+            expected[(str(relations), n)] = (set(ontology.ancestors(n, relations=relations)),
+                                             set(ontology.descendants(n, relations=relations, reflexive=True)))
+
+    ontology.index_closures(relations=["subClassOf"])
+    assert ontology.cache_closures
+    for relations in relation_sets:
+        for n in ontology.nodes():
+            ancs, decs = expected[(str(relations), n)]
+            assert set(ontology.ancestors(n, relations=relations)) == ancs
+            assert set(ontology.descendants(n, relations=relations, reflexive=True)) == decs
+
+    assert ontology.has_ancestor("GO:0005634", "GO:0005575")
+    assert not ontology.has_ancestor("GO:0005634", "GO:0005634")
+    assert ontology.has_ancestor("GO:0005634", "GO:0005634", reflexive=True)
+
+def test_closure_index_invalidated_on_add_parent():
+    ontology = ontol_factory.OntologyFactory().create("tests/resources/nucleus.json")
+    ontology.index_closures()
+    ontology.add_node("GO:9999999", label="new term")
+    ontology.add_parent("GO:9999999", "GO:0005634")
+    assert "GO:0005634" in ontology.ancestors("GO:9999999")
+    assert "GO:9999999" in ontology.descendants("GO:0005634")
+
+def test_relation_index_filtered_neighbors():
+    ontology = ontol_factory.OntologyFactory().create("tests/resources/go-truncated-pombase.json")
+    g = ontology.get_graph()
+    for relations in [["subClassOf"], ["BFO:0000050"], ["subClassOf", "BFO:0000050"]]:
+        for n in ontology.nodes():
+            expected_parents = {p for p in g.predecessors(n)
+                                if ontology.child_parent_relations(n, p).intersection(relations)}
+            expected_children = {c for c in g.successors(n)
+                                 if ontology.child_parent_relations(c, n).intersection(relations)}
+            assert set(ontology.parents(n, relations=relations)) == expected_parents
+            assert set(ontology.children(n, relations=relations)) == expected_children
+
+    ontology.add_node("GO:9999999", label="new term")
+    ontology.add_parent("GO:9999999", "GO:0005634", relation="BFO:0000050")
+    assert ontology.parents("GO:9999999", relations=["BFO:0000050"]) == ["GO:0005634"]
+    assert ontology.parents("GO:9999999", relations=["subClassOf"]) == []
+
+def test_name_index_resolve_names():
+    ontology = ontol_factory.OntologyFactory().create("tests/resources/nucleus.json")
+    assert ontology.resolve_names(["nucleus"]) == ["GO:0005634"]
+    assert ontology.resolve_names(["NUCLEUS"]) == []
+    assert ontology.resolve_names(["NUCLEUS"], ignore_case=True) == ["GO:0005634"]
+    assert "GO:0005634" in ontology.resolve_names(["%ucle%"])
+    assert "GO:0005634" in ontology.resolve_names(["ucle"], is_partial_match=True)
+    assert ontology.resolve_names(["GO:0000001"]) == ["GO:0000001"]
+    assert set(ontology.search("%")) == set(ontology.nodes())
+
+    ontology.add_node("GO:9999999", label="new term")
+    assert ontology.search("new term") == ["GO:9999999"]
+    ontology.add_synonym(ontol.Synonym("GO:9999999", val="novel term"))
+    assert ontology.search("novel term") == []
+    assert ontology.search("novel term", synonyms=True) == ["GO:9999999"]
+
+def test_filtered_graph_is_cached_view():
+    ontology = ontol_factory.OntologyFactory().create("tests/resources/go-truncated-pombase.json")
+    g = ontology.get_filtered_graph(relations=["subClassOf"])
+    assert g is ontology.get_filtered_graph(relations=["subClassOf"])
+    assert set(g.nodes()) == set(ontology.nodes())
+    assert all(d["pred"] == "subClassOf" for (_, _, d) in g.edges(data=True))
+    # node data is shared with the source graph, not copied
+    assert g.nodes["GO:0005634"] is ontology.get_graph().nodes["GO:0005634"]
+
+    go_only = ontology.get_filtered_graph(relations=["subClassOf"], prefix="GO")
+    assert all(n.startswith("GO:") for n in go_only.nodes())
+
+def test_compact_ontology_matches_networkx():
+    ontology = ontol_factory.OntologyFactory().create("tests/resources/go-truncated-pombase.json")
+    compact = ontol_factory.OntologyFactory().create("tests/resources/go-truncated-pombase.json", compact=True)
+    assert set(compact.nodes()) == set(ontology.nodes())
+    assert set(compact.relations_used()) == set(ontology.relations_used())
+    for relations in [None, ["subClassOf"], ["subClassOf", "BFO:0000050"]]:
+        for n in ontology.nodes():
+            assert set(compact.parents(n, relations=relations)) == set(ontology.parents(n, relations=relations))
+            assert set(compact.children(n, relations=relations)) == set(ontology.children(n, relations=relations))
+            assert set(compact.ancestors(n, relations=relations)) == set(ontology.ancestors(n, relations=relations))
+            assert set(compact.descendants(n, relations=relations)) == set(ontology.descendants(n, relations=relations))
+    for n in ontology.nodes():
+        assert compact.label(n) == ontology.label(n)
+        assert compact.is_obsolete(n) == ontology.is_obsolete(n)
+        assert compact.obo_namespace(n) == ontology.obo_namespace(n)
+    assert compact.node("GO:0") is None
+    assert compact.label("GO:0", id_if_null=True) == "GO:0"
+    with pytest.raises(cgraph.ReadOnlyOntologyError):
+        compact.add_parent("GO:0005634", "GO:0005575")
+    with pytest.raises(TypeError):
+        compact.set_obsolete("GO:0005634")
+    with pytest.raises(cgraph.ReadOnlyOntologyError):
+        compact.add_synonym(ontol.Synonym("GO:0005634", val="nuclear compartment"))
+    assert not compact.is_obsolete("GO:0005634")
+
+def test_snapshot_round_trip(tmp_path):
+    handle = "tests/resources/goslim_generic.json"
+    ontology = ontol_factory.OntologyFactory().create(handle)
+    ontol_factory.OntologyFactory().create(handle, snapshot=True, snapshot_dir=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 1
+
+    snapshot = ontol_factory.OntologyFactory().create(handle, snapshot=True, snapshot_dir=str(tmp_path))
+    assert snapshot.id == ontology.id
+    assert set(snapshot.nodes()) == set(ontology.nodes())
+    for n in ontology.nodes():
+        assert snapshot.label(n) == ontology.label(n)
+        assert set(snapshot.ancestors(n)) == set(ontology.ancestors(n))
+        assert snapshot.subsets(n) == ontology.subsets(n)
+    assert len(snapshot.all_logical_definitions) == len(ontology.all_logical_definitions)
+    assert len(snapshot.all_property_chain_axioms) == len(ontology.all_property_chain_axioms)
+
+def test_stream_json_loader():
+    handle = "tests/resources/goslim_generic.json"
+    ontology = ontol_factory.OntologyFactory().create(handle)
+    streamed = ontol_factory.OntologyFactory().create(handle, stream=True)
+    assert ontology.graphdoc is not None
+    assert streamed.graphdoc is None
+    assert streamed.id == ontology.id
+    assert set(streamed.nodes()) == set(ontology.nodes())
+    assert set(streamed.get_graph().edges()) == set(ontology.get_graph().edges())
+    for n in ontology.nodes():
+        assert streamed.node(n) == ontology.node(n)
+    assert len(streamed.all_logical_definitions) == len(ontology.all_logical_definitions)
+    assert len(streamed.all_property_chain_axioms) == len(ontology.all_property_chain_axioms)
+
+    kept = ontol_factory.OntologyFactory().create(handle, stream=True, keep_graphdoc=True)
+    assert kept.graphdoc is not None
+
+def test_stream_json_loader_context(tmp_path):
+    """
+    prefixes declared in the @context of the file are used when streaming
+    """
+    import json
+    graph = {
+        "id": "http://example.org/ex.owl",
+        "nodes": [
+            {"id": "http://example.org/ex/0001", "lbl": "root", "type": "CLASS"},
+            {"id": "http://example.org/ex/0002", "lbl": "child", "type": "CLASS"}
+        ],
+        "edges": [
+            {"sub": "http://example.org/ex/0002", "pred": "is_a", "obj": "http://example.org/ex/0001"}
+        ]
+    }
+    context = {"EX": "http://example.org/ex/"}
+    for doc in [{"@context": context, "graphs": [graph]}, {"graphs": [graph], "@context": context}]:
+        path = tmp_path / "ex.json"
+        path.write_text(json.dumps(doc))
+        ontology = ontol_factory.OntologyFactory().create(str(path))
+        streamed = ontol_factory.OntologyFactory().create(str(path), stream=True)
+        assert set(ontology.nodes()) == {"EX:0001", "EX:0002"}
+        assert set(streamed.nodes()) == set(ontology.nodes())
+        assert set(streamed.get_graph().edges()) == set(ontology.get_graph().edges())
+        assert streamed.label("EX:0002") == "child"
+
+def test_subontology_relations_is_mutable():
+    ontology = ontol_factory.OntologyFactory().create("tests/resources/goslim_generic.json")
+    sub = ontology.subontology(relations=["subClassOf"])
+    assert set(sub.nodes()) == set(ontology.nodes())
+    assert {d['pred'] for (_, _, d) in sub.get_graph().edges(data=True)} == {"subClassOf"}
+    sub.add_node("GO:0", "new term")
+    sub.add_parent("GO:0", "GO:0005575")
+    assert "GO:0005575" in sub.parents("GO:0")
+    assert not ontology.has_node("GO:0")
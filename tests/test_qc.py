@@ -332,6 +332,9 @@ def test_go_rule28():
     fixed_assoc.aspect = "P"
     assert test_result.result == fixed_assoc
     assert test_result.message == "Found violation of: `Aspect can only be one of C, P, F` but was repaired"
+    # The repair copies the annotation, sharing the fields it does not change
+    assert assoc.aspect == "C"
+    assert test_result.result.evidence is assoc.evidence
 
 def test_go_rule29():
 
@@ -679,6 +682,33 @@ def test_all_rules():
     assert test_results[qc.GoRules.GoRule26.value].result_type == qc.ResultType.PASS
     assert test_results[qc.GoRules.GoRule29.value].result_type == qc.ResultType.PASS
 
+    # GoRule57 and GoRule58 only run in the import context, and pass elsewhere
+    assert test_results[qc.GoRules.GoRule57.value].result_type == qc.ResultType.PASS
+    assert qc.GoRules.GoRule57.value in qc.compile_rules(config).skipped
+
+    config = assocparser.AssocParserConfig(ontology=ontology, rule_set=assocparser.RuleSet.ALL, rule_contexts=["import"])
+    test_results = qc.test_go_rules(assoc, config).all_results
+    assert len(test_results.keys()) == 24
+    assert qc.compile_rules(config).skipped == set()
+
+
+def test_compile_rules():
+    config = assocparser.AssocParserConfig(ontology=ontology, rule_set=[7, 61])
+    plan = qc.compile_rules(config)
+    assert plan.rules == [qc.GoRules.GoRule07.value, qc.GoRules.GoRule61.value]
+    assert len(plan.skipped) == len(plan.all_rules) - 2
+    assert qc.compile_rules(config) is plan
+    assert "GO:0005840" in plan.compiled(qc.GoRules.GoRule61.value)
+    assert "GO:0003824" in plan.compiled(qc.GoRules.GoRule07.value)
+
+    # Rebuilt when the ontology changes
+    config.ontology = None
+    plan = qc.compile_rules(config)
+    assert plan.compiled(qc.GoRules.GoRule07.value) is None
+    assert plan.compiled(qc.GoRules.GoRule61.value) == set()
+
+    assert qc.compile_rules(assocparser.AssocParserConfig()).rules == []
+
 
 if __name__ == "__main__":
     pytest.main(args=["tests/test_qc.py"])
@@ -0,0 +1,123 @@
+import gzip
+import importlib.util
+import os
+import shutil
+
+import pytest
+
+from ontobio.ontol_factory import OntologyFactory
+
+spec = importlib.util.spec_from_file_location("validate", os.path.join(os.path.dirname(__file__), "..", "bin", "validate.py"))
+validate = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(validate)
+
+ontology = OntologyFactory().create("tests/resources/go-truncated-pombase.json")
+
+products = {
+    "gaf": True,
+    "gpi": True,
+    "gpad": True,
+    "ttl": False
+}
+
+
+def produce(target, single_pass, gaf_output_version):
+    """
+    Makes the pombase products from truncated-pombase.gaf with wb_single_iba.gaf as a mixin, as `validate.py produce` does
+    """
+    os.makedirs(target)
+    source_gaf = os.path.join(target, "pombase-src.gaf")
+    shutil.copyfile("tests/resources/truncated-pombase.gaf", source_gaf)
+    mixin_src = os.path.join(target, "paint_pombase-src.gaf")
+    shutil.copyfile("tests/resources/wb_single_iba.gaf", mixin_src)
+
+    if single_pass:
+        gpi_file = validate.tools.gzip_tee(open(os.path.join(target, "pombase.gpi"), "w"))
+        product_writers = validate.ProductWriters("pombase", target, products)
+        valid_gaf = validate.produce_gaf("pombase", source_gaf, ontology, group="pombase", gaf_output_version=gaf_output_version,
+                                         sinks=[validate.gpi_writer(gpi_file), product_writers.write])[0]
+        gpi_file.close()
+        validate.produce_gaf("paint_pombase", mixin_src, ontology, paint=True, group="paint", gaf_output_version=gaf_output_version,
+                             sinks=[product_writers.write])
+        product_writers.close()
+    else:
+        valid_gaf = validate.produce_gaf("pombase", source_gaf, ontology, group="pombase", gaf_output_version=gaf_output_version)[0]
+        validate.produce_gpi("pombase", target, valid_gaf, ontology)
+        mixin_gaf = validate.produce_gaf("paint_pombase", mixin_src, ontology, paint=True, group="paint", gaf_output_version=gaf_output_version)[0]
+        end_gaf = validate.merge_all_mixin_gaf_into_mod_gaf(valid_gaf, [mixin_gaf])
+        validate.make_products("pombase", target, end_gaf, products, ontology)
+
+
+def annotation_lines(path):
+    with open(path) as f:
+        return [line for line in f if not line.startswith("!")]
+
+
+def test_single_pass_products(tmp_path):
+    produce(str(tmp_path / "multi"), False, "2.1")
+    produce(str(tmp_path / "single"), True, "2.1")
+
+    for product in ["pombase.gpi", "pombase.gpad", "pombase_valid.gaf"]:
+        multi = annotation_lines(str(tmp_path / "multi" / product))
+        single = annotation_lines(str(tmp_path / "single" / product))
+        assert len(single) > 0
+        assert single == multi
+
+    # the mixin annotation is in the gpad
+    assert any(line.startswith("WB\t") for line in annotation_lines(str(tmp_path / "single" / "pombase.gpad")))
+
+
+def test_single_pass_keeps_lines_rejected_on_reparse(tmp_path):
+    """
+    The truncated ontology has no namespaces, so GAF 2.2 lines are written
+    without qualifiers. Parsing the written gaf again rejects them, so only
+    the single pass products have them.
+    """
+    produce(str(tmp_path / "multi"), False, "2.2")
+    produce(str(tmp_path / "single"), True, "2.2")
+
+    valid = annotation_lines(str(tmp_path / "single" / "pombase_valid.gaf"))
+    assert valid == annotation_lines(str(tmp_path / "multi" / "pombase_valid.gaf"))
+    assert len(annotation_lines(str(tmp_path / "single" / "pombase.gpad"))) == len(valid) + 1
+    assert len(annotation_lines(str(tmp_path / "multi" / "pombase.gpad"))) < len(valid)
+
+
+def test_merge_mixin_gaf(tmp_path):
+    valid_gaf = str(tmp_path / "pombase_valid.gaf")
+    shutil.copyfile("tests/resources/truncated-pombase.gaf", valid_gaf)
+    # no newline at the end of the mixin
+    mixin_gaf = str(tmp_path / "paint_pombase_valid.gaf")
+    shutil.copyfile("tests/resources/wb_single_iba.gaf", mixin_gaf)
+
+    merged_path = validate.merge_all_mixin_gaf_into_mod_gaf(valid_gaf, [mixin_gaf], compresslevel=1)
+    assert merged_path == str(tmp_path / "pombase.gaf")
+
+    with open("tests/resources/truncated-pombase.gaf") as f:
+        valid_lines = f.read().splitlines()
+    with open("tests/resources/wb_single_iba.gaf") as f:
+        mixin_lines = f.read().splitlines()
+
+    with open(merged_path, "rb") as f:
+        merged = f.read()
+    merged_lines = merged.decode("utf-8").splitlines()
+
+    header = [line for line in merged_lines if line.startswith("!")]
+    assert header == [line for line in valid_lines if line.startswith("!")] + [
+        "!=================================",
+        "!",
+        "!Header copied from paint_pombase_valid.gaf",
+        "!=================================",
+        "!",
+        "!=================================",
+        "!",
+        "!Documentation about this header can be found here: https://github.com/geneontology/go-site/blob/master/docs/gaf_validation.md",
+        "!"
+    ]
+    assert merged_lines[:len(header)] == header
+    # annotations follow the header, valid gaf first, in their original order
+    assert merged_lines[len(header):] == [line for line in valid_lines + mixin_lines if not line.startswith("!")]
+    assert len(merged_lines) == len(header) + 370 + 1
+    assert merged.endswith(b"\n")
+
+    with gzip.open(merged_path + ".gz", "rb") as f:
+        assert f.read() == merged